@@ -8,11 +8,14 @@ import java.io.InputStreamReader
 class Scaler(context: Context) {
     private val mean: FloatArray
     private val scale: FloatArray
+    // True when model.tflite was exported with the scaler folded into its first layer
+    val folded: Boolean
 
     init {
         val inputStream = context.assets.open("scaler_params.json")
         val reader = BufferedReader(InputStreamReader(inputStream))
         val json = JSONObject(reader.readText())
+        folded = json.optBoolean("folded", false)
 
         mean = json.getJSONArray("mean").let { array ->
             FloatArray(array.length()) { array.getDouble(it).toFloat() }
@@ -23,6 +26,7 @@ class Scaler(context: Context) {
     }
 
     fun transform(input: FloatArray): FloatArray {
+        if (folded) return input
         return input.indices.map { i ->
             (input[i] - mean[i]) / scale[i]
         }.toFloatArray()
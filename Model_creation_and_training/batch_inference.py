@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import struct
+import time
+import numpy as np
+import pandas as pd
+
+from landmark_features import FEATURE_COLUMNS, NUM_FEATURES, batch_features, LandmarkFeatureExtractor
+from sign_classifier import load_classifier, MODEL_PATH, SCALER_PATH, LABEL_MAP_PATH
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# ========== Input Sources ==========
+# Every source yields (records, features) chunks: a list of per-row metadata dicts
+# and an (n, 126) raw (unscaled) feature array. Rows with no hand are all zeros.
+
+def iter_csv_chunks(csv_path, chunk_size):
+    """Stream a data_both_hands.csv style file in chunks"""
+    for chunk in pd.read_csv(csv_path, encoding='utf-8', chunksize=chunk_size):
+        for col in FEATURE_COLUMNS:
+            if col not in chunk.columns:
+                chunk[col] = 0.0
+        features = chunk[FEATURE_COLUMNS].fillna(0).values
+        records = []
+        for row in chunk.itertuples(index=False):
+            records.append({
+                'source': getattr(row, 'image_path', None),
+                'true_label': getattr(row, 'label', None),
+                'is_left': int(getattr(row, 'is_left', 0)),
+                'is_right': int(getattr(row, 'is_right', 0)),
+            })
+        yield records, features
+
+
+def _array_to_features(array):
+    """Accept (126,), (N, 126), (2, 21, 3) or (N, 2, 21, 3) landmark arrays"""
+    array = np.asarray(array, dtype=np.float64)
+    if array.shape == (NUM_FEATURES,):
+        return array.reshape(1, -1)
+    if array.ndim == 2 and array.shape[1] == NUM_FEATURES:
+        return array
+    if array.shape == (2, 21, 3):
+        array = array[np.newaxis]
+    if array.ndim == 4:
+        return batch_features(array)
+    raise ValueError(f"Unsupported landmark array shape {array.shape}")
+
+
+def _source_paths(source, extensions):
+    """A single file, or every file under a folder whose name ends with one of extensions"""
+    if os.path.isfile(source):
+        return [source]
+    return sorted(os.path.join(root, name)
+                  for root, _, files in os.walk(source)
+                  for name in files if name.lower().endswith(extensions))
+
+
+def iter_npy_chunks(source, chunk_size):
+    """Stream a .npy landmark array, or every one under a folder"""
+    paths = _source_paths(source, ('.npy',))
+    records, rows = [], []
+    for path in paths:
+        features = _array_to_features(np.load(path, mmap_mode='r'))
+        for i, vector in enumerate(features):
+            hands = vector.reshape(2, -1).any(axis=1)
+            records.append({'source': f"{path}[{i}]", 'true_label': None,
+                            'is_left': int(hands[0]), 'is_right': int(hands[1])})
+            rows.append(vector)
+            if len(rows) == chunk_size:
+                yield records, np.array(rows)
+                records, rows = [], []
+    if rows:
+        yield records, np.array(rows)
+
+
+def iter_image_chunks(source, chunk_size, min_detection_confidence=0.7):
+    """Run MediaPipe Hands over an image, or an image folder (e.g. malayalam_isl_images/<label>/)"""
+    import cv2
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2,
+                                     min_detection_confidence=min_detection_confidence)
+    extractor = LandmarkFeatureExtractor()
+    paths = _source_paths(source, IMAGE_EXTENSIONS)
+    records, rows = [], []
+    try:
+        for path in paths:
+            frame = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                continue
+            # Saved frames are already mirrored by the capture script
+            features = extractor.from_results(hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+            label = os.path.basename(os.path.dirname(path))
+            records.append({'source': path, 'true_label': label,
+                            'is_left': extractor.is_left, 'is_right': extractor.is_right})
+            rows.append(features.copy())
+            if len(rows) == chunk_size:
+                yield records, np.array(rows)
+                records, rows = [], []
+    finally:
+        hands.close()
+    if rows:
+        yield records, np.array(rows)
+
+
+# ========== Output Sinks ==========
+class NpyAppender:
+    """Append rows to a .npy file whose header is patched with the final shape on close"""
+
+    HEADER_SIZE = 128
+
+    def __init__(self, path, dtype, row_shape=()):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self._f = open(path, 'wb')
+        self._f.write(self._header())
+
+    def _header(self):
+        shape = (self.rows,) + self.row_shape
+        header = "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+            np.lib.format.dtype_to_descr(self.dtype), shape)
+        body = header.ljust(self.HEADER_SIZE - 11) + "\n"
+        return np.lib.format.magic(1, 0) + struct.pack('<H', len(body)) + body.encode('latin1')
+
+    def write(self, array):
+        array = np.ascontiguousarray(array, dtype=self.dtype)
+        self._f.write(array.tobytes())
+        self.rows += len(array)
+
+    def close(self):
+        self._f.seek(0)
+        self._f.write(self._header())
+        self._f.close()
+
+
+class PredictionWriter:
+    """Write predictions as JSONL (one line per row) and/or NPY arrays"""
+
+    def __init__(self, classifier, jsonl_path=None, npy_dir=None, top_k=3, save_probs=False):
+        self.classifier = classifier
+        self.top_k = top_k
+        self._jsonl = open(jsonl_path, 'w', encoding='utf-8') if jsonl_path else None
+        self._npy = {}
+        if npy_dir:
+            os.makedirs(npy_dir, exist_ok=True)
+            self._npy['predictions'] = NpyAppender(os.path.join(npy_dir, 'predictions.npy'), np.int32)
+            self._npy['confidences'] = NpyAppender(os.path.join(npy_dir, 'confidences.npy'), np.float32)
+            if save_probs:
+                self._npy['probabilities'] = NpyAppender(os.path.join(npy_dir, 'probabilities.npy'),
+                                                         np.float32, (classifier.num_classes,))
+
+    def write(self, records, probs, has_hand):
+        indices = np.where(has_hand, np.argmax(probs, axis=1), -1)
+        confidences = np.where(has_hand, probs.max(axis=1), 0.0)
+        if self._jsonl:
+            lines = []
+            for record, p, idx, conf, present in zip(records, probs, indices, confidences, has_hand):
+                out = dict(record)
+                if present:
+                    out['label'] = self.classifier.index_to_label[int(idx)]
+                    out['confidence'] = round(float(conf), 6)
+                    out['top_k'] = [[label, round(c, 6)] for label, c in self.classifier.top_k(p, self.top_k)]
+                else:
+                    out['label'] = None
+                    out['confidence'] = 0.0
+                    out['top_k'] = []
+                lines.append(json.dumps(out, ensure_ascii=False))
+            self._jsonl.write("\n".join(lines) + "\n")
+        if self._npy:
+            self._npy['predictions'].write(indices)
+            self._npy['confidences'].write(confidences)
+            if 'probabilities' in self._npy:
+                self._npy['probabilities'].write(np.where(has_hand[:, None], probs, 0.0))
+        return indices
+
+    def close(self):
+        if self._jsonl:
+            self._jsonl.close()
+        for appender in self._npy.values():
+            appender.close()
+
+
+# ========== Batch Runner ==========
+def run_batch_inference(chunks, classifier, writer=None):
+    """Score every chunk; returns summary stats (rows, rows with hands, accuracy if labelled)"""
+    label_to_index = {v: k for k, v in classifier.index_to_label.items()}
+    total, scored, correct, labelled = 0, 0, 0, 0
+    start = time.perf_counter()
+    for records, features in chunks:
+        has_hand = np.array([r['is_left'] or r['is_right'] for r in records], dtype=bool)
+        probs = np.zeros((len(records), classifier.num_classes), dtype=np.float32)
+        if has_hand.any():
+            probs[has_hand] = classifier.predict_proba(features[has_hand])
+        indices = np.where(has_hand, np.argmax(probs, axis=1), -1)
+        if writer is not None:
+            writer.write(records, probs, has_hand)
+
+        for record, idx, present in zip(records, indices, has_hand):
+            true_idx = label_to_index.get(record['true_label'])
+            if present and true_idx is not None:
+                labelled += 1
+                correct += int(idx == true_idx)
+        total += len(records)
+        scored += int(has_hand.sum())
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': total,
+        'scored_rows': scored,
+        'labelled_rows': labelled,
+        'accuracy': (correct / labelled) if labelled else None,
+        'seconds': elapsed,
+        'rows_per_second': (total / elapsed) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch inference over CSVs, landmark arrays or image folders")
+    parser.add_argument('input', help="data_both_hands.csv, a .npy landmark array or a folder of them,"
+                                      " or an image / image folder")
+    parser.add_argument('--jsonl', help="Write one JSON line per row to this file")
+    parser.add_argument('--npy-dir', help="Write predictions.npy / confidences.npy to this folder")
+    parser.add_argument('--save-probs', action='store_true', help="Also write probabilities.npy")
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--threads', type=int, default=None, help="Interpreter threads (default: all cores)")
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    parser.add_argument('--images', action='store_true', help="Treat input folder as images (runs MediaPipe)")
+    parser.add_argument('--backend', choices=("tflite", "forest"), default="tflite",
+                        help="Classifier: the TFLite MLP or the flattened RandomForest (.npz)")
+    parser.add_argument('--forest', default=None, help="Forest backend: random_forest_model.npz path")
+    parser.add_argument('--cascade', nargs='?', const="cascade_params.json", default=None,
+                        help="Answer confident rows with the nearest-centroid stage (cascade_params.json)")
+    args = parser.parse_args()
+
+    classifier = load_classifier(args.backend, args.model, args.scaler, args.labels,
+                                 batch_size=args.batch_size, num_threads=args.threads, forest_path=args.forest,
+                                 cascade_path=args.cascade)
+
+    extension = os.path.splitext(args.input)[1].lower() if os.path.isfile(args.input) else None
+    if extension in IMAGE_EXTENSIONS or (extension is None and args.images):
+        chunks = iter_image_chunks(args.input, args.batch_size)
+    elif extension is None or extension == '.npy':
+        chunks = iter_npy_chunks(args.input, args.batch_size)
+    else:
+        chunks = iter_csv_chunks(args.input, args.batch_size)
+
+    writer = PredictionWriter(classifier, args.jsonl, args.npy_dir, args.top_k, args.save_probs)
+    try:
+        summary = run_batch_inference(chunks, classifier, writer)
+    finally:
+        writer.close()
+
+    print(f" Scored {summary['scored_rows']}/{summary['rows']} rows in {summary['seconds']:.2f}s"
+          f" ({summary['rows_per_second'] or 0:.0f} rows/s)")
+    if summary['accuracy'] is not None:
+        print(f" Accuracy on {summary['labelled_rows']} labelled rows: {summary['accuracy']:.4f}")
+    if args.cascade:
+        print(f" Cascade: {classifier.first_stage} rows answered by the first stage,"
+              f" {classifier.escalated} escalated to {args.backend}")
+
+
+if __name__ == "__main__":
+    main()
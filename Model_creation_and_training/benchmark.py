@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+from landmark_features import LandmarkFeatureExtractor
+from sign_classifier import SignClassifier, MODEL_PATH, SCALER_PATH, LABEL_MAP_PATH
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StageTimer:
+    """Collects per-stage wall-clock samples (perf_counter) for one benchmark run"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        out = {}
+        for stage, values in self.samples.items():
+            ms = np.array(values) * 1000
+            out[stage] = {
+                "count": int(len(ms)),
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "p99_ms": float(np.percentile(ms, 99)),
+            }
+        return out
+
+
+# ========== Replay Sources ==========
+def iter_video_frames(path, limit=None):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    count = 0
+    try:
+        while limit is None or count < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            # Recorded sessions are raw camera frames: mirror them like the live loop
+            yield cv2.flip(frame, 1)
+            count += 1
+    finally:
+        cap.release()
+
+
+def iter_image_frames(folder, limit=None):
+    """Saved malayalam_isl_images frames in sorted (deterministic) order; already mirrored"""
+    import cv2
+    paths = sorted(os.path.join(root, name)
+                   for root, _, files in os.walk(folder)
+                   for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+    for path in paths[:limit]:
+        frame = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield frame
+
+
+def iter_feature_rows(source, limit=None):
+    """Landmark rows with a hand from a CSV or dataset store (skips MediaPipe entirely)"""
+    from dataset_store import DatasetStore
+    if os.path.isdir(source):
+        df = DatasetStore(source, read_only=True).to_dataframe()
+    else:
+        import pandas as pd
+        df = pd.read_csv(source, encoding='utf-8')
+    from landmark_features import FEATURE_COLUMNS
+    df = df[(df['is_left'] == 1) | (df['is_right'] == 1)]
+    features = df[FEATURE_COLUMNS].fillna(0).values
+    return iter(features[:limit])
+
+
+# ========== Benchmark ==========
+def run_benchmark(source, classifier, renderer=None, use_mediapipe=True, limit=None, warmup=10):
+    """Replay a source through the recognition stages and time each one"""
+    import cv2
+    timer = StageTimer()
+    extractor = LandmarkFeatureExtractor()
+    hands = None
+    if use_mediapipe:
+        import mediapipe as mp
+        static = os.path.isdir(source)
+        hands = mp.solutions.hands.Hands(static_image_mode=static, max_num_hands=2,
+                                         min_detection_confidence=0.7, min_tracking_confidence=0.5)
+        if os.path.isdir(source):
+            frames = iter_image_frames(source, limit)
+        else:
+            frames = iter_video_frames(source, limit)
+    else:
+        frames = iter_feature_rows(source, limit)
+
+    frames_seen, detections, index = 0, 0, 0
+    overlay_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    start_all = time.perf_counter()
+    while True:
+        frame_start = time.perf_counter()
+        try:
+            item = next(frames)
+        except StopIteration:
+            break
+        decode_seconds = time.perf_counter() - frame_start
+        record = frames_seen >= warmup
+        stages = {"decode": decode_seconds}
+
+        if hands is not None:
+            t = time.perf_counter()
+            rgb = cv2.cvtColor(item, cv2.COLOR_BGR2RGB)
+            result = hands.process(rgb)
+            stages["mediapipe"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            features = extractor.from_results(result)
+            stages["features"] = time.perf_counter() - t
+            has_hand = extractor.has_hand
+            overlay_target = item
+        else:
+            features, has_hand, overlay_target = item, True, overlay_frame
+
+        if has_hand:
+            detections += int(record)
+            t = time.perf_counter()
+            scaled = classifier.scale(features)
+            stages["scale"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            probs = classifier.predict_proba(scaled, prescaled=True)
+            stages["invoke"] = time.perf_counter() - t
+            index = int(np.argmax(probs[0]))
+
+            if renderer is not None:
+                t = time.perf_counter()
+                renderer.draw(overlay_target, f"അര്‍ത്ഥം: {classifier.index_to_label[index]}", (10, 50), 48)
+                stages["overlay"] = time.perf_counter() - t
+
+        stages["total"] = time.perf_counter() - frame_start
+        if record:
+            for stage, seconds in stages.items():
+                timer.add(stage, seconds)
+        frames_seen += 1
+    elapsed = time.perf_counter() - start_all
+    if hands is not None:
+        hands.close()
+
+    measured = max(0, frames_seen - warmup)
+    total_seconds = sum(timer.samples.get("total", []))
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": source,
+        "mediapipe": use_mediapipe,
+        "frames": measured,
+        "warmup_frames": min(warmup, frames_seen),
+        "frames_with_hand": detections,
+        "throughput_fps": (measured / total_seconds) if total_seconds > 0 else None,
+        "wall_seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": timer.summary(),
+        "platform": {"python": platform.python_version(), "machine": platform.machine(),
+                     "system": platform.system(), "cpus": os.cpu_count()},
+    }
+
+
+def compare(result, baseline, max_regression=0.10, min_delta_ms=0.05, metrics=("p50_ms", "p95_ms")):
+    """List of regression messages: stage latencies or throughput worse than baseline by > max_regression.
+
+    Slowdowns smaller than min_delta_ms are ignored so sub-microsecond stages do not flap.
+    """
+    failures = []
+    for stage, stats in result["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old:
+            continue
+        for metric in metrics:
+            if (old[metric] > 0 and stats[metric] > old[metric] * (1 + max_regression)
+                    and stats[metric] - old[metric] > min_delta_ms):
+                failures.append(f"{stage}.{metric}: {old[metric]:.3f} -> {stats[metric]:.3f} ms"
+                                f" (+{(stats[metric] / old[metric] - 1) * 100:.1f}%)")
+    old_fps, new_fps = baseline.get("throughput_fps"), result.get("throughput_fps")
+    if old_fps and new_fps and new_fps < old_fps * (1 - max_regression):
+        failures.append(f"throughput_fps: {old_fps:.1f} -> {new_fps:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded input through the recognition pipeline and time each stage")
+    parser.add_argument('source', help="Video file, image folder (e.g. malayalam_isl_images), "
+                                       "or with --no-mediapipe a CSV / dataset store folder")
+    parser.add_argument('--no-mediapipe', action='store_true', help="Replay stored landmark rows instead of frames")
+    parser.add_argument('--no-overlay', action='store_true', help="Skip the text overlay stage")
+    parser.add_argument('--limit', type=int, default=None, help="Max frames to replay")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=1, help="Interpreter threads")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--baseline', help="Previous results JSON to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.10,
+                        help="Allowed relative slowdown per stage before failing (default 0.10 = 10%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help="Ignore per-stage slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    classifier = SignClassifier(args.model, args.scaler, args.labels, num_threads=args.threads)
+    renderer = None
+    if not args.no_overlay:
+        from text_overlay import MalayalamTextRenderer
+        renderer = MalayalamTextRenderer()
+        renderer.preload([f"അര്‍ത്ഥം: {label}" for label in classifier.index_to_label.values()], 48)
+
+    result = run_benchmark(args.source, classifier, renderer, use_mediapipe=not args.no_mediapipe,
+                           limit=args.limit, warmup=args.warmup)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"\n Benchmark: {result['frames']} frames, {result['frames_with_hand']} with a hand,"
+          f" {result['throughput_fps'] or 0:.1f} fps, peak RSS {result['peak_rss_mb'] or 0:.0f} MB")
+    print(f" {'stage':10s} {'count':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for stage, stats in result["stages"].items():
+        print(f" {stage:10s} {stats['count']:7d} {stats['p50_ms']:9.3f} {stats['p95_ms']:9.3f} {stats['p99_ms']:9.3f}")
+    print(f" Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = compare(result, baseline, args.max_regression, args.min_delta_ms)
+        if failures:
+            print(f"\n Regressions vs {args.baseline} (commit {baseline.get('commit')}):")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print(f" No regressions vs {args.baseline} (commit {baseline.get('commit')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 import cv2
 import mediapipe as mp
-import numpy as np
-import csv
 import os
 import time
-from PIL import Image, ImageDraw, ImageFont
-import pandas as pd
+from capture_quality import SampleGate, detection_confidence
+from detection_frontend import AdaptiveHandDetector
+from landmark_features import LandmarkFeatureExtractor
+from text_overlay import MalayalamTextRenderer
+from dataset_writer import AsyncDatasetWriter
+from dataset_store import DatasetStore, DATASET_DIR
 
 malayalam_alphabets = [
 
@@ -36,51 +38,38 @@ print("Alphabets:", malayalam_alphabets)
 
 
 
-# ========== PIL-based Malayalam Text Renderer ==========
-def draw_malayalam_text(frame, text, position, font_path='NotoSansMalayalam-VariableFont_wdth,wght.ttf', font_size=32):
-    image_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-    draw = ImageDraw.Draw(image_pil)
-    try:
-        font = ImageFont.truetype(font_path, font_size)
-    except IOError:
-        print("⚠️ Font file not found. Please place 'NotoSansMalayalam-Regular.ttf' in the working directory.")
-        return frame
-    draw.text(position, text, font=font, fill=(0, 255, 0))
-    return cv2.cvtColor(np.array(image_pil), cv2.COLOR_RGB2BGR)
+# ========== Cached Malayalam Text Renderer ==========
+text_renderer = MalayalamTextRenderer()
+text_renderer.preload([f"Next Letter {letter}" for letter in malayalam_alphabets], font_size=32)
+text_renderer.preload([f"Letter: {letter}" for letter in malayalam_alphabets], font_size=64)
+text_renderer.preload([f"Prepare: {n}" for n in range(1, 4)], font_size=48)
+text_renderer.preload([f"{n} Seconds" for n in range(1, 6)], font_size=32)
+
+def draw_malayalam_text(frame, text, position, font_size=32):
+    return text_renderer.draw(frame, text, position, font_size)
 
 # ========== Helper Functions ==========
-def get_captured_letters(csv_filename):
-    """Get list of letters that have been captured in CSV"""
-    if not os.path.exists(csv_filename):
-        return []
-    
-    try:
-        df = pd.read_csv(csv_filename, encoding='utf-8')
-        captured = df['label'].unique().tolist()
-        return captured
-    except:
-        return []
+def get_captured_letters(store):
+    """Get list of letters that have been captured in the dataset"""
+    return store.labels()
 
 def get_letters_to_capture(all_letters, captured_letters):
     """Get list of letters that still need to be captured"""
     return [letter for letter in all_letters if letter not in captured_letters]
 
-def remove_letter_data(csv_filename, letter):
-    """Remove all data for a specific letter from CSV"""
-    if not os.path.exists(csv_filename):
-        return
-    
-    try:
-        df = pd.read_csv(csv_filename, encoding='utf-8')
-        df = df[df['label'] != letter]
-        df.to_csv(csv_filename, index=False, encoding='utf-8')
-        print(f" Removed existing data for '{letter}' from CSV")
-    except Exception as e:
-        print(f" Error removing data: {e}")
-
-def get_next_letter_to_capture(all_letters, csv_filename):
-    """Get the next letter to capture based on what's already in CSV"""
-    captured_letters = get_captured_letters(csv_filename)
+def remove_letter_data(store, letter, image_folder):
+    """Remove all data and images for a specific letter (one tombstone in the dataset log)"""
+    gesture_folder = os.path.join(image_folder, letter)
+    had_images = os.path.exists(gesture_folder)
+    removed = store.delete_label(letter, image_folder=gesture_folder)
+    if removed:
+        print(f" Removed existing data for '{letter}' from dataset")
+    if had_images:
+        print(f" Removed existing images for '{letter}'")
+
+def get_next_letter_to_capture(all_letters, store):
+    """Get the next letter to capture based on what's already in the dataset"""
+    captured_letters = get_captured_letters(store)
     
     for letter in all_letters:
         if letter not in captured_letters:
@@ -88,55 +77,70 @@ def get_next_letter_to_capture(all_letters, csv_filename):
     
     return None  # All letters captured
 
-def remove_letter_images(image_folder, letter):
-    """Remove all images for a specific letter"""
-    gesture_folder = os.path.join(image_folder, letter)
-    if os.path.exists(gesture_folder):
-        import shutil
-        shutil.rmtree(gesture_folder)
-        print(f" Removed existing images for '{letter}'")
-
-# ========== Create/Open CSV ==========
+# ========== Create/Open Dataset ==========
 # csv_filename2 = "Consonants.csv"
 csv_filename = "data_both_hands.csv"
 image_folder = "malayalam_isl_images"
 if not os.path.exists(image_folder):
     os.makedirs(image_folder)
 
-def initialize_csv():
-    """Initialize CSV with headers if it doesn't exist"""
-    if not os.path.exists(csv_filename):
-        with open(csv_filename, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            header = ['label', 'image_path', 'is_left', 'is_right']
-            for hand_prefix in ['L', 'R']:
-                header += [f'{hand_prefix}_x{i}' for i in range(21)]
-                header += [f'{hand_prefix}_y{i}' for i in range(21)]
-                header += [f'{hand_prefix}_z{i}' for i in range(21)]
-            writer.writerow(header)
-
-    # if not os.path.exists(csv_filename2):
-    #     with open(csv_filename2, mode='w', newline='', encoding='utf-8') as f:
-    #         writer = csv.writer(f)
-    #         header = ['label', 'image_path', 'is_left', 'is_right']
-    #         for hand_prefix in ['L', 'R']:
-    #             header += [f'{hand_prefix}_x{i}' for i in range(21)]
-    #             header += [f'{hand_prefix}_y{i}' for i in range(21)]
-    #             header += [f'{hand_prefix}_z{i}' for i in range(21)]
-    #         writer.writerow(header)
-
-initialize_csv()
+# Checked before DatasetStore() runs: once a manifest exists the store is the source of
+# truth, even if every label was deleted (re-importing would resurrect deleted rows)
+store_is_new = not DatasetStore.exists(DATASET_DIR)
+dataset_store = DatasetStore(DATASET_DIR)
+
+def initialize_dataset():
+    """Import an existing data_both_hands.csv the first time the dataset store is used"""
+    if store_is_new and os.path.exists(csv_filename):
+        imported = dataset_store.import_csv(csv_filename)
+        print(f" Imported {imported} rows from {csv_filename} into {DATASET_DIR}")
+
+initialize_dataset()
+dataset_writer = AsyncDatasetWriter(store=dataset_store)
+
+def flush_letter_data(label):
+    """Wait for the background writer to finish this letter's images and rows"""
+    written = dataset_writer.flush_letter()
+    if dataset_writer.errors:
+        print(f" {len(dataset_writer.errors)} image(s) failed to save for '{label}'")
+        dataset_writer.errors.clear()
+    print(f" Saved {written} rows for '{label}' (max writer wait {dataset_writer.max_submit_wait * 1000:.1f} ms)")
+
+def report_letter_quality(label, status):
+    """Print and remember how many candidate frames the quality gate rejected for this letter"""
+    report = dict(sample_gate.summary(), status=status)
+    capture_reports[label] = report
+    print(f" Kept {report['kept']} samples, rejected {report['reject_rate']:.0%} of candidates"
+          f" (no hand {report['no_hand']}, low confidence {report['low_confidence']}, duplicate {report['duplicate']})")
 
 # ========== MediaPipe Setup ==========
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+# Saved rows always come from a full-resolution detection; only the preview frames
+# between samples (candidates are taken at CANDIDATE_RATE per second) are extrapolated
+DETECTION_WIDTH = None
+DETECTION_STRIDE = 3
+detector = AdaptiveHandDetector(hands, width=DETECTION_WIDTH, stride=DETECTION_STRIDE)
+extractor = LandmarkFeatureExtractor()
+
+# ========== Sample Quality Gate ==========
+# Frames without a confident hand, or too close to a recently kept pose, are not saved;
+# candidates are taken at CANDIDATE_RATE per second until SAMPLES_PER_LETTER are kept
+SAMPLES_PER_LETTER = 100
+CANDIDATE_RATE = 15
+MAX_CAPTURE_SECONDS = 60
+sample_gate = SampleGate(min_confidence=0.8, min_distance=0.004)
+capture_reports = {}
+
+# capture_letter_data results: incomplete = stopped (time limit / camera) short of SAMPLES_PER_LETTER
+CAPTURE_COMPLETE, CAPTURE_INCOMPLETE, CAPTURE_INTERRUPTED = "complete", "incomplete", "interrupted"
 
 # ========== Video Capture ==========
 cap = cv2.VideoCapture(0)
 
 def capture_letter_data(label):
-    """Capture data for a specific letter"""
+    """Capture data for a specific letter; returns CAPTURE_COMPLETE, CAPTURE_INCOMPLETE or CAPTURE_INTERRUPTED"""
     print(f"\n Preparing to capture '{label}'... Get ready!")
     gesture_folder = os.path.join(image_folder, label)
     if not os.path.exists(gesture_folder):
@@ -153,58 +157,37 @@ def capture_letter_data(label):
         cv2.imshow("Malayalam ISL Data Collection", frame)
         cv2.waitKey(1000)
 
-    print(f"\n Collecting data for '{label}' (10 sec, 100 images)...")
+    print(f"\n Collecting {SAMPLES_PER_LETTER} samples for '{label}' (up to {MAX_CAPTURE_SECONDS} sec)...")
     frame_count = 0
+    candidates = 0
+    sample_gate.reset()
     start_time = time.time()
 
-    while frame_count < 100:
+    while frame_count < SAMPLES_PER_LETTER:
         ret, frame = cap.read()
         if not ret:
             break
 
         frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb_frame)
-
         elapsed_time = time.time() - start_time
-        target_frame = int(elapsed_time * 10)
-
-        if frame_count < target_frame:
-            coords = {'Left': {'x': [0]*21, 'y': [0]*21, 'z': [0]*21},
-                      'Right': {'x': [0]*21, 'y': [0]*21, 'z': [0]*21}}
-            is_left, is_right = 0, 0
-
-            if result.multi_hand_landmarks and result.multi_handedness:
-                for idx, hand_landmark in enumerate(result.multi_hand_landmarks):
-                    hand_label = result.multi_handedness[idx].classification[0].label  # 'Left' or 'Right'
-                    if hand_label == 'Left': is_left = 1
-                    if hand_label == 'Right': is_right = 1
-
-                    landmarks = hand_landmark.landmark
-                    wrist = landmarks[0]
-
-                    coords[hand_label]['x'] = [lm.x - wrist.x for lm in landmarks]
-                    coords[hand_label]['y'] = [lm.y - wrist.y for lm in landmarks]
-                    coords[hand_label]['z'] = [lm.z - wrist.z for lm in landmarks]
-
-                    mp_drawing.draw_landmarks(frame, hand_landmark, mp_hands.HAND_CONNECTIONS)
-
-            # Save image
-            image_filename = f"{label}_{frame_count}.jpg"
-            image_path = os.path.join(gesture_folder, image_filename)
-            is_success, buffer = cv2.imencode(".jpg", frame)
-            if is_success:
-                with open(image_path, "wb") as f:
-                    f.write(buffer)
-
-            # Save to CSV
-            with open(csv_filename, mode='a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                row = [label, image_path, is_left, is_right]
-                for hand in ['Left', 'Right']:
-                    for axis in ['x', 'y', 'z']:
-                        row += coords[hand][axis]
-                writer.writerow(row)
+        if elapsed_time > MAX_CAPTURE_SECONDS:
+            print(f" Time limit reached with {frame_count}/{SAMPLES_PER_LETTER} samples")
+            break
+        target_frame = int(elapsed_time * CANDIDATE_RATE)
+        sample_due = candidates < target_frame
+        result = detector.process(frame, force=sample_due)
+
+        if sample_due:
+            candidates += 1
+            features = extractor.from_results(result)
+            if sample_gate.check(features, extractor.has_hand, detection_confidence(result)) is None:
+                # Queue the clean frame + CSV row for the background writer (copy: the
+                # landmark and progress overlays below draw on this frame; keeping saved
+                # images overlay-free lets reextract_landmarks.py re-detect from them)
+                image_filename = f"{label}_{frame_count}.jpg"
+                image_path = os.path.join(gesture_folder, image_filename)
+                dataset_writer.submit(extractor.csv_row(label, image_path), image_path, frame.copy())
+                frame_count += 1
 
             # with open(csv_filename2, mode='a', newline='', encoding='utf-8') as f:
             #     writer = csv.writer(f)
@@ -214,11 +197,13 @@ def capture_letter_data(label):
             #             row += coords[hand][axis]
             #     writer.writerow(row)
 
-            frame_count += 1
+        if result.multi_hand_landmarks:
+            for hand_landmark in result.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(frame, hand_landmark, mp_hands.HAND_CONNECTIONS)
 
         # Display progress
-        frame = draw_malayalam_text(frame, f"Letter : {label} | Captured : {frame_count}/100", (10, 50))
-        progress = int((frame_count / 100) * 400)
+        frame = draw_malayalam_text(frame, f"Letter : {label} | Captured : {frame_count}/{SAMPLES_PER_LETTER}", (10, 50))
+        progress = int((frame_count / SAMPLES_PER_LETTER) * 400)
         cv2.rectangle(frame, (10, 100), (410, 120), (50, 50, 50), -1)
         cv2.rectangle(frame, (10, 100), (10 + progress, 120), (0, 255, 0), -1)
         
@@ -226,17 +211,25 @@ def capture_letter_data(label):
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             print(" Capture interrupted by user")
-            return False
-
+            flush_letter_data(label)
+            report_letter_quality(label, CAPTURE_INTERRUPTED)
+            return CAPTURE_INTERRUPTED
+
+    flush_letter_data(label)
+    if frame_count < SAMPLES_PER_LETTER:
+        report_letter_quality(label, CAPTURE_INCOMPLETE)
+        print(f" Data collection incomplete for '{label}': {frame_count}/{SAMPLES_PER_LETTER} samples")
+        return CAPTURE_INCOMPLETE
+    report_letter_quality(label, CAPTURE_COMPLETE)
     print(f" Data collection complete for '{label}'")
-    return True
+    return CAPTURE_COMPLETE
 
 print("\n Malayalam ISL Data Collection")
 print("=" * 50)
 
 while True:
     # Get current status
-    captured_letters = get_captured_letters(csv_filename)
+    captured_letters = get_captured_letters(dataset_store)
     letters_to_capture = get_letters_to_capture(malayalam_alphabets, captured_letters)
     
     print(f"\n Status:")
@@ -273,14 +266,13 @@ while True:
             #     continue
             
             # Remove existing data for this letter
-            remove_letter_data(csv_filename, label)
-            remove_letter_images(image_folder, label)
+            remove_letter_data(dataset_store, label, image_folder)
             
             # remove_letter_data(csv_filename2, label)
 
             # Capture new data
-            success = capture_letter_data(label)
-            if success:
+            status = capture_letter_data(label)
+            if status == CAPTURE_COMPLETE:
                 print(f" Successfully captured data for '{label}'")
             else:
                 print(f" Data capture incomplete for '{label}'")
@@ -303,9 +295,9 @@ while True:
             
         for i, label in enumerate(letters_to_capture):
             print(f"\n Progress: {i+1}/{len(letters_to_capture)}")
-            success = capture_letter_data(label)
+            status = capture_letter_data(label)
             
-            if not success:
+            if status == CAPTURE_INTERRUPTED:
                 print(" Continuous capture interrupted")
                 break
                 
@@ -346,14 +338,22 @@ while True:
         print(" Invalid choice!")
 
 # Cleanup
+dataset_writer.close()
 cap.release()
 cv2.destroyAllWindows()
 print("\n Malayalam ISL Data Collection Session Ended!")
 print(f" Images saved in: {image_folder}")
-print(f" Data saved in: {csv_filename}")
+print(f" Data saved in: {DATASET_DIR} (export to CSV with: python dataset_store.py export {csv_filename})")
+
+if capture_reports:
+    print(f"\n Reject rate per letter (this session):")
+    for letter, report in capture_reports.items():
+        print(f"   {letter}: {report['reject_rate']:.0%} of {report['candidates']} candidates"
+              + (f" -- {report['status']} ({report['kept']}/{SAMPLES_PER_LETTER} kept)"
+                 if report['status'] != CAPTURE_COMPLETE else ""))
 
 # Final summary
-final_captured = get_captured_letters(csv_filename)
+final_captured = get_captured_letters(dataset_store)
 print(f"\n Final Summary:")
 print(f"   Total captured: {len(final_captured)}/{len(malayalam_alphabets)} letters")
 if len(final_captured) == len(malayalam_alphabets):
@@ -0,0 +1,70 @@
+import numpy as np
+
+from landmark_features import NUM_FEATURES
+
+
+def detection_confidence(result):
+    """Lowest handedness score among the detected hands (0.0 when there is no hand)"""
+    if not result.multi_handedness:
+        return 0.0
+    return min(handedness.classification[0].score for handedness in result.multi_handedness)
+
+
+class SampleGate:
+    """Decides whether a captured frame is worth keeping.
+
+    A frame is rejected when no hand is detected, when the detector is less than
+    `min_confidence` sure of a hand, or when its features are within `min_distance`
+    (RMS over the 126 wrist-relative coordinates) of one of the last `memory` kept
+    samples, i.e. a held pose that adds nothing new to the dataset.
+    """
+
+    REASONS = ("no_hand", "low_confidence", "duplicate")
+
+    def __init__(self, min_confidence=0.8, min_distance=0.004, memory=10):
+        self.min_confidence = min_confidence
+        self.min_distance = min_distance
+        self._recent = np.zeros((memory, NUM_FEATURES))
+        self._count = 0
+        self.kept = 0
+        self.rejected = dict.fromkeys(self.REASONS, 0)
+
+    def reset(self):
+        """Start a new letter: forget recent samples and counts"""
+        self._count = 0
+        self.kept = 0
+        self.rejected = dict.fromkeys(self.REASONS, 0)
+
+    def nearest_distance(self, features):
+        """RMS distance to the closest recently kept sample (inf when none is kept yet)"""
+        recent = self._recent[:min(self._count, len(self._recent))]
+        if len(recent) == 0:
+            return np.inf
+        return float(np.sqrt(np.min(np.mean((recent - features) ** 2, axis=1))))
+
+    def check(self, features, has_hand, confidence=1.0):
+        """None when the sample is kept (and remembered), otherwise the reject reason"""
+        if not has_hand:
+            reason = "no_hand"
+        elif confidence < self.min_confidence:
+            reason = "low_confidence"
+        elif self.nearest_distance(features) < self.min_distance:
+            reason = "duplicate"
+        else:
+            self._recent[self._count % len(self._recent)] = features
+            self._count += 1
+            self.kept += 1
+            return None
+        self.rejected[reason] += 1
+        return reason
+
+    @property
+    def candidates(self):
+        return self.kept + sum(self.rejected.values())
+
+    @property
+    def reject_rate(self):
+        return sum(self.rejected.values()) / self.candidates if self.candidates else 0.0
+
+    def summary(self):
+        return {"candidates": self.candidates, "kept": self.kept, "reject_rate": self.reject_rate, **self.rejected}
@@ -0,0 +1,118 @@
+import json
+import numpy as np
+
+CASCADE_PATH = "cascade_params.json"
+
+
+# ========== Nearest-centroid first stage ==========
+def fit_centroids(X_scaled, y, num_classes):
+    """Per-class mean of the scaled training features"""
+    return np.stack([X_scaled[y == i].mean(axis=0) for i in range(num_classes)])
+
+
+def centroid_distances(X_scaled, centroids):
+    """Squared Euclidean distance of every row to every centroid, (N, C)"""
+    return ((X_scaled ** 2).sum(axis=1)[:, None] - 2 * X_scaled @ centroids.T
+            + (centroids ** 2).sum(axis=1)[None, :])
+
+
+def top2_margin(distances):
+    """(nearest class, gap between second-nearest and nearest distance) per row"""
+    nearest = np.argmin(distances, axis=1)
+    two = np.partition(distances, 1, axis=1)[:, :2]
+    return nearest, two[:, 1] - two[:, 0]
+
+
+def calibrate_threshold(margins, first_pred, full_pred, y, target_accuracy):
+    """Smallest margin threshold whose cascade accuracy (first stage when margin >= threshold,
+    full model otherwise) still reaches target_accuracy on the held-out rows.
+
+    Returns (threshold, cascade_accuracy, first_stage_rate).
+    """
+    order = np.argsort(-margins, kind="stable")
+    sorted_margins = margins[order]
+    first_correct = np.concatenate([[0], np.cumsum(first_pred[order] == y[order])])
+    full_correct = np.concatenate([np.cumsum((full_pred[order] == y[order])[::-1])[::-1], [0]])
+    # Accepting the top k rows: only valid where k ends a run of tied margins
+    accepted = np.concatenate([[0], np.flatnonzero(np.diff(sorted_margins) != 0) + 1, [len(y)]])
+    accuracy = (first_correct[accepted] + full_correct[accepted]) / len(y)
+    passing = np.flatnonzero(accuracy >= target_accuracy)
+    if len(passing) == 0:
+        return float("inf"), float(accuracy[0]), 0.0
+    best = passing[-1]
+    k = accepted[best]
+    threshold = float(sorted_margins[k - 1]) if k > 0 else float("inf")
+    return threshold, float(accuracy[best]), k / len(y)
+
+
+def save_cascade(centroids, scaler_mean, scaler_scale, threshold, stats, path=CASCADE_PATH):
+    params = {"centroids": centroids.tolist(), "mean": list(map(float, scaler_mean)),
+              "scale": list(map(float, scaler_scale)), "threshold": threshold}
+    params.update(stats)
+    with open(path, "w") as f:
+        json.dump(params, f)
+
+
+# ========== Cascade ==========
+class CascadeClassifier:
+    """Nearest-centroid first stage; rows whose top-2 distance margin is below the calibrated
+    threshold are escalated to the full classifier (SignClassifier or ForestClassifier).
+
+    The scaler is folded into the centroid distances, so raw features need no standardization
+    pass: sum(((x - m) / s - c)^2) = x^2 . w - 2 x . (w * c') + sum(w * c'^2), with w = 1 / s^2
+    and raw-space centroids c' = m + s * c.
+    """
+
+    def __init__(self, classifier, cascade_path=CASCADE_PATH):
+        with open(cascade_path, "r") as f:
+            params = json.load(f)
+        self.classifier = classifier
+        self.centroids = np.array(params["centroids"])
+        self.threshold = params["threshold"]
+        mean, scale = np.array(params["mean"]), np.array(params["scale"])
+        raw_centroids = mean + scale * self.centroids
+        self._weights = 1.0 / scale ** 2
+        self._weighted_centroids = (raw_centroids * self._weights).T
+        self._centroid_norms = (raw_centroids ** 2 * self._weights).sum(axis=1)
+        self.num_classes = classifier.num_classes
+        self.index_to_label = classifier.index_to_label
+        self.folded = classifier.folded
+        self.first_stage = 0
+        self.escalated = 0
+
+    def scale(self, X):
+        return self.classifier.scale(X)
+
+    def _distances(self, X, prescaled):
+        # A folded classifier's scale() passes raw features through, so "prescaled" rows
+        # are still raw and take the raw-space path
+        if prescaled and not self.folded:
+            return centroid_distances(X, self.centroids)
+        return (X ** 2 @ self._weights)[:, None] - 2 * X @ self._weighted_centroids + self._centroid_norms
+
+    def predict_proba(self, X, prescaled=False):
+        """Class probabilities; first-stage rows get exp(-d / 2) normalized over the centroids"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        distances = self._distances(X, prescaled)
+        _, margins = top2_margin(distances)
+        logits = -0.5 * (distances - distances.min(axis=1, keepdims=True))
+        probs = np.exp(logits)
+        probs = (probs / probs.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        escalate = margins < self.threshold
+        if escalate.any():
+            probs[escalate] = self.classifier.predict_proba(X[escalate], prescaled=prescaled)
+        self.escalated += int(escalate.sum())
+        self.first_stage += int(len(X) - escalate.sum())
+        return probs
+
+    def predict(self, X, prescaled=False):
+        """Return (predicted indices, confidences)"""
+        probs = self.predict_proba(X, prescaled=prescaled)
+        indices = np.argmax(probs, axis=1)
+        return indices, probs[np.arange(len(probs)), indices]
+
+    def top_k(self, probs, k=3):
+        return self.classifier.top_k(probs, k)
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import numpy as np
+import tensorflow as tf
+
+from train_models import (CSV_PATH, load_dataframe, prepare_features, scale_and_split, build_mlp, train_mlp,
+                          convert_to_tflite, run_tflite, measure_tflite_latency)
+
+OUTPUT_DIR = "compressed_models"
+
+
+# ========== Teacher ==========
+def soften(probs, temperature):
+    """Teacher probabilities re-softened at `temperature` (softmax of log-probs / T)"""
+    logits = np.log(np.clip(probs, 1e-8, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    soft = np.exp(logits)
+    return (soft / soft.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def train_teacher(X_train, y_train, X_test, y_test, num_classes, ensemble_rf=False):
+    """The train_models.py network, optionally averaged with a RandomForest.
+
+    Returns (teacher_model, predict_proba) where predict_proba(X) gives the teacher's probabilities.
+    """
+    teacher = build_mlp(X_train.shape[1], num_classes)
+    train_mlp(teacher, X_train, y_train, X_test, y_test, verbose=0)
+    if not ensemble_rf:
+        return teacher, lambda X: teacher.predict(X, verbose=0)
+
+    from sklearn.ensemble import RandomForestClassifier
+    rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    rf_model.fit(X_train, y_train)
+
+    def predict_proba(X):
+        rf_probs = np.zeros((len(X), num_classes), dtype=np.float32)
+        rf_probs[:, rf_model.classes_] = rf_model.predict_proba(X)
+        return (teacher.predict(X, verbose=0) + rf_probs) / 2
+    return teacher, predict_proba
+
+
+# ========== Students ==========
+def hidden_layout(model):
+    """[(dense, batch_norm or None, dropout_rate)] for every hidden Dense layer of a build_mlp model"""
+    layers = model.layers
+    layout = []
+    for i, layer in enumerate(layers[:-1]):
+        if not isinstance(layer, tf.keras.layers.Dense):
+            continue
+        batch_norm, rate = None, 0.0
+        for follower in layers[i + 1:]:
+            if isinstance(follower, tf.keras.layers.Dense):
+                break
+            if isinstance(follower, tf.keras.layers.BatchNormalization):
+                batch_norm = follower
+            elif isinstance(follower, tf.keras.layers.Dropout):
+                rate = follower.rate
+        layout.append((layer, batch_norm, rate))
+    return layout
+
+
+def prune_neurons(model, keep_fraction):
+    """Magnitude-prune whole neurons: keep the `keep_fraction` of each hidden layer with the
+    largest L1 incoming weight norm and return a smaller logits model with the surviving weights.
+
+    Removing neurons (rather than zeroing single weights) shrinks the dense kernels TFLite
+    actually runs, so the pruned model is faster as well as smaller.
+    """
+    layout = hidden_layout(model)
+    output = model.layers[-1]
+    hidden_units, dropout, weights = [], [], []
+    keep_prev = None
+    for dense, batch_norm, rate in layout:
+        kernel, bias = dense.get_weights()
+        if keep_prev is not None:
+            kernel = kernel[keep_prev]
+        units = max(1, int(round(kernel.shape[1] * keep_fraction)))
+        keep = np.sort(np.argsort(-np.abs(kernel).sum(axis=0))[:units])
+        weights.append([kernel[:, keep], bias[keep]])
+        if batch_norm is not None:
+            weights.append([w[keep] for w in batch_norm.get_weights()])
+        hidden_units.append(units)
+        dropout.append(rate)
+        keep_prev = keep
+    kernel, bias = output.get_weights()
+    weights.append([kernel[keep_prev], bias])
+
+    pruned = build_mlp(model.input_shape[-1], kernel.shape[1], hidden_units, dropout,
+                       batch_norm=any(bn is not None for _, bn, _ in layout), output_activation=None)
+    weighted = [layer for layer in pruned.layers if layer.weights]
+    for layer, layer_weights in zip(weighted, weights):
+        layer.set_weights(layer_weights)
+    return pruned
+
+
+def distillation_loss(num_classes, temperature, alpha):
+    """alpha * hard-label cross-entropy + (1 - alpha) * T^2 * KL(teacher || student) on logits.
+
+    y_true is [one-hot labels | softened teacher probabilities].
+    """
+    def loss(y_true, logits):
+        hard, soft = y_true[:, :num_classes], y_true[:, num_classes:]
+        ce = tf.nn.softmax_cross_entropy_with_logits(hard, logits)
+        kd = tf.reduce_sum(soft * (tf.math.log(soft + 1e-8) - tf.nn.log_softmax(logits / temperature)), axis=-1)
+        return alpha * ce + (1 - alpha) * kd * temperature ** 2
+    return loss
+
+
+def distill(student, X_train, y_train, soft_train, X_test, y_test, soft_test, temperature=4.0, alpha=0.3,
+            epochs=100, batch_size=32, learning_rate=0.001):
+    num_classes = soft_train.shape[1]
+    targets_train = np.hstack([np.eye(num_classes, dtype=np.float32)[y_train], soft_train])
+    targets_test = np.hstack([np.eye(num_classes, dtype=np.float32)[y_test], soft_test])
+    student.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+                    loss=distillation_loss(num_classes, temperature, alpha))
+    student.fit(X_train, targets_train, validation_data=(X_test, targets_test),
+                epochs=epochs, batch_size=batch_size, verbose=0,
+                callbacks=[tf.keras.callbacks.EarlyStopping(patience=15, restore_best_weights=True),
+                           tf.keras.callbacks.ReduceLROnPlateau(patience=10, factor=0.5)])
+    return student
+
+
+def with_softmax(logits_model):
+    """Deployable model: same input as model.tflite, probabilities out"""
+    return tf.keras.Sequential([tf.keras.layers.Input(shape=(logits_model.input_shape[-1],)),
+                                logits_model, tf.keras.layers.Softmax()])
+
+
+# ========== Pareto set ==========
+def pareto_front(results):
+    """Names of candidates not beaten on accuracy, latency and size all at once"""
+    front = []
+    for r in results:
+        dominated = any(o["accuracy"] >= r["accuracy"] and o["latency_ms"] <= r["latency_ms"]
+                        and o["size_bytes"] <= r["size_bytes"]
+                        and (o["accuracy"], o["latency_ms"], o["size_bytes"])
+                        != (r["accuracy"], r["latency_ms"], r["size_bytes"])
+                        for o in results)
+        if not dominated:
+            front.append(r["name"])
+    return front
+
+
+def evaluate_candidate(kind, logits_model, deploy_model, X_test, y_test, output_dir, prefix=None):
+    """Export one candidate as <output_dir>/<name>.tflite and measure it"""
+    hidden_units = [layer.units for layer, _, _ in hidden_layout(logits_model)]
+    name = f"{prefix or kind}_" + "-".join(str(u) for u in hidden_units)
+    tflite_model = convert_to_tflite(deploy_model)
+    path = os.path.join(output_dir, f"{name}.tflite")
+    with open(path, "wb") as f:
+        f.write(tflite_model)
+    accuracy = float(np.mean(np.argmax(run_tflite(tflite_model, X_test), axis=1) == y_test))
+    result = {"name": name, "kind": kind, "hidden_units": hidden_units, "path": path,
+              "size_bytes": len(tflite_model), "latency_ms": measure_tflite_latency(tflite_model),
+              "accuracy": accuracy}
+    print(f"  {name:24s} acc={accuracy:.4f} size={result['size_bytes'] / 1024:7.1f}KB"
+          f" latency={result['latency_ms']:.4f}ms")
+    return result
+
+
+def compress(csv_path=CSV_PATH, output_dir=OUTPUT_DIR, students=((128, 64), (64, 32), (32,)),
+             keep_fractions=(0.5, 0.25), temperature=4.0, alpha=0.3, epochs=100, ensemble_rf=False):
+    """Train a teacher, distill students and pruned teachers, export each as TFLite and report the Pareto set"""
+    df = load_dataframe(csv_path)
+    if df is None:
+        raise SystemExit(1)
+    X, y_encoded, label_encoder, _, _ = prepare_features(df, verbose=False)
+    scaler, X_train, X_test, y_train, y_test = scale_and_split(X, y_encoded)
+    num_classes = len(label_encoder.classes_)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"\n Training teacher{' (MLP + RandomForest ensemble)' if ensemble_rf else ''}...")
+    teacher, teacher_proba = train_teacher(X_train, y_train, X_test, y_test, num_classes, ensemble_rf)
+    soft_train = soften(teacher_proba(X_train), temperature)
+    soft_test = soften(teacher_proba(X_test), temperature)
+
+    print(f"\n Compressing...")
+    results = [evaluate_candidate("teacher", teacher, teacher, X_test, y_test, output_dir)]
+    for hidden_units in students:
+        student = build_mlp(X_train.shape[1], num_classes, hidden_units, output_activation=None)
+        distill(student, X_train, y_train, soft_train, X_test, y_test, soft_test, temperature, alpha, epochs)
+        results.append(evaluate_candidate("distilled", student, with_softmax(student), X_test, y_test, output_dir,
+                                          prefix="student"))
+    for keep_fraction in keep_fractions:
+        pruned = prune_neurons(teacher, keep_fraction)
+        # Fine-tune the surviving neurons against the teacher
+        distill(pruned, X_train, y_train, soft_train, X_test, y_test, soft_test, temperature, alpha, epochs)
+        results.append(evaluate_candidate("pruned", pruned, with_softmax(pruned), X_test, y_test, output_dir,
+                                          prefix=f"pruned{int(round(keep_fraction * 100))}"))
+
+    front = pareto_front(results)
+    for r in results:
+        r["pareto"] = r["name"] in front
+
+    # Every candidate consumes the same scaled features and emits the same label indices
+    with open(os.path.join(output_dir, "scaler_params.json"), "w") as f:
+        json.dump({"mean": scaler.mean_.tolist(), "scale": scaler.scale_.tolist()}, f)
+    with open(os.path.join(output_dir, "label_map.json"), "w", encoding="utf-8") as f:
+        json.dump({int(i): label for i, label in enumerate(label_encoder.classes_)}, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(output_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump({"temperature": temperature, "alpha": alpha, "ensemble_rf": ensemble_rf,
+                   "test_samples": int(len(X_test)), "candidates": results}, f, ensure_ascii=False, indent=2)
+
+    print(f"\n Pareto set (accuracy vs latency vs size):")
+    for r in sorted((r for r in results if r["pareto"]), key=lambda r: r["latency_ms"]):
+        print(f"  {r['name']:24s} acc={r['accuracy']:.4f} size={r['size_bytes'] / 1024:7.1f}KB"
+              f" latency={r['latency_ms']:.4f}ms -> {r['path']}")
+    print(f" Report saved to {os.path.join(output_dir, 'report.json')}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill and prune the sign classifier into a Pareto set of TFLite models")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--students', nargs='*', default=["128,64", "64,32", "32"],
+                        help="Student hidden layer sizes, e.g. 128,64 64,32 32")
+    parser.add_argument('--keep', nargs='*', type=float, default=[0.5, 0.25],
+                        help="Fractions of teacher neurons kept by magnitude pruning")
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.3, help="Weight of the hard-label loss")
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--ensemble-rf', action='store_true', help="Distill from the MLP + RandomForest average")
+    args = parser.parse_args()
+
+    compress(args.csv, args.output_dir, [tuple(int(u) for u in s.split(",")) for s in args.students],
+             args.keep, args.temperature, args.alpha, args.epochs, args.ensemble_rf)
+
+
+if __name__ == "__main__":
+    main()
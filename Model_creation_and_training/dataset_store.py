@@ -0,0 +1,368 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+from landmark_features import CSV_HEADER, FEATURE_COLUMNS, NUM_FEATURES
+
+DATASET_DIR = "malayalam_isl_dataset"
+MANIFEST_FILE = "manifest.jsonl"
+SEGMENT_DIR = "segments"
+TRASH_DIR = "trash"
+SEGMENT_KINDS = ("features", "flags", "paths")
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class DatasetStore:
+    """Append-only columnar landmark dataset.
+
+    Each append writes one immutable segment: `<id>.features.npy` (float32, n x 126,
+    memory mappable), `<id>.flags.npy` (int8 is_left/is_right) and `<id>.paths.npy`
+    (image paths), then commits it with one line in `manifest.jsonl`. Deleting a
+    label appends a tombstone instead of rewriting anything (a "replace" line is a
+    tombstone and an append in one commit); readers replay the manifest to get the
+    latest view. `compact()` removes dead segments and trashed
+    image folders offline.
+
+    Open with read_only=True from anything that only loads rows (training, benchmarks,
+    evaluation): it never touches the files, so it is safe while capture is appending.
+    Only a writable store repairs a torn manifest tail or finishes interrupted moves.
+    """
+
+    def __init__(self, root=DATASET_DIR, read_only=False):
+        self.root = root
+        self.read_only = read_only
+        self.segment_dir = os.path.join(root, SEGMENT_DIR)
+        self.trash_dir = os.path.join(root, TRASH_DIR)
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        if not read_only:
+            os.makedirs(self.segment_dir, exist_ok=True)
+        self.reload()
+        if not read_only:
+            self._recover()
+
+    @staticmethod
+    def exists(root=DATASET_DIR):
+        return os.path.exists(os.path.join(root, MANIFEST_FILE))
+
+    def _read_manifest(self):
+        entries = []
+        if not os.path.exists(self.manifest_path):
+            return entries
+        with open(self.manifest_path, "rb") as f:
+            lines = f.readlines()
+        good_offset = 0
+        for i, line in enumerate(lines):
+            try:
+                entry = json.loads(line.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                entry = None
+            if i == len(lines) - 1 and (entry is None or not line.endswith(b"\n")):
+                # Partial final line: a crash, or a writer still appending; it is not committed
+                if not self.read_only:
+                    with open(self.manifest_path, "r+b") as f:
+                        f.truncate(good_offset)
+                break
+            if entry is None:
+                # Corrupt line followed by committed ones: skip it, keep everything after it
+                print(f" Skipping unreadable line {i + 1} of {self.manifest_path}")
+            else:
+                entries.append(entry)
+            good_offset += len(line)
+        return entries
+
+    def reload(self):
+        """Replay the manifest into the latest per-label view"""
+        self.entries = self._read_manifest()
+        self.index = {"next_segment": 0, "labels": {}}
+        self._versions = {}
+        self._last_tombstone = {}
+        for entry in self.entries:
+            label = entry["label"]
+            if entry["op"] == "delete":
+                self._versions[label] = entry["version"]
+                self._last_tombstone[label] = entry
+                self.index["labels"].pop(label, None)
+            elif entry["op"] in ("append", "replace"):
+                self.index["next_segment"] = max(self.index["next_segment"], int(entry["segment"]) + 1)
+                if entry["op"] == "replace":
+                    # Tombstone and append in one line: the old rows go exactly when the new ones land
+                    self._versions[label] = entry["version"]
+                    self.index["labels"].pop(label, None)
+                if entry["version"] != self._versions.get(label, 0):
+                    continue  # written for a label version that has since been deleted
+                view = self.index["labels"].setdefault(label, {"segments": []})
+                view["segments"].append({"name": entry["segment"], "rows": entry["rows"]})
+        self._seq = self.entries[-1]["seq"] + 1 if self.entries else 0
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"{self.root} was opened read-only")
+
+    def _commit(self, entry):
+        """Durably append one manifest line; this is the commit point of every change"""
+        self._check_writable()
+        entry = dict(entry, seq=self._seq, time=time.time())
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._seq += 1
+        self.entries.append(entry)
+        return entry
+
+    def _recover(self):
+        """Finish image-folder moves of tombstones committed just before a crash"""
+        for label, entry in self._last_tombstone.items():
+            source, trash = entry.get("image_folder"), entry.get("trash")
+            if not source or label in self.index["labels"]:
+                continue
+            if os.path.exists(source) and not os.path.exists(trash):
+                self._move_to_trash(source, trash)
+
+    def _move_to_trash(self, source, trash):
+        os.makedirs(self.trash_dir, exist_ok=True)
+        os.replace(source, trash)
+        _fsync_dir(self.trash_dir)
+        _fsync_dir(os.path.dirname(os.path.abspath(source)))
+
+    def _segment_path(self, segment, kind):
+        return os.path.join(self.segment_dir, f"{segment}.{kind}.npy")
+
+    # ========== Listing ==========
+    def labels(self):
+        """Labels in insertion order"""
+        return list(self.index["labels"].keys())
+
+    def label_counts(self):
+        return {label: sum(seg["rows"] for seg in entry["segments"])
+                for label, entry in self.index["labels"].items()}
+
+    def __len__(self):
+        return sum(self.label_counts().values())
+
+    # ========== Writing ==========
+    def append(self, label, features, is_left, is_right, image_paths, replace=False):
+        """Append rows for one label as a new segment.
+
+        With replace=True the label's existing rows are tombstoned by the same manifest
+        line, so a crash leaves either the old rows or the new ones, never neither.
+        """
+        features = np.asarray(features, dtype=np.float32).reshape(-1, NUM_FEATURES)
+        n = len(features)
+        if n == 0:
+            return 0
+        flags = np.column_stack([np.asarray(is_left, dtype=np.int8).reshape(n),
+                                 np.asarray(is_right, dtype=np.int8).reshape(n)])
+        paths = np.asarray(image_paths, dtype=str).reshape(n)
+        self._check_writable()
+
+        segment = f"{self.index['next_segment']:08d}"
+        self.index["next_segment"] += 1
+        for kind, array in zip(SEGMENT_KINDS, (features, flags, paths)):
+            with open(self._segment_path(segment, kind), "wb") as f:
+                np.save(f, array, allow_pickle=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Segment files are invisible until the manifest line is committed
+        version = self._versions.get(label, 0) + (1 if replace else 0)
+        self._commit({"op": "replace" if replace else "append", "label": label, "version": version,
+                      "segment": segment, "rows": n})
+        if replace:
+            self._versions[label] = version
+            self.index["labels"].pop(label, None)
+        view = self.index["labels"].setdefault(label, {"segments": []})
+        view["segments"].append({"name": segment, "rows": n})
+        return n
+
+    def append_rows(self, rows, replace=False):
+        """Append rows in the data_both_hands.csv schema, grouped by label"""
+        by_label = {}
+        for row in rows:
+            by_label.setdefault(row[0], []).append(row)
+        written = 0
+        for label, label_rows in by_label.items():
+            written += self.append(
+                label,
+                np.array([r[4:] for r in label_rows], dtype=np.float32),
+                [int(r[2]) for r in label_rows],
+                [int(r[3]) for r in label_rows],
+                [r[1] for r in label_rows],
+                replace=replace,
+            )
+        return written
+
+    def delete_label(self, label, image_folder=None):
+        """Tombstone a label (and move its image folder to trash in the same transaction).
+
+        Returns the number of rows removed. Nothing is rewritten; space is reclaimed by
+        compact().
+        """
+        view = self.index["labels"].get(label)
+        has_images = image_folder is not None and os.path.exists(image_folder)
+        if view is None and not has_images:
+            return 0
+        rows = sum(seg["rows"] for seg in view["segments"]) if view else 0
+        version = self._versions.get(label, 0) + 1
+        trash = os.path.join(self.trash_dir, f"{self._seq:08d}") if has_images else None
+        entry = self._commit({"op": "delete", "label": label, "version": version, "rows": rows,
+                              "image_folder": image_folder if has_images else None, "trash": trash})
+        self._versions[label] = version
+        self._last_tombstone[label] = entry
+        self.index["labels"].pop(label, None)
+        if has_images:
+            self._move_to_trash(image_folder, trash)
+        return rows
+
+    # ========== Compaction ==========
+    def compact(self):
+        """Offline: drop dead segments and trashed images, rewrite the manifest with live appends only"""
+        self._check_writable()
+        live = {seg["name"] for _, seg in self._segments()}
+        removed_segments, reclaimed = 0, 0
+        for name in os.listdir(self.segment_dir):
+            if name.split(".", 1)[0] not in live:
+                path = os.path.join(self.segment_dir, name)
+                reclaimed += os.path.getsize(path)
+                os.remove(path)
+                removed_segments += 1
+        if os.path.exists(self.trash_dir):
+            for root, _, files in os.walk(self.trash_dir):
+                reclaimed += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+            shutil.rmtree(self.trash_dir)
+
+        # No tombstones survive compaction, so every live append restarts at version 0
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for seq, (label, seg) in enumerate(self._segments()):
+                f.write(json.dumps({"op": "append", "label": label, "version": 0,
+                                    "segment": seg["name"], "rows": seg["rows"],
+                                    "seq": seq, "time": time.time()}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+        _fsync_dir(self.root)
+        manifest_entries = len(self.entries)
+        self.reload()
+        return {"removed_segment_files": removed_segments, "bytes_reclaimed": reclaimed,
+                "manifest_entries_before": manifest_entries, "manifest_entries_after": len(self.entries)}
+
+    # ========== Reading ==========
+    def _segments(self, labels=None):
+        for label, entry in self.index["labels"].items():
+            if labels is not None and label not in labels:
+                continue
+            for seg in entry["segments"]:
+                yield label, seg
+
+    def load(self, labels=None, mmap=True):
+        """Return (features float32 (N, 126), labels, is_left, is_right, image_paths)"""
+        mmap_mode = 'r' if mmap else None
+        feats, names, flags, paths = [], [], [], []
+        for label, seg in self._segments(labels):
+            feats.append(np.load(self._segment_path(seg["name"], "features"), mmap_mode=mmap_mode))
+            flags.append(np.load(self._segment_path(seg["name"], "flags")))
+            paths.append(np.load(self._segment_path(seg["name"], "paths")))
+            names.append(np.full(seg["rows"], label, dtype=object))
+        if not feats:
+            return (np.zeros((0, NUM_FEATURES), dtype=np.float32), np.array([], dtype=object),
+                    np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int8), np.array([], dtype=str))
+        flags = np.concatenate(flags)
+        return (np.concatenate(feats), np.concatenate(names), flags[:, 0], flags[:, 1],
+                np.concatenate(paths))
+
+    def to_dataframe(self, labels=None):
+        """DataFrame with the same columns as data_both_hands.csv"""
+        features, names, is_left, is_right, paths = self.load(labels)
+        df = pd.DataFrame(features, columns=FEATURE_COLUMNS)
+        df.insert(0, 'is_right', is_right)
+        df.insert(0, 'is_left', is_left)
+        df.insert(0, 'image_path', paths)
+        df.insert(0, 'label', names)
+        return df
+
+    # ========== CSV Import / Export ==========
+    def import_csv(self, csv_path, chunk_size=100000):
+        """Append every row of a data_both_hands.csv style file"""
+        written = 0
+        for chunk in pd.read_csv(csv_path, encoding='utf-8', chunksize=chunk_size):
+            for col in FEATURE_COLUMNS:
+                if col not in chunk.columns:
+                    chunk[col] = 0.0
+            for label, group in chunk.groupby('label', sort=False):
+                written += self.append(label,
+                                       group[FEATURE_COLUMNS].fillna(0).values,
+                                       group['is_left'].values, group['is_right'].values,
+                                       group['image_path'].astype(str).values)
+        return written
+
+    def export_csv(self, csv_path, labels=None):
+        """Write the store back out in the data_both_hands.csv schema"""
+        written = 0
+        with open(csv_path, mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for label, seg in self._segments(labels):
+                features = np.load(self._segment_path(seg["name"], "features"), mmap_mode='r')
+                flags = np.load(self._segment_path(seg["name"], "flags"))
+                paths = np.load(self._segment_path(seg["name"], "paths"))
+                for i in range(seg["rows"]):
+                    writer.writerow([label, paths[i], int(flags[i, 0]), int(flags[i, 1])]
+                                    + features[i].tolist())
+                written += seg["rows"]
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the columnar Malayalam ISL landmark dataset")
+    parser.add_argument('--root', default=DATASET_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="Show labels and row counts")
+    p = sub.add_parser('import', help="Append rows from a CSV")
+    p.add_argument('csv_path')
+    p = sub.add_parser('export', help="Write the dataset to a CSV")
+    p.add_argument('csv_path')
+    p = sub.add_parser('delete', help="Tombstone all rows of a label")
+    p.add_argument('label')
+    p.add_argument('--image-folder', default=None, help="Also trash this image folder")
+    sub.add_parser('compact', help="Reclaim space from deleted labels (run while nothing else uses the dataset)")
+    args = parser.parse_args()
+
+    store = DatasetStore(args.root, read_only=args.command in ('list', 'export'))
+    if args.command == 'list':
+        counts = store.label_counts()
+        for i, (label, count) in enumerate(counts.items(), 1):
+            print(f"{i:2d}. {label}: {count} samples")
+        print(f" Total: {sum(counts.values())} rows in {len(counts)} labels")
+    elif args.command == 'import':
+        print(f" Imported {store.import_csv(args.csv_path)} rows from {args.csv_path}")
+    elif args.command == 'export':
+        print(f" Exported {store.export_csv(args.csv_path)} rows to {args.csv_path}")
+    elif args.command == 'delete':
+        print(f" Deleted {store.delete_label(args.label, args.image_folder)} rows for '{args.label}'")
+    elif args.command == 'compact':
+        stats = store.compact()
+        print(f" Removed {stats['removed_segment_files']} segment files, reclaimed"
+              f" {stats['bytes_reclaimed'] / 1e6:.1f} MB, manifest"
+              f" {stats['manifest_entries_before']} -> {stats['manifest_entries_after']} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+
+def _fsync_dir(path):
+    """fsync a directory so renames inside it are durable (no-op where unsupported)"""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AsyncDatasetWriter:
+    """Background writer for capture rows and JPEG frames.
+
+    `submit()` hands a frame to a small encoder pool and returns immediately; it only
+    blocks when `max_pending` frames are already waiting (bounded memory). Rows are
+    buffered per letter and committed in `flush_letter()`, after every image of the
+    letter has been written and renamed into place, as one new segment in a DatasetStore.
+    """
+
+    def __init__(self, store, max_pending=64, encode_workers=2, jpeg_quality=95):
+        self.store = store
+        self.jpeg_params = [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality]
+        self._pool = ThreadPoolExecutor(max_workers=encode_workers, thread_name_prefix="dataset-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+        self._rows = []
+        self._image_dirs = set()
+        self._failed_images = set()
+        self._lock = threading.Lock()
+        self.images_written = 0
+        self.rows_written = 0
+        self.errors = []
+        self.max_submit_wait = 0.0
+
+    def _write_image(self, image_path, frame):
+        try:
+            is_success, buffer = cv2.imencode(".jpg", frame, self.jpeg_params)
+            if not is_success:
+                raise IOError(f"JPEG encode failed for {image_path}")
+            tmp_path = image_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, image_path)
+            with self._lock:
+                self.images_written += 1
+        except Exception as e:
+            with self._lock:
+                self.errors.append((image_path, e))
+                self._failed_images.add(image_path)
+        finally:
+            self._slots.release()
+
+    def submit(self, row, image_path=None, frame=None):
+        """Queue one row (data_both_hands.csv schema) and (optionally) its frame. The frame must not be modified afterwards."""
+        self._rows.append((row, image_path if frame is not None else None))
+        if frame is None:
+            return
+        start = time.perf_counter()
+        self._slots.acquire()
+        self.max_submit_wait = max(self.max_submit_wait, time.perf_counter() - start)
+        self._image_dirs.add(os.path.dirname(image_path))
+        self._futures.append(self._pool.submit(self._write_image, image_path, frame))
+
+    def flush_letter(self):
+        """Wait for pending images, then commit the buffered rows as one store segment.
+
+        Rows whose image failed to write are dropped, so no row points at a missing JPEG.
+        """
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        for image_dir in self._image_dirs:
+            _fsync_dir(image_dir)
+        self._image_dirs = set()
+
+        with self._lock:
+            failed, self._failed_images = self._failed_images, set()
+        rows = [row for row, image_path in self._rows if image_path is None or image_path not in failed]
+        self._rows = []
+        if not rows:
+            return 0
+        self.store.append_rows(rows)
+        written = len(rows)
+        self.rows_written += written
+        return written
+
+    def close(self):
+        self.flush_letter()
+        self._pool.shutdown(wait=True)
@@ -1,28 +1,37 @@
-
-# -----------------------------------This code only deletes rows in CSV file delete images manually---------------------------------------
+# -----------------------------------Deletes a label from the dataset (rows + images) as a tombstone---------------------------------------
+# Run `python dataset_store.py compact` afterwards to reclaim the disk space.
+# Falls back to rewriting the CSV (rows only, delete images manually) if no dataset store exists yet.
 
 
 import csv
+import os
+from dataset_store import DatasetStore, DATASET_DIR
 
-# File path
+# File paths
 csv_filename = "data_both_hands.csv"
+image_folder = "malayalam_isl_images"
 
 # Ask for the label to delete
 label_to_delete = input("Enter the Malayalam alphabet to delete: ").strip()
 
-# Read all rows from the CSV
-with open(csv_filename, mode='r', encoding='utf-8') as f:
-    reader = csv.reader(f)
-    rows = list(reader)
-
-# Keep header and filter out rows with the specified label
-header = rows[0]
-filtered_rows = [row for row in rows[1:] if row[0] != label_to_delete]
-
-# Write the updated data back to CSV
-with open(csv_filename, mode='w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerow(header)
-    writer.writerows(filtered_rows)
-
-print(f" Deleted all entries with label '{label_to_delete}' from {csv_filename}")
+if DatasetStore.exists(DATASET_DIR):
+    store = DatasetStore(DATASET_DIR)
+    removed = store.delete_label(label_to_delete, image_folder=os.path.join(image_folder, label_to_delete))
+    print(f" Deleted {removed} entries with label '{label_to_delete}' from {DATASET_DIR}")
+else:
+    # Read all rows from the CSV
+    with open(csv_filename, mode='r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
+
+    # Keep header and filter out rows with the specified label
+    header = rows[0]
+    filtered_rows = [row for row in rows[1:] if row[0] != label_to_delete]
+
+    # Write the updated data back to CSV
+    with open(csv_filename, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(filtered_rows)
+
+    print(f" Deleted all entries with label '{label_to_delete}' from {csv_filename}")
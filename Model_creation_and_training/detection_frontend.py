@@ -0,0 +1,144 @@
+import time
+import cv2
+import numpy as np
+
+from landmark_features import HAND_ORDER, NUM_LANDMARKS, landmarks_to_array
+
+
+class HandsResult:
+    """Stand-in for a MediaPipe Hands result (multi_hand_landmarks / multi_handedness protos)"""
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, interpolated=False):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.interpolated = interpolated
+
+
+def _build_result(hands_xyz, present, interpolated):
+    """HandsResult with real protobuf landmark lists, so drawing_utils and the extractor accept it"""
+    from mediapipe.framework.formats import classification_pb2, landmark_pb2
+    landmarks, handedness = [], []
+    for slot, hand in enumerate(HAND_ORDER):
+        if not present[slot]:
+            continue
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in hands_xyz[slot].tolist():
+            landmark_list.landmark.add(x=x, y=y, z=z)
+        classification = classification_pb2.ClassificationList()
+        classification.classification.add(index=slot, score=1.0, label=hand)
+        landmarks.append(landmark_list)
+        handedness.append(classification)
+    return HandsResult(landmarks or None, handedness or None, interpolated)
+
+
+class AdaptiveHandDetector:
+    """Front end for MediaPipe Hands with a resolution and a frame-stride knob.
+
+    - Frames are downsampled (aspect preserved) to `width` pixels before detection.
+      MediaPipe landmarks are normalized to the image, so they map back to the
+      full-resolution frame unchanged.
+    - Only every `stride`-th frame is detected; frames in between get landmarks
+      extrapolated from the last two detections (constant velocity), so the live
+      loop never waits for a future frame.
+    - With `target_fps`, an EMA of the detection cost drives both knobs: under CPU
+      pressure the width drops towards `min_width` first, then the stride grows up to
+      `max_stride`; with headroom the stride comes back to 1 first, then the width.
+    """
+
+    def __init__(self, hands, width=None, stride=1, target_fps=None, min_width=192, max_stride=4,
+                 adjust_every=15, width_step=0.8):
+        self.hands = hands
+        self.width = width
+        self.max_width = width
+        self.stride = max(1, stride)
+        self.target_fps = target_fps
+        self.min_width = min_width
+        self.max_stride = max_stride
+        self.adjust_every = adjust_every
+        self.width_step = width_step
+        self.detect_seconds = None  # EMA of one MediaPipe call
+        self.processed = 0
+        self.interpolated = 0
+        self._frame_index = 0
+        self._since_adjust = 0
+        self._history = []  # last two detections: (frame_index, hands_xyz (2, 21, 3), present (2,))
+
+    def _resize(self, frame):
+        h, w = frame.shape[:2]
+        if self.max_width is None:
+            self.max_width = w
+        if self.width is None or self.width >= w:
+            return frame
+        return cv2.resize(frame, (self.width, max(1, round(h * self.width / w))), interpolation=cv2.INTER_AREA)
+
+    def _detect(self, frame):
+        start = time.perf_counter()
+        small = self._resize(frame)
+        result = self.hands.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+        elapsed = time.perf_counter() - start
+        self.detect_seconds = elapsed if self.detect_seconds is None else 0.9 * self.detect_seconds + 0.1 * elapsed
+
+        hands_xyz = np.zeros((len(HAND_ORDER), NUM_LANDMARKS, 3))
+        present = np.zeros(len(HAND_ORDER), dtype=bool)
+        if result.multi_hand_landmarks and result.multi_handedness:
+            for hand_landmark, handedness in zip(result.multi_hand_landmarks, result.multi_handedness):
+                slot = HAND_ORDER.index(handedness.classification[0].label)
+                landmarks_to_array(hand_landmark, out=hands_xyz[slot])
+                present[slot] = True
+        self._history = (self._history + [(self._frame_index, hands_xyz, present)])[-2:]
+        self.processed += 1
+        return HandsResult(result.multi_hand_landmarks, result.multi_handedness, interpolated=False)
+
+    def _extrapolate(self):
+        if not self._history:
+            return HandsResult(interpolated=True)
+        index, hands_xyz, present = self._history[-1]
+        if len(self._history) == 2:
+            prev_index, prev_xyz, prev_present = self._history[0]
+            both = present & prev_present
+            # Constant velocity from the last two detections, at most one stride ahead
+            steps = min(self._frame_index - index, self.stride) / max(1, index - prev_index)
+            hands_xyz = hands_xyz.copy()
+            hands_xyz[both] += (hands_xyz[both] - prev_xyz[both]) * steps
+        self.interpolated += 1
+        return _build_result(hands_xyz, present, interpolated=True)
+
+    def _adapt(self):
+        self._since_adjust += 1
+        if not self.target_fps or self.detect_seconds is None or self._since_adjust < self.adjust_every:
+            return
+        budget = 1.0 / self.target_fps
+        cost = self.detect_seconds / self.stride
+        if cost > 0.9 * budget:
+            if self.width is None or self.width > self.min_width:
+                self.width = max(self.min_width, int((self.width or self.max_width or 640) * self.width_step))
+            elif self.stride < self.max_stride:
+                self.stride += 1
+            else:
+                return
+        elif cost < 0.5 * budget:
+            if self.stride > 1:
+                self.stride -= 1
+            elif self.width is not None and self.max_width and self.width < self.max_width:
+                self.width = min(self.max_width, int(self.width / self.width_step))
+            else:
+                return
+        else:
+            return
+        self._since_adjust = 0
+
+    def process(self, frame, force=False):
+        """MediaPipe-style result for a BGR frame; `force` runs a real detection regardless of stride.
+
+        The result's `interpolated` attribute is True when no detection ran for this frame.
+        """
+        due = force or not self._history or self._frame_index - self._history[-1][0] >= self.stride
+        result = self._detect(frame) if due else self._extrapolate()
+        self._frame_index += 1
+        self._adapt()
+        return result
+
+    def summary(self):
+        return {"processed": self.processed, "interpolated": self.interpolated, "width": self.width,
+                "stride": self.stride,
+                "detect_ms": (self.detect_seconds or 0.0) * 1000}
@@ -0,0 +1,273 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
+import numpy as np
+
+from hyperparameter_sweep import init_pinned_worker
+
+HISTORY_PATH = "evaluation_history.jsonl"
+EVAL_CACHE_DIR = "eval_cache"
+
+
+# ========== Folds ==========
+def signer_groups(image_paths, pattern):
+    """Signer id per row: the first group (or the whole match) of pattern in image_path"""
+    regex = re.compile(pattern)
+    groups = []
+    for path in image_paths:
+        match = regex.search(str(path))
+        groups.append((match.group(1) if match.groups() else match.group(0)) if match else "")
+    return np.array(groups)
+
+
+def prepare_folds(csv_path, k=5, signer_pattern=None, seed=42):
+    """Save raw features, labels and k stratified (optionally signer-grouped) folds for the workers"""
+    from sklearn.model_selection import StratifiedKFold, StratifiedGroupKFold
+    from labels import malayalam_alphabets
+    from train_models import load_dataframe, prepare_features
+
+    df = load_dataframe(csv_path)
+    if df is None:
+        raise SystemExit(1)
+    X, y, label_encoder, _, _ = prepare_features(df, verbose=False)
+
+    if signer_pattern:
+        # Same rows prepare_features keeps: a detected hand and a known label
+        kept = df[((df['is_left'] == 1) | (df['is_right'] == 1)) & df['label'].isin(malayalam_alphabets)]
+        groups = signer_groups(kept['image_path'], signer_pattern)
+        print(f" {len(np.unique(groups))} signers from pattern {signer_pattern!r}")
+        splitter = StratifiedGroupKFold(n_splits=k, shuffle=True, random_state=seed)
+        folds = list(splitter.split(X, y, groups))
+    else:
+        splitter = StratifiedKFold(n_splits=k, shuffle=True, random_state=seed)
+        folds = list(splitter.split(X, y))
+
+    cache_dir = os.path.join(EVAL_CACHE_DIR, str(os.getpid()))
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(os.path.join(cache_dir, "X.npy"), np.asarray(X, dtype=np.float32))
+    np.save(os.path.join(cache_dir, "y.npy"), np.asarray(y))
+    for i, (_, test_index) in enumerate(folds):
+        np.save(os.path.join(cache_dir, f"fold_{i}.npy"), test_index)
+    return cache_dir, list(label_encoder.classes_), len(folds)
+
+
+# ========== Worker ==========
+def _run_fold(task):
+    fold, cache_dir, model_kind, num_classes, options = task
+    X = np.load(os.path.join(cache_dir, "X.npy"), mmap_mode='r')
+    y = np.load(os.path.join(cache_dir, "y.npy"))
+    test_index = np.load(os.path.join(cache_dir, f"fold_{fold}.npy"))
+    train_mask = np.ones(len(y), dtype=bool)
+    train_mask[test_index] = False
+    X_train, y_train = np.asarray(X[train_mask]), y[train_mask]
+    X_test, y_test = np.asarray(X[test_index]), y[test_index]
+
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler().fit(X_train)
+    X_train_scaled, X_test_scaled = scaler.transform(X_train), scaler.transform(X_test)
+    start = time.perf_counter()
+
+    if model_kind == "random_forest":
+        from forest_classifier import ForestClassifier, export_forest
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1)
+        model.fit(X_train_scaled, y_train)
+        train_seconds = time.perf_counter() - start
+        y_pred = model.predict(X_test_scaled)
+        # Latency of the deployed form: the flattened forest on one raw row
+        forest_path = os.path.join(cache_dir, f"forest_{fold}.npz")
+        label_path = os.path.join(cache_dir, "label_map.json")
+        export_forest(model, scaler.mean_, scaler.scale_, num_classes, forest_path)
+        with open(label_path, "w", encoding="utf-8") as f:
+            json.dump({i: str(i) for i in range(num_classes)}, f)
+        forest = ForestClassifier(forest_path, label_path)
+        timings = []
+        for i in range(220):
+            t = time.perf_counter()
+            forest.predict_proba(X_test[i % len(X_test)])
+            if i >= 20:
+                timings.append(time.perf_counter() - t)
+        latency_ms = float(np.median(timings) * 1000)
+        size_bytes = os.path.getsize(forest_path)
+    else:
+        import tensorflow as tf
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        from train_models import build_mlp, train_mlp, convert_to_tflite, run_tflite, measure_tflite_latency
+        augmenter = None
+        if options.get("augment"):
+            from landmark_augmentation import LandmarkAugmenter
+            augmenter = LandmarkAugmenter(seed=fold)
+        tf.keras.utils.set_random_seed(42 + fold)
+        model = build_mlp(X_train.shape[1], num_classes)
+        train_mlp(model, X_train_scaled, y_train, X_test_scaled, y_test, epochs=options.get("epochs", 100),
+                  verbose=0, augmenter=augmenter, scaler=scaler)
+        train_seconds = time.perf_counter() - start
+        # Score the artifact that ships (model.tflite), not the Keras model
+        tflite_model = convert_to_tflite(model)
+        y_pred = np.argmax(run_tflite(tflite_model, X_test_scaled.astype(np.float32)), axis=1)
+        latency_ms = measure_tflite_latency(tflite_model)
+        size_bytes = len(tflite_model)
+
+    return {"fold": fold, "test_index": test_index, "y_pred": y_pred, "accuracy": float(np.mean(y_pred == y_test)),
+            "latency_ms": latency_ms, "size_bytes": size_bytes, "train_seconds": train_seconds}
+
+
+# ========== Report ==========
+def summarize(results, y, classes):
+    """Fold statistics plus per-class precision/recall/F1 and the confusion matrix over all folds"""
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+    y_pred = np.empty_like(y)
+    for r in results:
+        y_pred[r["test_index"]] = r["y_pred"]
+    labels = np.arange(len(classes))
+    precision, recall, f1, support = precision_recall_fscore_support(y, y_pred, labels=labels, zero_division=0)
+    accuracies = np.array([r["accuracy"] for r in results])
+    latencies = np.array([r["latency_ms"] for r in results])
+    return {
+        "folds": len(results),
+        "accuracy_mean": float(accuracies.mean()),
+        "accuracy_std": float(accuracies.std(ddof=1)) if len(accuracies) > 1 else 0.0,
+        "fold_accuracy": accuracies.tolist(),
+        "latency_ms": float(np.median(latencies)),
+        "size_bytes": int(np.median([r["size_bytes"] for r in results])),
+        "train_seconds": float(sum(r["train_seconds"] for r in results)),
+        "per_class": {label: {"precision": float(p), "recall": float(rc), "f1": float(f), "support": int(s)}
+                      for label, p, rc, f, s in zip(classes, precision, recall, f1, support)},
+        "confusion_matrix": confusion_matrix(y, y_pred, labels=labels).tolist(),
+    }
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def last_accepted(history, run):
+    """Newest accepted run evaluated the same way (model, folds, signer grouping)"""
+    for old in reversed(history):
+        if old.get("accepted") and all(old.get(key) == run[key] for key in ("model", "folds", "signer_pattern")):
+            return old
+    return None
+
+
+def compare_runs(run, baseline, max_accuracy_drop=0.01, max_class_drop=0.05, max_latency_regression=0.20,
+                 min_delta_ms=0.02):
+    """Regression messages versus the last accepted run.
+
+    Mean accuracy only counts as a regression when the drop exceeds both max_accuracy_drop
+    and two standard errors of the fold means, so fold-to-fold noise does not flap.
+    """
+    failures = []
+    stderr = np.hypot(run["accuracy_std"] / np.sqrt(run["folds"]),
+                      baseline["accuracy_std"] / np.sqrt(baseline["folds"]))
+    drop = baseline["accuracy_mean"] - run["accuracy_mean"]
+    if drop > max(max_accuracy_drop, 2 * stderr):
+        failures.append(f"accuracy: {baseline['accuracy_mean']:.4f} -> {run['accuracy_mean']:.4f}"
+                        f" (-{drop:.4f}, 2 SE = {2 * stderr:.4f})")
+    for label, stats in run["per_class"].items():
+        old = baseline["per_class"].get(label)
+        if old and old["recall"] - stats["recall"] > max_class_drop:
+            failures.append(f"recall[{label}]: {old['recall']:.3f} -> {stats['recall']:.3f}")
+    old_ms, new_ms = baseline["latency_ms"], run["latency_ms"]
+    if new_ms > old_ms * (1 + max_latency_regression) and new_ms - old_ms > min_delta_ms:
+        failures.append(f"latency_ms: {old_ms:.3f} -> {new_ms:.3f} (+{(new_ms / old_ms - 1) * 100:.1f}%)")
+    return failures
+
+
+def evaluate(csv_path, model_kind="mlp", k=5, signer_pattern=None, workers=None, seed=42, options=None):
+    """Train and score one model per fold in a process pool; returns the run record"""
+    cache_dir, classes, k = prepare_folds(csv_path, k, signer_pattern, seed)
+    y = np.load(os.path.join(cache_dir, "y.npy"))
+
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    workers = max(1, min(workers or max(1, len(cores) // 2), k))
+    per_worker = max(1, len(cores) // workers)
+    # spawn, not fork: the parent may already have TensorFlow loaded
+    ctx = multiprocessing.get_context("spawn")
+    core_queue = ctx.Queue()
+    for w in range(workers):
+        core_queue.put(set(cores[w * per_worker:(w + 1) * per_worker]) or {cores[w % len(cores)]})
+
+    print(f"\n Evaluating {model_kind} with {k}-fold {'signer-grouped ' if signer_pattern else ''}"
+          f"stratified CV on {workers} workers ({per_worker} cores each)...")
+    start = time.perf_counter()
+    results = []
+    tasks = [(fold, cache_dir, model_kind, len(classes), options or {}) for fold in range(k)]
+    with ctx.Pool(processes=workers, initializer=init_pinned_worker, initargs=(core_queue,)) as pool:
+        for result in pool.imap_unordered(_run_fold, tasks):
+            results.append(result)
+            print(f"  fold {result['fold']}: acc={result['accuracy']:.4f} latency={result['latency_ms']:.3f}ms"
+                  f" ({result['train_seconds']:.1f}s)")
+    results.sort(key=lambda r: r["fold"])
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    from benchmark import git_commit
+    run = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(), "model": model_kind,
+           "source": csv_path, "signer_pattern": signer_pattern, "seed": seed, "options": options or {},
+           "samples": int(len(y)), "wall_seconds": time.perf_counter() - start}
+    run.update(summarize(results, y, classes))
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stratified k-fold evaluation with a persisted run history")
+    parser.add_argument('--csv', default="data_both_hands.csv")
+    parser.add_argument('--model', choices=("mlp", "random_forest"), default="mlp")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--signer-pattern', help="Regex on image_path whose first group is the signer id;"
+                                                 " folds then never split a signer")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel folds (default: cores / 2)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--epochs', type=int, default=100, help="MLP: max epochs per fold")
+    parser.add_argument('--augment', action='store_true', help="MLP: train on augmented landmark batches")
+    parser.add_argument('--history', default=HISTORY_PATH, help="JSON-lines run history")
+    parser.add_argument('--accept', action='store_true',
+                        help="Mark this run as the new accepted baseline if it has no regressions")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01)
+    parser.add_argument('--max-class-drop', type=float, default=0.05, help="Allowed per-class recall drop")
+    parser.add_argument('--max-latency-regression', type=float, default=0.20)
+    args = parser.parse_args()
+
+    run = evaluate(args.csv, args.model, args.folds, args.signer_pattern, args.workers, args.seed,
+                   {"epochs": args.epochs, "augment": args.augment})
+
+    print(f"\n Accuracy: {run['accuracy_mean']:.4f} ± {run['accuracy_std']:.4f} over {run['folds']} folds"
+          f" | latency {run['latency_ms']:.3f} ms | {run['size_bytes'] / 1024:.1f} KB | {run['wall_seconds']:.1f}s")
+    print(f" {'label':6s} {'prec':>6s} {'recall':>6s} {'f1':>6s} {'n':>5s}")
+    for label, stats in run["per_class"].items():
+        print(f" {label:6s} {stats['precision']:6.3f} {stats['recall']:6.3f} {stats['f1']:6.3f} {stats['support']:5d}")
+
+    baseline = last_accepted(load_history(args.history), run)
+    failures = compare_runs(run, baseline, args.max_accuracy_drop, args.max_class_drop,
+                            args.max_latency_regression) if baseline else []
+    run["regressions"] = failures
+    run["baseline"] = baseline["timestamp"] if baseline else None
+    run["accepted"] = bool(args.accept and not failures)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f" Run appended to {args.history}")
+
+    if baseline is None:
+        print(" No accepted baseline yet" + (" -- this run is now the baseline" if run["accepted"] else ""))
+    elif failures:
+        print(f"\n Regressions vs accepted run {baseline['timestamp']} (commit {baseline.get('commit')}):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    else:
+        print(f" No regressions vs accepted run {baseline['timestamp']} (commit {baseline.get('commit')})"
+              + (" -- accepted as the new baseline" if run["accepted"] else ""))
+
+
+if __name__ == "__main__":
+    main()
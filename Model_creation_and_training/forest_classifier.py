@@ -0,0 +1,137 @@
+import argparse
+import json
+import time
+import numpy as np
+
+from sign_classifier import LABEL_MAP_PATH, SCALER_PATH, load_label_map
+
+FOREST_PATH = "random_forest_model.npz"
+
+
+# ========== Export ==========
+def export_forest(rf_model, scaler_mean, scaler_scale, num_classes, path=FOREST_PATH):
+    """Flatten a fitted RandomForestClassifier into node arrays and save them as a compressed .npz.
+
+    All trees share one node table: internal nodes hold (feature, threshold, left, right) with
+    global child indices; leaves have feature == -1 and `left` pointing at their row of
+    `leaf_values` (per-class probabilities). The scaler the forest was trained behind is stored
+    alongside so the file is self-contained.
+    """
+    features, thresholds, lefts, rights, roots, leaf_values = [], [], [], [], [], []
+    offset, leaf_offset, max_depth = 0, 0, 0
+    for tree in rf_model.estimators_:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        leaf_rows = np.cumsum(is_leaf) - 1 + leaf_offset
+        features.append(np.where(is_leaf, -1, t.feature).astype(np.int32))
+        thresholds.append(t.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, leaf_rows, t.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, t.children_right + offset).astype(np.int32))
+        roots.append(offset)
+
+        values = t.value[is_leaf, 0, :]
+        probs = np.zeros((len(values), num_classes), dtype=np.float32)
+        probs[:, rf_model.classes_] = values / values.sum(axis=1, keepdims=True)
+        leaf_values.append(probs)
+
+        offset += t.node_count
+        leaf_offset += int(is_leaf.sum())
+        max_depth = max(max_depth, t.max_depth)
+
+    np.savez_compressed(
+        path,
+        feature=np.concatenate(features), threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts), right=np.concatenate(rights),
+        roots=np.array(roots, dtype=np.int32), leaf_values=np.concatenate(leaf_values),
+        max_depth=np.int32(max_depth),
+        scaler_mean=np.asarray(scaler_mean, dtype=np.float64),
+        scaler_scale=np.asarray(scaler_scale, dtype=np.float64),
+    )
+    return path
+
+
+# ========== Evaluator ==========
+class ForestClassifier:
+    """TensorFlow-free RandomForest backend over the flattened node arrays.
+
+    Same interface as SignClassifier. A batch walks every tree at once: one gather and
+    compare per tree level for the whole (rows x trees) node matrix. Inputs are scaled
+    and cast to float32 exactly like sklearn does, so predictions match the pickle.
+    """
+
+    def __init__(self, forest_path=FOREST_PATH, label_map_path=LABEL_MAP_PATH, batch_size=256):
+        with np.load(forest_path) as data:
+            self.feature = data["feature"]
+            self.threshold = data["threshold"]
+            self.left = data["left"]
+            self.right = data["right"]
+            self.roots = data["roots"]
+            self.leaf_values = data["leaf_values"]
+            self.max_depth = int(data["max_depth"])
+            self.scaler_mean = data["scaler_mean"]
+            self.scaler_scale = data["scaler_scale"]
+        self.num_classes = self.leaf_values.shape[1]
+        self.num_trees = len(self.roots)
+        self.batch_size = max(1, int(batch_size))
+        self.folded = False
+        self.index_to_label = load_label_map(label_map_path)
+
+    def scale(self, X):
+        """Standardize raw features the same way as train_models.py"""
+        return ((np.asarray(X) - self.scaler_mean) / self.scaler_scale).astype(np.float32)
+
+    def _evaluate(self, X):
+        X = X.astype(np.float64)  # float32 values compared against float64 thresholds, as in sklearn
+        rows = np.arange(len(X))[:, None]
+        nodes = np.tile(self.roots, (len(X), 1))
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.maximum(feature, 0)] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, self.left[nodes], self.right[nodes]), nodes)
+        return self.leaf_values[self.left[nodes]].mean(axis=1)
+
+    def predict_proba(self, X, prescaled=False):
+        """Class probabilities for an (N, 126) array (or a single 126-vector)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X.astype(np.float32) if prescaled else self.scale(X)
+        out = np.empty((len(X), self.num_classes), dtype=np.float32)
+        for start in range(0, len(X), self.batch_size):
+            out[start:start + self.batch_size] = self._evaluate(X[start:start + self.batch_size])
+        return out
+
+    def predict(self, X, prescaled=False):
+        """Return (predicted indices, confidences)"""
+        probs = self.predict_proba(X, prescaled=prescaled)
+        indices = np.argmax(probs, axis=1)
+        return indices, probs[np.arange(len(probs)), indices]
+
+    def top_k(self, probs, k=3):
+        """Top-k (label, confidence) pairs for one probability vector"""
+        order = np.argsort(probs)[::-1][:k]
+        return [(self.index_to_label[int(i)], float(probs[i])) for i in order]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert random_forest_model.pkl into the flattened .npz backend")
+    parser.add_argument('--pkl', default="random_forest_model.pkl")
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    parser.add_argument('--output', default=FOREST_PATH)
+    args = parser.parse_args()
+
+    import joblib
+    rf_model = joblib.load(args.pkl)
+    with open(args.scaler, "r") as f:
+        scaler_params = json.load(f)
+    # A folded export keeps the fitted scaler under fitted_* (the forest still needs it)
+    mean = scaler_params.get("fitted_mean", scaler_params["mean"])
+    scale = scaler_params.get("fitted_scale", scaler_params["scale"])
+
+    start = time.perf_counter()
+    export_forest(rf_model, mean, scale, len(load_label_map(args.labels)), args.output)
+    print(f" Exported {len(rf_model.estimators_)} trees to {args.output} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,176 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+from landmark_features import LandmarkFeatureExtractor
+from sign_classifier import SignClassifier, MODEL_PATH, SCALER_PATH, LABEL_MAP_PATH
+from stable_recognizer import StableRecognizer
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# ========== Sources ==========
+# Every stage is a generator of (frame_index, timestamp_seconds, frame, ...) tuples,
+# so stages compose lazily and nothing is buffered beyond the current frame.
+
+def is_image_sequence(source):
+    return os.path.isdir(source) or any(ch in source for ch in "*?[")
+
+
+def read_frames(source, flip=None, sequence_fps=30.0):
+    """Yield (index, timestamp, frame) from a device index, a video file, or an image folder/glob.
+
+    Device and video frames are mirrored like the live loop (the model is trained on
+    mirrored frames); image sequences are assumed to be saved capture frames that are
+    already mirrored. Pass flip=True/False to override.
+    """
+    if is_image_sequence(source):
+        pattern = os.path.join(source, "*") if os.path.isdir(source) else source
+        paths = sorted(p for p in glob.glob(pattern) if p.lower().endswith(IMAGE_EXTENSIONS))
+        flip = False if flip is None else flip
+        for index, path in enumerate(paths):
+            frame = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                continue
+            yield index, index / sequence_fps, (cv2.flip(frame, 1) if flip else frame)
+        return
+
+    is_device = source.isdigit()
+    cap = cv2.VideoCapture(int(source) if is_device else source)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video source {source!r}")
+    flip = True if flip is None else flip
+    start = time.monotonic()
+    index = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if is_device:
+                timestamp = time.monotonic() - start
+            else:
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            yield index, timestamp, (cv2.flip(frame, 1) if flip else frame)
+            index += 1
+    finally:
+        cap.release()
+
+
+def stride_frames(frames, stride=1):
+    """Keep every `stride`-th frame"""
+    for item in frames:
+        if item[0] % stride == 0:
+            yield item
+
+
+def throttle_frames(frames, max_fps=None):
+    """Limit processing rate in wall-clock time (e.g. to leave CPU for other jobs)"""
+    if not max_fps:
+        yield from frames
+        return
+    interval = 1.0 / max_fps
+    next_time = time.monotonic()
+    for item in frames:
+        now = time.monotonic()
+        if now < next_time:
+            time.sleep(next_time - now)
+        next_time = max(next_time + interval, time.monotonic())
+        yield item
+
+
+# ========== Recognition ==========
+def detect_hands(frames, hands):
+    """Attach the MediaPipe result to every frame"""
+    for index, timestamp, frame in frames:
+        yield index, timestamp, frame, hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+def classify(detections, classifier, top_k=3, recognizer=None):
+    """Turn (index, timestamp, frame, result) into per-frame JSON-able records.
+
+    With a StableRecognizer, top-k comes from the smoothed probabilities and each
+    record also carries the 'committed' letter (or null) and whether inference ran.
+    """
+    extractor = LandmarkFeatureExtractor()
+    for index, timestamp, _, result in detections:
+        features = extractor.from_results(result)
+        record = {
+            "frame": index,
+            "timestamp": round(timestamp, 3),
+            "is_left": extractor.is_left,
+            "is_right": extractor.is_right,
+            "top_k": [],
+        }
+        if recognizer is not None:
+            state = recognizer.update(features, extractor.has_hand)
+            record["committed"] = state["committed"]
+            record["inferred"] = state["inferred"]
+            probs = state["probs"]
+        elif extractor.has_hand:
+            probs = classifier.predict_proba(features)[0]
+        if extractor.has_hand:
+            record["top_k"] = [{"label": label, "confidence": round(confidence, 6)}
+                               for label, confidence in classifier.top_k(probs, top_k)]
+        yield record
+
+
+def recognize_stream(source, classifier, hands, stride=1, max_fps=None, flip=None, top_k=3, recognizer=None):
+    """Full generator pipeline: source -> stride -> throttle -> MediaPipe -> classifier -> records"""
+    frames = read_frames(source, flip=flip)
+    frames = stride_frames(frames, stride)
+    frames = throttle_frames(frames, max_fps)
+    return classify(detect_hands(frames, hands), classifier, top_k, recognizer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Malayalam sign recognition emitting one JSON line per frame")
+    parser.add_argument('source', help="Camera index (e.g. 0), video file, image folder or glob pattern")
+    parser.add_argument('--output', '-o', default='-', help="JSONL output path (default: stdout)")
+    parser.add_argument('--stride', type=int, default=1, help="Process every Nth frame")
+    parser.add_argument('--max-fps', type=float, default=None, help="Throttle processing to this rate")
+    parser.add_argument('--top-k', type=int, default=3)
+    flip = parser.add_mutually_exclusive_group()
+    flip.add_argument('--flip', dest='flip', action='store_true', default=None, help="Mirror frames")
+    flip.add_argument('--no-flip', dest='flip', action='store_false', help="Do not mirror frames")
+    parser.add_argument('--stable', action='store_true',
+                        help="Motion-gate inference, smooth predictions and emit committed letters")
+    parser.add_argument('--threads', type=int, default=None, help="Interpreter threads")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    args = parser.parse_args()
+
+    import mediapipe as mp
+    classifier = SignClassifier(args.model, args.scaler, args.labels, num_threads=args.threads)
+    hands = mp.solutions.hands.Hands(static_image_mode=is_image_sequence(args.source), max_num_hands=2,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.5)
+
+    recognizer = StableRecognizer(classifier) if args.stable else None
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for record in recognize_stream(args.source, classifier, hands, args.stride, args.max_fps,
+                                       args.flip, args.top_k, recognizer):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            frames += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hands.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f" Processed {frames} frames in {elapsed:.1f}s ({frames / elapsed if elapsed else 0:.1f} fps)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+import time
+import multiprocessing
+import numpy as np
+
+SWEEP_CACHE_DIR = "sweep_cache"
+
+# Example search space (pass as JSON to `train_models.py --sweep space.json`):
+# {
+#   "mode": "random", "trials": 24, "seed": 42,
+#   "random_forest": {"n_estimators": [25, 50, 100, 200], "max_depth": [null, 12, 20]},
+#   "mlp": {"hidden_units": [[256, 128, 64], [128, 64], [64, 32], [32]],
+#           "dropout": [0.1, 0.2], "learning_rate": [0.001, 0.003], "batch_size": [32, 64]}
+# }
+
+_cores = None
+
+
+def expand_space(space):
+    """List of {'model': 'random_forest'|'mlp', 'params': {...}} trials (grid or random)"""
+    trials = []
+    for model in ("random_forest", "mlp"):
+        grid = space.get(model)
+        if not grid:
+            continue
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            trials.append({"model": model, "params": dict(zip(keys, values))})
+    if space.get("mode", "grid") == "random":
+        rng = random.Random(space.get("seed", 42))
+        rng.shuffle(trials)
+        trials = trials[:space.get("trials", len(trials))]
+    return trials
+
+
+def cache_dataset(csv_path, test_size=0.2, random_state=42):
+    """Scale + split once and save it; every trial memory-maps the same arrays"""
+    from dataset_store import DatasetStore, DATASET_DIR, MANIFEST_FILE
+    from train_models import load_dataframe, prepare_features, scale_and_split
+
+    if DatasetStore.exists(DATASET_DIR):
+        source = os.path.join(DATASET_DIR, MANIFEST_FILE)
+    else:
+        source = csv_path
+    stat = os.stat(source)
+    key = hashlib.sha256(f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}:"
+                         f"{test_size}:{random_state}".encode("utf-8")).hexdigest()[:16]
+    cache_dir = os.path.join(SWEEP_CACHE_DIR, key)
+    if os.path.exists(os.path.join(cache_dir, "meta.json")):
+        print(f" Reusing cached split in {cache_dir}")
+        return cache_dir
+
+    df = load_dataframe(csv_path)
+    if df is None:
+        raise SystemExit(1)
+    X, y_encoded, label_encoder, _, _ = prepare_features(df, verbose=False)
+    _, X_train, X_test, y_train, y_test = scale_and_split(X, y_encoded, test_size, random_state)
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, array in (("X_train", X_train.astype(np.float32)), ("X_test", X_test.astype(np.float32)),
+                        ("y_train", y_train), ("y_test", y_test)):
+        np.save(os.path.join(cache_dir, f"{name}.npy"), array)
+    with open(os.path.join(cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"classes": list(label_encoder.classes_), "source": source}, f, ensure_ascii=False)
+    print(f" Cached scaled split ({len(X_train)} train / {len(X_test)} test) in {cache_dir}")
+    return cache_dir
+
+
+def init_pinned_worker(core_queue):
+    """Pin this worker to its own set of cores and size thread pools to match"""
+    global _cores
+    _cores = core_queue.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, _cores)
+    threads = str(len(_cores))
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = threads
+
+
+def _load_split(cache_dir):
+    return [np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r')
+            for name in ("X_train", "X_test", "y_train", "y_test")]
+
+
+def _run_trial(task):
+    trial_id, trial, cache_dir = task
+    X_train, X_test, y_train, y_test = _load_split(cache_dir)
+    with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+        num_classes = len(json.load(f)["classes"])
+    params = trial["params"]
+    threads = len(_cores) if _cores else 1
+    start = time.perf_counter()
+    result = {"trial": trial_id, "model": trial["model"], "params": json.dumps(params)}
+
+    if trial["model"] == "random_forest":
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        model = RandomForestClassifier(random_state=42, n_jobs=threads, **params)
+        model.fit(X_train, y_train)
+        result["accuracy"] = float(model.score(X_test, y_test))
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        result["size_bytes"] = buffer.getbuffer().nbytes
+        # No TFLite form for the forest: time a single-row sklearn predict instead
+        model.set_params(n_jobs=1)
+        row = np.asarray(X_test[:1])
+        timings = []
+        for _ in range(50):
+            t = time.perf_counter()
+            model.predict(row)
+            timings.append(time.perf_counter() - t)
+        result["latency_ms"] = float(np.median(timings) * 1000)
+        result["latency_backend"] = "sklearn"
+    else:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        from train_models import build_mlp, train_mlp, convert_to_tflite, measure_tflite_latency
+        build_keys = ("hidden_units", "dropout", "batch_norm")
+        model = build_mlp(X_train.shape[1], num_classes,
+                          **{k: v for k, v in params.items() if k in build_keys})
+        train_mlp(model, np.asarray(X_train), np.asarray(y_train), np.asarray(X_test), np.asarray(y_test),
+                  verbose=0, **{k: v for k, v in params.items() if k not in build_keys})
+        _, accuracy = model.evaluate(np.asarray(X_test), np.asarray(y_test), verbose=0)
+        tflite_model = convert_to_tflite(model)
+        result["accuracy"] = float(accuracy)
+        result["size_bytes"] = len(tflite_model)
+        result["latency_ms"] = measure_tflite_latency(tflite_model)
+        result["latency_backend"] = "tflite"
+
+    result["train_seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_sweep(space, csv_path="data_both_hands.csv", workers=None, target_accuracy=None,
+              leaderboard_path="sweep_leaderboard.csv"):
+    """Run every trial of the search space in a process pool and write a leaderboard"""
+    trials = expand_space(space)
+    if not trials:
+        print(" Search space is empty")
+        return []
+    cache_dir = cache_dataset(csv_path)
+
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    cpu_count = len(cores)
+    workers = max(1, min(workers or max(1, cpu_count // 2), len(trials)))
+    per_worker = max(1, cpu_count // workers)
+    # spawn, not fork: the parent may already have TensorFlow loaded
+    ctx = multiprocessing.get_context("spawn")
+    core_queue = ctx.Queue()
+    for w in range(workers):
+        core_queue.put(set(cores[w * per_worker:(w + 1) * per_worker]) or {cores[w % cpu_count]})
+
+    print(f"\n Running {len(trials)} trials on {workers} workers ({per_worker} cores each)...")
+    results = []
+    tasks = [(i, trial, cache_dir) for i, trial in enumerate(trials)]
+    with ctx.Pool(processes=workers, initializer=init_pinned_worker, initargs=(core_queue,)) as pool:
+        for result in pool.imap_unordered(_run_trial, tasks):
+            results.append(result)
+            print(f"  [{len(results)}/{len(trials)}] {result['model']} {result['params']}"
+                  f" acc={result['accuracy']:.4f} size={result['size_bytes'] / 1024:.1f}KB"
+                  f" latency={result['latency_ms']:.3f}ms")
+
+    # Leaderboard: best accuracy first, then smallest model
+    results.sort(key=lambda r: (-r["accuracy"], r["size_bytes"]))
+    fields = ["trial", "model", "params", "accuracy", "size_bytes", "latency_ms", "latency_backend", "train_seconds"]
+    with open(leaderboard_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\n Leaderboard written to {leaderboard_path}")
+    for rank, r in enumerate(results[:10], 1):
+        print(f"  {rank:2d}. {r['model']:13s} acc={r['accuracy']:.4f} size={r['size_bytes'] / 1024:8.1f}KB"
+              f" latency={r['latency_ms']:.3f}ms {r['params']}")
+
+    if target_accuracy is not None:
+        passing = [r for r in results if r["accuracy"] >= target_accuracy]
+        if passing:
+            best = min(passing, key=lambda r: (r["size_bytes"], r["latency_ms"]))
+            print(f"\n Smallest model with accuracy >= {target_accuracy}: trial {best['trial']}"
+                  f" ({best['model']} {best['params']}, {best['size_bytes'] / 1024:.1f}KB)")
+        else:
+            print(f"\n No trial reached accuracy {target_accuracy}")
+    return results
@@ -0,0 +1,18 @@
+# === Define Malayalam alphabets in ISL order ===
+malayalam_alphabets = [
+    # Vowels
+    'അ', 'ആ', 'ഇ', 'ഈ', 'ഉ', 'ഊ', 'ഋ', 'എ', 'ഏ', 'ഐ', 'ഒ', 'ഓ', 'ഔ', 'അം', 'അഃ',
+
+    # Consonants
+    'ക', 'ഖ', 'ഘ', 'ഗ', 'ങ',
+    'ച', 'ഛ', 'ജ', 'ഝ', 'ഞ',
+    'ട', 'ഠ', 'ഡ', 'ഢ', 'ണ',
+    'ത', 'ഥ', 'ദ', 'ധ', 'ന',
+    'പ', 'ഫ', 'ബ', 'ഭ', 'മ',
+    'യ', 'ര', 'ല', 'വ',
+    'ശ', 'ഷ', 'സ', 'ഹ',
+    'ള', 'ഴ', 'റ',
+
+    # Additional characters
+    'ൺ', 'ൻ', 'ർ', 'ൽ', 'ൾ'
+]
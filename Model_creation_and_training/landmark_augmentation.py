@@ -0,0 +1,132 @@
+import argparse
+import time
+import numpy as np
+
+from landmark_features import NUM_LANDMARKS, batch_features, features_to_landmarks
+
+
+def rotation_matrices(angles):
+    """(N, 3, 3) rotations from (N, 3) angles in radians (x, then y, then z)"""
+    cx, cy, cz = np.cos(angles).T
+    sx, sy, sz = np.sin(angles).T
+    n = len(angles)
+    rx = np.zeros((n, 3, 3))
+    rx[:, 0, 0] = 1
+    rx[:, 1, 1], rx[:, 1, 2], rx[:, 2, 1], rx[:, 2, 2] = cx, -sx, sx, cx
+    ry = np.zeros((n, 3, 3))
+    ry[:, 1, 1] = 1
+    ry[:, 0, 0], ry[:, 0, 2], ry[:, 2, 0], ry[:, 2, 2] = cy, sy, -sy, cy
+    rz = np.zeros((n, 3, 3))
+    rz[:, 2, 2] = 1
+    rz[:, 0, 0], rz[:, 0, 1], rz[:, 1, 0], rz[:, 1, 1] = cz, -sz, sz, cz
+    return rz @ ry @ rx
+
+
+class LandmarkAugmenter:
+    """Random label-preserving changes to a batch of wrist-relative landmark features.
+
+    Works on whole (N, 2, 21, 3) arrays, one draw per sample:
+    - a small 3D rotation about the wrist (rotation_deg around z, half of it around x/y)
+    - a uniform scale in scale_range
+    - Gaussian jitter on every landmark except the wrist
+    - with mirror_prob, a left/right mirror: x is negated and the L and R blocks swap
+    - with drop_prob, drop_fraction of the landmarks collapse onto the wrist (missed points)
+    Hands that were not detected (all-zero blocks) stay all zero.
+    """
+
+    def __init__(self, rotation_deg=10.0, scale_range=(0.9, 1.1), jitter=0.003, mirror_prob=0.25,
+                 drop_prob=0.2, drop_fraction=0.1, seed=None):
+        self.rotation_deg = rotation_deg
+        self.scale_range = scale_range
+        self.jitter = jitter
+        self.mirror_prob = mirror_prob
+        self.drop_prob = drop_prob
+        self.drop_fraction = drop_fraction
+        self.rng = np.random.default_rng(seed)
+
+    def config(self):
+        return {"rotation_deg": self.rotation_deg, "scale_range": list(self.scale_range), "jitter": self.jitter,
+                "mirror_prob": self.mirror_prob, "drop_prob": self.drop_prob, "drop_fraction": self.drop_fraction}
+
+    def augment_landmarks(self, hands):
+        """(N, 2, 21, 3) wrist-relative landmarks -> augmented copy"""
+        rng = self.rng
+        n = len(hands)
+        present = np.any(hands != 0, axis=(2, 3))  # (N, 2)
+
+        limit = np.radians(self.rotation_deg)
+        angles = rng.uniform(-1, 1, size=(n, 3)) * np.array([limit / 2, limit / 2, limit])
+        transform = rotation_matrices(angles) * rng.uniform(*self.scale_range, size=(n, 1, 1))
+        # (N, 2, 21, 3) @ (N, 1, 3, 3)^T: the same rotation and scale for both hands of a sample
+        out = hands @ transform[:, np.newaxis].transpose(0, 1, 3, 2)
+
+        if self.jitter:
+            noise = rng.normal(0.0, self.jitter, size=out.shape)
+            noise[:, :, 0] = 0  # the wrist is the origin of the feature space
+            out += noise * present[:, :, np.newaxis, np.newaxis]
+
+        if self.drop_prob:
+            dropped = rng.random((n, 2, NUM_LANDMARKS)) < self.drop_fraction
+            dropped &= (rng.random(n) < self.drop_prob)[:, np.newaxis, np.newaxis]
+            out[dropped] = 0
+
+        if self.mirror_prob:
+            mirror = rng.random(n) < self.mirror_prob
+            out[mirror] = out[mirror][:, ::-1]
+            out[mirror, :, :, 0] *= -1
+        return out
+
+    def __call__(self, features):
+        """(N, 126) raw wrist-relative features -> augmented float32 features"""
+        hands = self.augment_landmarks(features_to_landmarks(np.asarray(features, dtype=np.float64)))
+        return batch_features(hands, dtype=np.float32)
+
+
+def augmented_dataset(X_raw, y, mean, scale, augmenter, batch_size=32, shuffle_seed=42):
+    """tf.data pipeline of augmented, standardized training batches.
+
+    Each batch is drawn from the raw (unscaled) rows, augmented in one vectorized call and
+    standardized with the fitted scaler, on a background thread and prefetched, so nothing
+    augmented is ever written to disk and the trainer does not wait on it.
+    """
+    import tensorflow as tf
+    mean = np.asarray(mean, dtype=np.float32)
+    scale = np.asarray(scale, dtype=np.float32)
+
+    def augment(features, labels):
+        return (augmenter(features) - mean) / scale, labels
+
+    def tf_augment(features, labels):
+        features, labels = tf.numpy_function(augment, [features, labels], [tf.float32, labels.dtype])
+        features.set_shape([None, X_raw.shape[1]])
+        labels.set_shape([None])
+        return features, labels
+
+    return (tf.data.Dataset.from_tensor_slices((np.asarray(X_raw, dtype=np.float32), np.asarray(y)))
+            .shuffle(len(X_raw), seed=shuffle_seed, reshuffle_each_iteration=True)
+            .batch(batch_size)
+            .map(tf_augment, num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+def benchmark(X_raw, batch_size=32, batches=500):
+    """Augmented rows per second for one vectorized call per batch"""
+    augmenter = LandmarkAugmenter(seed=0)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(batches):
+        augmenter(X_raw[rng.integers(len(X_raw), size=batch_size)])
+    elapsed = time.perf_counter() - start
+    print(f" Augmentation: {batches * batch_size / elapsed:,.0f} rows/s"
+          f" ({elapsed / batches * 1000:.3f} ms per batch of {batch_size})")
+
+
+if __name__ == "__main__":
+    from train_models import CSV_PATH, load_dataframe, prepare_features
+    parser = argparse.ArgumentParser(description="Benchmark the landmark augmentation stage")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--batches', type=int, default=500)
+    args = parser.parse_args()
+    X, _, _, _, _ = prepare_features(load_dataframe(args.csv), verbose=False)
+    benchmark(np.asarray(X), args.batch_size, args.batches)
@@ -0,0 +1,115 @@
+import numpy as np
+
+# === Feature layout ===
+# Matches "feature_order" in malayalam_isl_info.json:
+# L_x0..L_x20, L_y0..L_y20, L_z0..L_z20, R_x0..R_x20, R_y0..R_y20, R_z0..R_z20
+NUM_LANDMARKS = 21
+NUM_AXES = 3
+HAND_ORDER = ('Left', 'Right')
+FEATURES_PER_HAND = NUM_LANDMARKS * NUM_AXES  # 63
+NUM_FEATURES = FEATURES_PER_HAND * len(HAND_ORDER)  # 126
+
+FEATURE_COLUMNS = [f'{hand[0]}_{axis}{i}'
+                   for hand in HAND_ORDER
+                   for axis in ['x', 'y', 'z']
+                   for i in range(NUM_LANDMARKS)]
+
+CSV_HEADER = ['label', 'image_path', 'is_left', 'is_right'] + FEATURE_COLUMNS
+
+HAND_SLOT = {label: slot for slot, label in enumerate(HAND_ORDER)}
+
+
+def landmarks_to_array(hand_landmark, out=None, dtype=np.float64):
+    """Copy one MediaPipe hand's 21 landmarks into a (21, 3) array"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, NUM_AXES), dtype=dtype)
+    flat = out.reshape(-1)
+    flat[:] = np.fromiter(
+        (c for lm in hand_landmark.landmark for c in (lm.x, lm.y, lm.z)),
+        dtype=out.dtype, count=FEATURES_PER_HAND,
+    )
+    return out
+
+
+def batch_features(hands_array, out=None, dtype=np.float64):
+    """Convert (N, 2, 21, 3) raw landmarks (L, R slots) into (N, 126) wrist-relative features.
+
+    Slots that are all zero (hand not detected) stay all zero, which is the same
+    convention the capture script has always written to the CSV.
+    """
+    hands_array = np.asarray(hands_array)
+    if hands_array.ndim != 4 or hands_array.shape[1:] != (2, NUM_LANDMARKS, NUM_AXES):
+        raise ValueError(f"Expected shape (N, 2, 21, 3), got {hands_array.shape}")
+    n = hands_array.shape[0]
+    if out is None:
+        out = np.empty((n, NUM_FEATURES), dtype=dtype)
+    # (N, 2, 21, 3) -> (N, 2, 3, 21) view of the output buffer
+    view = out.reshape(n, 2, NUM_AXES, NUM_LANDMARKS)
+    np.subtract(hands_array.transpose(0, 1, 3, 2),
+                hands_array[:, :, 0, :, np.newaxis], out=view)
+    return out
+
+
+def features_to_landmarks(features):
+    """Inverse layout of batch_features: (N, 126) -> (N, 2, 21, 3) wrist-relative landmarks"""
+    features = np.asarray(features)
+    n = features.shape[0]
+    return features.reshape(n, 2, NUM_AXES, NUM_LANDMARKS).transpose(0, 1, 3, 2)
+
+
+class LandmarkFeatureExtractor:
+    """Builds the 126-float feature vector for a frame using preallocated buffers.
+
+    The returned vector is a view of an internal buffer and is overwritten by
+    the next call; copy it if it needs to outlive the frame.
+    """
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self._raw = np.zeros((1, 2, NUM_LANDMARKS, NUM_AXES), dtype=dtype)
+        self._features = np.zeros((1, NUM_FEATURES), dtype=dtype)
+        self.is_left = 0
+        self.is_right = 0
+
+    @property
+    def features(self):
+        return self._features[0]
+
+    @property
+    def has_hand(self):
+        return bool(self.is_left or self.is_right)
+
+    def from_array(self, hands, hand_labels):
+        """Fill from a raw (n_hands, 21, 3) array and matching 'Left'/'Right' labels"""
+        hands = np.asarray(hands)
+        self._raw.fill(0)
+        self.is_left, self.is_right = 0, 0
+        for idx, hand_label in enumerate(hand_labels):
+            slot = HAND_SLOT[hand_label]
+            self._raw[0, slot] = hands[idx]
+            if slot == 0:
+                self.is_left = 1
+            else:
+                self.is_right = 1
+        batch_features(self._raw, out=self._features)
+        return self.features
+
+    def from_results(self, result):
+        """Fill from a MediaPipe Hands result"""
+        self._raw.fill(0)
+        self.is_left, self.is_right = 0, 0
+        if result.multi_hand_landmarks and result.multi_handedness:
+            for idx, hand_landmark in enumerate(result.multi_hand_landmarks):
+                hand_label = result.multi_handedness[idx].classification[0].label  # 'Left' or 'Right'
+                slot = HAND_SLOT[hand_label]
+                landmarks_to_array(hand_landmark, out=self._raw[0, slot])
+                if slot == 0:
+                    self.is_left = 1
+                else:
+                    self.is_right = 1
+        batch_features(self._raw, out=self._features)
+        return self.features
+
+    def csv_row(self, label, image_path):
+        """Row in the data_both_hands.csv schema for the last extracted frame"""
+        return [label, image_path, self.is_left, self.is_right] + self.features.tolist()
@@ -0,0 +1,234 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 20, 35, 50, 75, 100, 200, 500)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: O(1) memory no matter how long the recognizer runs"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.last_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.last_ms = ms
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (inf when it is in the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets_ms + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        return {"count": self.count, "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+                "last_ms": self.last_ms, "p50_ms": self.quantile(0.5), "p95_ms": self.quantile(0.95),
+                "p99_ms": self.quantile(0.99)}
+
+
+class Metrics:
+    """Thread-safe stage timers, counters and gauges for one recognizer instance"""
+
+    def __init__(self, instance=None, buckets_ms=LATENCY_BUCKETS_MS):
+        self.instance = instance or f"{os.uname().nodename if hasattr(os, 'uname') else 'host'}:{os.getpid()}"
+        self.buckets_ms = buckets_ms
+        self.started = time.monotonic()
+        self.counters = Counter()
+        self.histograms = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def observe(self, stage, ms):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets_ms)
+            histogram.observe(ms)
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def set(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            return {"instance": self.instance, "uptime_seconds": time.monotonic() - self.started,
+                    "counters": dict(self.counters), "gauges": dict(self.gauges),
+                    "stages": {stage: h.summary() for stage, h in self.histograms.items()}}
+
+    def prometheus_text(self, prefix="recognizer"):
+        """Prometheus text exposition format (counters, gauges and cumulative histogram buckets)"""
+        label = f'instance="{self.instance}"'
+        lines = [f"# TYPE {prefix}_uptime_seconds gauge",
+                 f"{prefix}_uptime_seconds{{{label}}} {time.monotonic() - self.started:.3f}"]
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total{{{label}}} {value}"]
+            for name, value in sorted(self.gauges.items()):
+                lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name}{{{label}}} {value:.6g}"]
+            lines.append(f"# TYPE {prefix}_stage_latency_ms histogram")
+            for stage, h in sorted(self.histograms.items()):
+                stage_label = f'{label},stage="{stage}"'
+                cumulative = 0
+                for bound, n in zip(h.buckets_ms + (float("inf"),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{prefix}_stage_latency_ms_bucket{{{stage_label},le="{le}"}} {cumulative}')
+                lines.append(f"{prefix}_stage_latency_ms_sum{{{stage_label}}} {h.sum_ms:.3f}")
+                lines.append(f"{prefix}_stage_latency_ms_count{{{stage_label}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+# ========== Export ==========
+def serve_metrics(metrics, port, host="127.0.0.1"):
+    """GET /metrics (Prometheus text) and /metrics.json on a daemon thread; returns the server"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()).encode("utf-8"), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+class JsonDumper:
+    """Rewrites a JSON snapshot every `interval` seconds (atomically, via a temp file)"""
+
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="metrics-json", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def dump(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.metrics.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.dump()
+
+
+# ========== HUD ==========
+def draw_hud(frame, metrics, stages=("detect", "classify"), fps_gauges=("display_fps", "recognition_fps")):
+    """FPS and p50/last stage latencies in the top-right corner of a BGR frame"""
+    import cv2
+    snapshot = metrics.snapshot()
+    lines = [f"{name.replace('_fps', '')} {snapshot['gauges'].get(name, 0.0):.1f} fps" for name in fps_gauges]
+    for stage in stages:
+        stats = snapshot["stages"].get(stage)
+        if stats:
+            lines.append(f"{stage} {stats['last_ms']:.1f} ms (p50 <={stats['p50_ms']:g})")
+    x = frame.shape[1] - 260
+    for i, line in enumerate(lines):
+        cv2.putText(frame, line, (x, 25 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 255), 1, cv2.LINE_AA)
+    return frame
+
+
+# ========== Profiling ==========
+def profiled(func, profile):
+    """Wrap func so every call runs under a cProfile.Profile (works on any thread)"""
+    def wrapper(*args, **kwargs):
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+    return wrapper
+
+
+class StackSampler:
+    """Low-overhead sampling profiler: every `interval` seconds, counts the innermost
+    frame of each other thread, so it can stay on in production."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                code = frame.f_code
+                self.samples[(names.get(ident, str(ident)),
+                              f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")] += 1
+                self.total += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def top(self, n=15):
+        """[(thread, location, share of samples)] most frequent first"""
+        return [(thread, location, count / self.total)
+                for (thread, location), count in self.samples.most_common(n)] if self.total else []
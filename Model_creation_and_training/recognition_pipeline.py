@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import deque
+import cv2
+
+
+class LatestQueue:
+    """Bounded hand-off queue that drops the oldest item instead of blocking the producer"""
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest queued item, or None on timeout"""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+
+class StageStats:
+    """Per-stage counters with a rolling throughput estimate"""
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.count = 0
+        self.busy_seconds = 0.0
+        self._times = deque()
+        self._lock = threading.Lock()
+
+    def record(self, seconds=0.0):
+        now = time.monotonic()
+        with self._lock:
+            self.count += 1
+            self.busy_seconds += seconds
+            self._times.append(now)
+            while self._times and now - self._times[0] > self.window:
+                self._times.popleft()
+
+    @property
+    def fps(self):
+        with self._lock:
+            if len(self._times) < 2:
+                return 0.0
+            span = self._times[-1] - self._times[0]
+            return (len(self._times) - 1) / span if span > 0 else 0.0
+
+
+class RecognitionPipeline:
+    """Camera reader thread -> recognition worker thread -> caller-side display.
+
+    The camera thread always runs at full rate. The worker only ever sees the newest
+    frame (older ones are dropped), so recognition latency does not build up when
+    MediaPipe or the classifier is slow. `process_frame(frame)` runs on the worker
+    thread and its return value is published as the latest result.
+    """
+
+    def __init__(self, capture, process_frame, flip=True):
+        self.capture = capture
+        self.process_frame = process_frame
+        self.flip = flip
+        self.display_queue = LatestQueue(maxsize=1)
+        self.work_queue = LatestQueue(maxsize=1)
+        self.stats = {'capture': StageStats(), 'recognition': StageStats(), 'display': StageStats()}
+        self._result = None
+        self._result_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.finished = threading.Event()
+
+    def start(self):
+        self._threads = [threading.Thread(target=self._read_loop, name="camera-reader", daemon=True),
+                         threading.Thread(target=self._work_loop, name="recognition-worker", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def _read_loop(self):
+        frame_id = 0
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            if self.flip:
+                frame = cv2.flip(frame, 1)
+            timestamp = time.monotonic()
+            # The display side draws on its frame, so it gets its own copy
+            self.display_queue.put((frame_id, timestamp, frame.copy()))
+            self.work_queue.put((frame_id, timestamp, frame))
+            self.stats['capture'].record(time.perf_counter() - start)
+            frame_id += 1
+        self.finished.set()
+
+    def _work_loop(self):
+        while not self._stop.is_set():
+            item = self.work_queue.get(timeout=0.1)
+            if item is None:
+                if self.finished.is_set():
+                    break
+                continue
+            frame_id, timestamp, frame = item
+            start = time.perf_counter()
+            result = self.process_frame(frame)
+            self.stats['recognition'].record(time.perf_counter() - start)
+            with self._result_lock:
+                self._result = (frame_id, timestamp, result)
+
+    def latest_result(self):
+        """(frame_id, capture timestamp, result) of the newest recognized frame, or None"""
+        with self._result_lock:
+            return self._result
+
+    def next_frame(self, timeout=1.0):
+        """Newest captured (frame_id, timestamp, frame) for display, or None"""
+        item = self.display_queue.get(timeout)
+        if item is not None:
+            self.stats['display'].record()
+        return item
+
+    def summary(self):
+        return {
+            'capture_fps': self.stats['capture'].fps,
+            'recognition_fps': self.stats['recognition'].fps,
+            'display_fps': self.stats['display'].fps,
+            'frames_captured': self.stats['capture'].count,
+            'frames_recognized': self.stats['recognition'].count,
+            'frames_dropped': self.work_queue.dropped,
+        }
@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from landmark_features import NUM_FEATURES
+from sign_classifier import load_classifier, MODEL_PATH, SCALER_PATH, LABEL_MAP_PATH
+
+# Localhost HTTP/1.1 (keep-alive) API:
+#   POST /predict   {"features": [126 floats] or [[126 floats], ...], "top_k": 3}
+#   POST /frame     JPEG/PNG body (runs MediaPipe on the server), optional ?top_k=3
+#   GET  /stats
+# Responses: {"predictions": [{"has_hand": true, "top_k": [[label, confidence], ...]}, ...]}
+# An all-zero row has no hand ("has_hand": false, empty top_k); a malformed row gets
+# {"error": "..."} in its slot without failing the other rows of the request.
+
+
+# ========== Micro-batching ==========
+class MicroBatcher:
+    """Coalesces single-row requests from many clients into batches.
+
+    A batch is dispatched when it reaches max_batch rows or max_wait_ms after its first row
+    arrived. Batches run on a pool of classifiers (one interpreter each) in worker threads,
+    so up to pool_size batches are in flight while the event loop keeps accepting requests.
+    """
+
+    def __init__(self, classifiers, max_batch=64, max_wait_ms=2.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.num_classes = classifiers[0].num_classes
+        self.index_to_label = classifiers[0].index_to_label
+        self._classifiers = classifiers
+        self._executor = ThreadPoolExecutor(max_workers=len(classifiers))
+        self._pending = None
+        self._free = None
+        self._task = None
+        self.batches = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        self._pending = asyncio.Queue()
+        self._free = asyncio.Queue()
+        for classifier in self._classifiers:
+            self._free.put_nowait(classifier)
+        self._task = asyncio.get_running_loop().create_task(self._collect())
+        return self
+
+    async def stop(self):
+        self._task.cancel()
+        self._executor.shutdown(wait=True)
+
+    async def predict(self, rows):
+        """Probabilities for an (n, 126) float32 array; awaits until its batch has run"""
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._pending.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._pending.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                size += len(item[0])
+            classifier = await self._free.get()
+            loop.create_task(self._run(classifier, items))
+
+    async def _run(self, classifier, items):
+        loop = asyncio.get_running_loop()
+        batch = np.concatenate([rows for rows, _ in items])
+        start = time.perf_counter()
+        try:
+            probs = await loop.run_in_executor(self._executor, classifier.predict_proba, batch)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._free.put_nowait(classifier)
+        self.busy_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.rows += len(batch)
+        offset = 0
+        for rows, future in items:
+            if not future.done():
+                future.set_result(probs[offset:offset + len(rows)])
+            offset += len(rows)
+
+
+# ========== Frames ==========
+class FrameDetector:
+    """MediaPipe on a small thread pool, one Hands instance per thread (they are not thread-safe)"""
+
+    def __init__(self, workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._local = threading.local()
+
+    def _detect(self, data):
+        import cv2
+        from landmark_features import LandmarkFeatureExtractor
+        if not hasattr(self._local, "hands"):
+            import mediapipe as mp
+            self._local.hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=2,
+                                                         min_detection_confidence=0.7)
+            self._local.extractor = LandmarkFeatureExtractor()
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("could not decode image")
+        extractor = self._local.extractor
+        features = extractor.from_results(self._local.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+        return features.astype(np.float32), extractor.has_hand
+
+    async def detect(self, data):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._detect, data)
+
+
+# ========== HTTP ==========
+async def read_request(reader):
+    """(method, path, query, headers, body) or None when the client closed the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    path, _, query = target.partition("?")
+    params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+    return method, path, params, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                 .encode("latin-1") + body)
+
+
+class RecognitionService:
+    def __init__(self, batcher, detector=None, default_top_k=3):
+        self.batcher = batcher
+        self.detector = detector
+        self.default_top_k = default_top_k
+        self.requests = 0
+        self.started = time.time()
+
+    def _top_k(self, probs, k):
+        order = np.argsort(probs)[::-1][:k]
+        return [[self.batcher.index_to_label[int(i)], round(float(probs[i]), 6)] for i in order]
+
+    @staticmethod
+    def _parse_row(row):
+        """(float32 features, None) or (None, error message) for one request row"""
+        try:
+            features = np.asarray(row, dtype=np.float32)
+        except (TypeError, ValueError):
+            return None, "row is not a list of numbers"
+        if features.shape != (NUM_FEATURES,):
+            return None, f"expected {NUM_FEATURES} features per row, got shape {list(features.shape)}"
+        if not np.all(np.isfinite(features)):
+            return None, "row contains NaN or infinite values"
+        return features, None
+
+    async def _predict_features(self, payload):
+        rows = payload["features"]
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("features must be a non-empty list")
+        if not isinstance(rows[0], list):
+            rows = [rows]
+        k = int(payload.get("top_k", self.default_top_k))
+
+        predictions = [None] * len(rows)
+        valid, indices = [], []
+        for i, row in enumerate(rows):
+            features, error = self._parse_row(row)
+            if error is not None:
+                predictions[i] = {"error": error}
+            elif not features.any():
+                predictions[i] = {"has_hand": False, "top_k": []}
+            else:
+                valid.append(features)
+                indices.append(i)
+        if valid:
+            probs = await self.batcher.predict(np.stack(valid))
+            for i, p in zip(indices, probs):
+                predictions[i] = {"has_hand": True, "top_k": self._top_k(p, k)}
+        return {"predictions": predictions}
+
+    async def _predict_frame(self, body, params):
+        if self.detector is None:
+            raise ValueError("frame input is disabled (start with --frames)")
+        features, has_hand = await self.detector.detect(body)
+        if not has_hand:
+            return {"predictions": [{"has_hand": False, "top_k": []}]}
+        probs = await self.batcher.predict(features.reshape(1, -1))
+        return {"predictions": [{"has_hand": True,
+                                 "top_k": self._top_k(probs[0], int(params.get("top_k", self.default_top_k)))}]}
+
+    def stats(self):
+        b = self.batcher
+        return {"uptime_seconds": time.time() - self.started, "requests": self.requests,
+                "batches": b.batches, "rows": b.rows,
+                "mean_batch_size": (b.rows / b.batches) if b.batches else 0.0,
+                "busy_seconds": b.busy_seconds}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    break
+                if request is None:
+                    break
+                method, path, params, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.requests += 1
+                try:
+                    if method == "POST" and path == "/predict":
+                        status, payload = 200, await self._predict_features(json.loads(body))
+                    elif method == "POST" and path == "/frame":
+                        status, payload = 200, await self._predict_frame(body, params)
+                    elif method == "GET" and path == "/stats":
+                        status, payload = 200, self.stats()
+                    else:
+                        status, payload = 404, {"error": f"no route for {method} {path}"}
+                except (ValueError, KeyError, TypeError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    classifiers = [load_classifier(args.backend, args.model, args.scaler, args.labels,
+                                   batch_size=args.max_batch, num_threads=args.threads)
+                   for _ in range(args.pool_size)]
+    batcher = MicroBatcher(classifiers, args.max_batch, args.max_wait_ms).start()
+    service = RecognitionService(batcher, FrameDetector(args.frame_workers) if args.frames else None, args.top_k)
+    server = await asyncio.start_server(service.handle, args.host, args.port)
+    print(f" Serving on http://{args.host}:{args.port} ({args.backend}, {args.pool_size} interpreters,"
+          f" batches of <= {args.max_batch} within {args.max_wait_ms} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+        stats = service.stats()
+        print(f"\n {stats['requests']} requests, {stats['rows']} rows in {stats['batches']} batches"
+              f" (mean batch {stats['mean_batch_size']:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Localhost recognition service with micro-batching across clients")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--backend', choices=("tflite", "forest"), default="tflite")
+    parser.add_argument('--pool-size', type=int, default=2, help="Interpreters (batches in flight)")
+    parser.add_argument('--threads', type=int, default=1, help="Threads per interpreter")
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Batching window after the first request")
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--frames', action='store_true', help="Also accept encoded frames on POST /frame")
+    parser.add_argument('--frame-workers', type=int, default=2, help="MediaPipe threads for /frame")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
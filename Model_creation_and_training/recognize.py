@@ -1,111 +1,182 @@
+import argparse
+import time
 import cv2
-import numpy as np
 import mediapipe as mp
-import json
-from PIL import ImageFont, ImageDraw, Image
-import tensorflow as tf
-
-# === Load TFLite Model and Allocator ===
-interpreter = tf.lite.Interpreter(model_path="model.tflite")
-interpreter.allocate_tensors()
-
-input_details = interpreter.get_input_details()
-output_details = interpreter.get_output_details()
-
-# === Load scaler params from JSON ===
-with open("scaler_params.json", "r") as f:
-    scaler_params = json.load(f)
-scaler_mean = np.array(scaler_params["mean"])
-scaler_scale = np.array(scaler_params["scale"])
-
-def scale_input(input_vector):
-    return (np.array(input_vector) - scaler_mean) / scaler_scale
-
-# === Load label map from JSON ===
-with open("label_map.json", "r", encoding="utf-8") as f:
-    label_map = json.load(f)
-index_to_label = {int(k): v for k, v in label_map.items()}
+from detection_frontend import AdaptiveHandDetector
+from landmark_features import LandmarkFeatureExtractor
+from metrics import Metrics, JsonDumper, StackSampler, draw_hud, profiled, serve_metrics
+from recognition_pipeline import RecognitionPipeline
+from sign_classifier import load_classifier
+from stable_recognizer import StableRecognizer
+from text_overlay import MalayalamTextRenderer
+
+parser = argparse.ArgumentParser(description="Real-time Malayalam sign recognition")
+parser.add_argument('--backend', choices=("tflite", "forest"), default="tflite",
+                    help="Classifier: the TFLite MLP or the flattened RandomForest (random_forest_model.npz)")
+parser.add_argument('--cascade', action='store_true',
+                    help="Only run the backend when the nearest-centroid stage is unsure (cascade_params.json)")
+parser.add_argument('--lexicon', help="Word list for suggestions (one word per line, optional frequency)")
+parser.add_argument('--confusables', help="JSON {letter: [confusable letters]} for suggestion matching")
+parser.add_argument('--detect-width', type=int, default=None,
+                    help="Downsample frames to this width before MediaPipe (default: full resolution)")
+parser.add_argument('--stride', type=int, default=1, help="Run MediaPipe on every Nth frame, extrapolate in between")
+parser.add_argument('--target-fps', type=float, default=None,
+                    help="Adjust detection width and stride automatically to hold this recognition rate")
+parser.add_argument('--verbose', action='store_true', help="Print every committed letter")
+parser.add_argument('--hud', action='store_true', help="Show FPS and stage latencies on screen")
+parser.add_argument('--metrics-port', type=int, help="Serve Prometheus text on http://HOST:PORT/metrics")
+parser.add_argument('--metrics-host', default="127.0.0.1",
+                    help="Bind address for --metrics-port (0.0.0.0 lets a central Prometheus scrape it)")
+parser.add_argument('--metrics-json', help="Rewrite a JSON metrics snapshot to this file periodically")
+parser.add_argument('--metrics-interval', type=float, default=10.0, help="Seconds between JSON snapshots")
+parser.add_argument('--profile', metavar='PROF', help="cProfile the recognition worker, write stats here")
+parser.add_argument('--sample-profile', action='store_true',
+                    help="Sample thread stacks every 5 ms and print the hottest lines at exit")
+args = parser.parse_args()
+
+# === Metrics: stage timers, counters, gauges ===
+metrics = Metrics()
+metrics_server = serve_metrics(metrics, args.metrics_port, args.metrics_host) if args.metrics_port else None
+metrics_dumper = JsonDumper(metrics, args.metrics_json, args.metrics_interval).start() if args.metrics_json else None
+
+# === Load the classifier (model + scaler params) and label map ===
+classifier = load_classifier(args.backend, cascade_path="cascade_params.json" if args.cascade else None)
+index_to_label = classifier.index_to_label
+BACKEND_NAMES = {"tflite": "TFLite", "forest": "RandomForest"}
+window_title = f"Malayalam Sign Recognition ({BACKEND_NAMES[args.backend]}{' + cascade' if args.cascade else ''})"
+
+# Skips inference while the hand holds still and only commits letters that stay stable
+recognizer = StableRecognizer(classifier)
+committed_text = []
+
+# Word suggestions, updated incrementally as letters are committed
+suggestions = []
+word_session = None
+if args.lexicon:
+    from word_suggestions import WordSuggester
+    word_session = WordSuggester.from_file(args.lexicon, args.confusables).session()
 
 # === Font for Malayalam Rendering ===
-FONT_PATH = 'NotoSansMalayalam-VariableFont_wdth,wght.ttf'
+text_renderer = MalayalamTextRenderer()
+text_renderer.preload([f"അര്‍ത്ഥം: {label}" for label in index_to_label.values()], font_size=48)
+
 def draw_malayalam_text(frame, text, position, font_size=48):
-    image_pil = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-    draw = ImageDraw.Draw(image_pil)
-    try:
-        font = ImageFont.truetype(FONT_PATH, font_size)
-    except IOError:
-        print(" Malayalam font not found. Place font in working directory.")
-        return frame
-    draw.text(position, text, font=font, fill=(0, 255, 0))
-    return cv2.cvtColor(np.array(image_pil), cv2.COLOR_RGB2BGR)
+    return text_renderer.draw(frame, text, position, font_size)
 
 # === MediaPipe Hands Setup ===
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.5)
+detector = AdaptiveHandDetector(hands, width=args.detect_width, stride=args.stride, target_fps=args.target_fps)
+extractor = LandmarkFeatureExtractor()
+
+def recognize_frame(frame):
+    """Runs on the recognition worker thread: MediaPipe + feature building + classification"""
+    with metrics.timer("detect"):
+        result = detector.process(frame)
+
+    # Feature vector: 126 features (21 points × 3 coords × 2 hands), Left: 0–62, Right: 63–125
+    with metrics.timer("features"):
+        features = extractor.from_results(result)
+
+    # Predict only if at least one hand is detected (smoothed over recent frames).
+    # Only frames that actually ran the classifier are timed: no-hand and motion-gated
+    # frames return in microseconds and would hide the invoke cost
+    start = time.perf_counter()
+    state = recognizer.update(features, extractor.has_hand)
+    if state['inferred']:
+        metrics.observe("classify", (time.perf_counter() - start) * 1000)
+    metrics.inc("frames")
+    metrics.inc("detections" if not result.interpolated else "extrapolated")
+    if not extractor.has_hand:
+        metrics.inc("no_hand_frames")
+    elif state['inferred']:
+        metrics.inc("inferences")
+    else:
+        metrics.inc("skipped")
+    if state['committed'] is not None:
+        metrics.inc("committed")
+        committed_text.append(state['committed'])
+        if args.verbose:
+            print(f" Committed: {state['committed']}")
+        if word_session is not None:
+            # No word continues with this letter: treat it as the start of a new word
+            if not word_session.push(state['committed']):
+                word_session.reset()
+                word_session.push(state['committed'])
+            suggestions[:] = [word for word, _ in word_session.suggestions(3)]
+
+    return {'hand_landmarks': result.multi_hand_landmarks or [], 'label': state['label']}
+
+profile = None
+if args.profile:
+    import cProfile
+    profile = cProfile.Profile()
+    recognize_frame = profiled(recognize_frame, profile)
+sampler = StackSampler().start() if args.sample_profile else None
 
 # === Start Webcam ===
 cap = cv2.VideoCapture(0)
-print("📹 Starting real-time Malayalam sign recognition with TFLite... Press 'q' to exit.")
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
-
-    # Initialize feature vector: 126 features (21 points × 3 coords × 2 hands)
-    features = [0.0] * 126
-    hand_flags = {'Left': False, 'Right': False}
-
-    if result.multi_hand_landmarks and result.multi_handedness:
-        for idx, hand_landmark in enumerate(result.multi_hand_landmarks):
-            hand_label = result.multi_handedness[idx].classification[0].label  # 'Left' or 'Right'
-            hand_flags[hand_label] = True
-
-            wrist = hand_landmark.landmark[0]
-            coords = [
-                (
-                    lm.x - wrist.x,
-                    lm.y - wrist.y,
-                    lm.z - wrist.z
-                ) for lm in hand_landmark.landmark
-            ]
-
-            start_idx = 0 if hand_label == 'Left' else 63  # Left hand: 0–62, Right hand: 63–125
-            for i, (x, y, z) in enumerate(coords):
-                features[start_idx + i] = x
-                features[start_idx + 21 + i] = y
-                features[start_idx + 42 + i] = z
-
+pipeline = RecognitionPipeline(cap, recognize_frame).start()
+print(f"📹 Starting real-time Malayalam sign recognition with the {args.backend} backend... Press 'q' to exit.")
+
+while not pipeline.finished.is_set():
+    item = pipeline.next_frame(timeout=1.0)
+    if item is None:
+        continue
+    _, _, frame = item
+
+    # Overlay the newest recognition result on the newest camera frame
+    latest = pipeline.latest_result()
+    if latest is not None:
+        _, _, recognition = latest
+        for hand_landmark in recognition['hand_landmarks']:
             mp_drawing.draw_landmarks(frame, hand_landmark, mp_hands.HAND_CONNECTIONS)
+        if recognition['label'] is not None:
+            frame = draw_malayalam_text(frame, f"അര്‍ത്ഥം: {recognition['label']}", (10, 50))
+    if committed_text:
+        frame = draw_malayalam_text(frame, "".join(committed_text[-20:]), (10, 120), font_size=40)
+    if suggestions:
+        frame = draw_malayalam_text(frame, "  ".join(suggestions), (10, 180), font_size=36)
 
-    # Predict only if at least one hand is detected
-    if hand_flags['Left'] or hand_flags['Right']:
-        # Scale input features
-        input_data = scale_input(features).astype(np.float32).reshape(1, -1)
-
-        # Set tensor
-        interpreter.set_tensor(input_details[0]['index'], input_data)
-
-        # Run inference
-        interpreter.invoke()
-
-        # Get output and decode
-        output_data = interpreter.get_tensor(output_details[0]['index'])
-        predicted_index = np.argmax(output_data)
-        label = index_to_label[predicted_index]
-
-        frame = draw_malayalam_text(frame, f"അര്‍ത്ഥം: {label}", (10, 50))
+    for stage, stats in pipeline.stats.items():
+        metrics.set(f"{stage}_fps", stats.fps)
+    metrics.set("frames_dropped", pipeline.work_queue.dropped)
+    if args.hud:
+        frame = draw_hud(frame, metrics)
 
-    cv2.imshow("Malayalam Sign Recognition (TFLite)", frame)
+    cv2.imshow(window_title, frame)
 
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
+pipeline.stop()
 cap.release()
 cv2.destroyAllWindows()
+if metrics_dumper is not None:
+    metrics_dumper.stop()
+if metrics_server is not None:
+    metrics_server.shutdown()
+
+summary = pipeline.summary()
+print(f" Capture: {summary['capture_fps']:.1f} fps | Recognition: {summary['recognition_fps']:.1f} fps"
+      f" | Display: {summary['display_fps']:.1f} fps | Dropped: {summary['frames_dropped']} frames")
+detection = detector.summary()
+print(f" Detection: {detection['processed']} frames detected | {detection['interpolated']} extrapolated"
+      f" | final width {detection['width'] or 'full'}, stride {detection['stride']} | {detection['detect_ms']:.1f} ms")
+print(f" Inferences: {recognizer.inferences} | Skipped (hand still): {recognizer.skipped}")
+if args.cascade:
+    print(f" Cascade: {classifier.first_stage} first stage | {classifier.escalated} escalated")
+for stage, stats in metrics.snapshot()['stages'].items():
+    print(f" {stage:9s} {stats['count']:6d} calls | mean {stats['mean_ms']:.2f} ms | p95 <= {stats['p95_ms']:g} ms")
+if profile is not None:
+    profile.dump_stats(args.profile)
+    print(f" cProfile stats written to {args.profile} (python -m pstats {args.profile})")
+if sampler is not None:
+    sampler.stop()
+    print(" Hottest lines (share of stack samples):")
+    for thread, location, share in sampler.top(10):
+        print(f"   {share:6.1%} {thread:16s} {location}")
+if committed_text:
+    print(f" Recognized text: {''.join(committed_text)}")
 print(" Recognition session ended.")
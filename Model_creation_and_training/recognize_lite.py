@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Only the standard library is imported here: every heavy dependency is loaded inside
+# main() as a timed startup phase, so the report shows where cold-start time goes.
+
+
+def current_rss_mb():
+    """Resident set size right now (Linux), else the peak so far"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StartupReport:
+    """Wall time and RSS growth of each startup phase"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.base_rss_mb = current_rss_mb()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        rss = current_rss_mb()
+        t = time.perf_counter()
+        yield
+        self.phases.append({"phase": name, "seconds": time.perf_counter() - t,
+                            "rss_mb": current_rss_mb(), "rss_delta_mb": current_rss_mb() - rss})
+
+    def summary(self):
+        return {"total_seconds": time.perf_counter() - self.start, "base_rss_mb": self.base_rss_mb,
+                "phases": self.phases}
+
+    def print(self):
+        summary = self.summary()
+        print(f"\n Startup: {summary['total_seconds']:.2f}s (interpreter RSS {self.base_rss_mb:.0f} MB)")
+        print(f" {'phase':16s} {'seconds':>8s} {'+RSS MB':>8s} {'RSS MB':>8s}")
+        for p in self.phases:
+            print(f" {p['phase']:16s} {p['seconds']:8.3f} {p['rss_delta_mb']:8.1f} {p['rss_mb']:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slim real-time recognizer with a startup time / memory report")
+    parser.add_argument('--camera', type=int, default=0)
+    parser.add_argument('--backend', choices=("tflite", "forest"), default="tflite")
+    parser.add_argument('--bundle', default="recognizer_bundle.npz",
+                        help="Model + scaler + labels in one file (falls back to the separate files)")
+    parser.add_argument('--cascade', action='store_true', help="Use cascade_params.json in front of the backend")
+    parser.add_argument('--threads', type=int, default=None, help="Interpreter threads")
+    parser.add_argument('--preload-text', action='store_true',
+                        help="Rasterize every label at startup instead of on first use")
+    parser.add_argument('--startup-only', action='store_true', help="Print the startup report and exit")
+    parser.add_argument('--report', help="Also write the startup report to this JSON file")
+    args = parser.parse_args()
+
+    report = StartupReport()
+    with report.phase("numpy + cv2"):
+        import numpy as np
+        import cv2
+
+    with report.phase("classifier"):
+        from sign_classifier import load_classifier, interpreter_class
+        bundle = args.bundle if os.path.exists(args.bundle) else None
+        classifier = load_classifier(args.backend, num_threads=args.threads, bundle_path=bundle,
+                                     cascade_path="cascade_params.json" if args.cascade else None)
+        # Warm up so the first camera frame does not pay for lazy kernel setup
+        classifier.predict_proba(np.zeros(126, dtype=np.float32))
+
+    with report.phase("mediapipe"):
+        import mediapipe as mp
+        hands = mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.7,
+                                         min_tracking_confidence=0.5)
+
+    with report.phase("text overlay"):
+        from text_overlay import MalayalamTextRenderer
+        text_renderer = MalayalamTextRenderer()
+        if args.preload_text:
+            text_renderer.preload([f"അര്‍ത്ഥം: {label}" for label in classifier.index_to_label.values()], 48)
+
+    with report.phase("camera"):
+        cap = cv2.VideoCapture(args.camera)
+        camera_ok = cap.isOpened()
+
+    summary = report.summary()
+    summary["interpreter"] = interpreter_class().__module__ if args.backend == "tflite" else None
+    summary["bundle"] = bundle
+    report.print()
+    print(f" Interpreter: {summary['interpreter'] or args.backend} | Artifacts: {bundle or 'separate files'}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if args.startup_only or not camera_ok:
+        if not camera_ok:
+            print(f" Cannot open camera {args.camera}")
+        cap.release()
+        hands.close()
+        return
+
+    from landmark_features import LandmarkFeatureExtractor
+    from recognition_pipeline import RecognitionPipeline
+    from stable_recognizer import StableRecognizer
+    extractor = LandmarkFeatureExtractor()
+    recognizer = StableRecognizer(classifier)
+    drawing = mp.solutions.drawing_utils
+    committed_text = []
+
+    def recognize_frame(frame):
+        result = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        features = extractor.from_results(result)
+        state = recognizer.update(features, extractor.has_hand)
+        if state['committed'] is not None:
+            committed_text.append(state['committed'])
+        return {'hand_landmarks': result.multi_hand_landmarks or [], 'label': state['label']}
+
+    pipeline = RecognitionPipeline(cap, recognize_frame).start()
+    while not pipeline.finished.is_set():
+        item = pipeline.next_frame(timeout=1.0)
+        if item is None:
+            continue
+        _, _, frame = item
+        latest = pipeline.latest_result()
+        if latest is not None:
+            _, _, recognition = latest
+            for hand_landmark in recognition['hand_landmarks']:
+                drawing.draw_landmarks(frame, hand_landmark, mp.solutions.hands.HAND_CONNECTIONS)
+            if recognition['label'] is not None:
+                text_renderer.draw(frame, f"അര്‍ത്ഥം: {recognition['label']}", (10, 50), 48)
+        if committed_text:
+            text_renderer.draw(frame, "".join(committed_text[-20:]), (10, 120), 40)
+        cv2.imshow("Malayalam Sign Recognition", frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    pipeline.stop()
+    cap.release()
+    hands.close()
+    cv2.destroyAllWindows()
+    if committed_text:
+        print(f" Recognized text: {''.join(committed_text)}")
+
+
+if __name__ == "__main__":
+    main()
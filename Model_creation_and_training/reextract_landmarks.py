@@ -0,0 +1,179 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+import multiprocessing
+import numpy as np
+
+from landmark_features import CSV_HEADER, NUM_FEATURES
+from dataset_store import DatasetStore
+
+IMAGE_FOLDER = "malayalam_isl_images"
+CACHE_DIR = "landmark_cache"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Per-worker state (one MediaPipe Hands instance per process)
+_hands = None
+_extractor = None
+_cache_dir = None
+
+
+def settings_key(settings):
+    """Stable short hash of detector settings + MediaPipe version, used as the cache namespace"""
+    import mediapipe as mp
+    payload = json.dumps(dict(settings, mediapipe_version=mp.__version__), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def init_hands_worker(settings, cache_dir):
+    """Give this worker its own MediaPipe Hands instance and feature extractor"""
+    global _hands, _extractor, _cache_dir
+    import mediapipe as mp
+    from landmark_features import LandmarkFeatureExtractor
+    _hands = mp.solutions.hands.Hands(static_image_mode=True, **settings)
+    _extractor = LandmarkFeatureExtractor()
+    _cache_dir = cache_dir
+
+
+def _cache_path(digest):
+    return os.path.join(_cache_dir, digest[:2], digest + ".npy")
+
+
+def _process_image(path):
+    """Return (path, is_left, is_right, features, cache_hit) or (path, None, ...) if unreadable"""
+    import cv2
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    cache_path = _cache_path(digest)
+    if os.path.exists(cache_path):
+        cached = np.load(cache_path)
+        return path, int(cached[0]), int(cached[1]), cached[2:], True
+
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return path, None, None, None, False
+    # Saved frames are already mirrored by the capture script, so no flip here
+    features = _extractor.from_results(_hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+    record = np.empty(NUM_FEATURES + 2, dtype=np.float64)
+    record[0], record[1] = _extractor.is_left, _extractor.is_right
+    record[2:] = features
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, record)
+    os.replace(tmp_path, cache_path)
+    return path, _extractor.is_left, _extractor.is_right, record[2:], False
+
+
+def list_images(image_folder):
+    """(label, path) for every image under <image_folder>/<label>/"""
+    items = []
+    for label in sorted(os.listdir(image_folder)):
+        folder = os.path.join(image_folder, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((label, os.path.join(folder, name)))
+    return items
+
+
+def reextract(image_folder=IMAGE_FOLDER, settings=None, cache_dir=CACHE_DIR, workers=None, chunksize=16):
+    """Yield (label, image_path, is_left, is_right, features) for every readable image.
+
+    Results are cached per image content hash under cache_dir/<settings key>/, so a
+    rerun with the same settings only processes new or changed images.
+    """
+    settings = dict(settings or {})
+    settings.setdefault("max_num_hands", 2)
+    settings.setdefault("min_detection_confidence", 0.7)
+    namespace = os.path.join(cache_dir, settings_key(settings))
+    os.makedirs(namespace, exist_ok=True)
+
+    items = list_images(image_folder)
+    labels = {path: label for label, path in items}
+    stats = {"images": len(items), "cache_hits": 0, "processed": 0, "unreadable": 0}
+    start = time.perf_counter()
+    # spawn, not fork: settings_key() has already imported MediaPipe in the parent
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers, initializer=init_hands_worker, initargs=(settings, namespace)) as pool:
+        for path, is_left, is_right, features, hit in pool.imap(_process_image, [p for _, p in items],
+                                                               chunksize=chunksize):
+            if is_left is None:
+                stats["unreadable"] += 1
+                continue
+            stats["cache_hits" if hit else "processed"] += 1
+            yield labels[path], path, is_left, is_right, features
+    stats["seconds"] = time.perf_counter() - start
+    print(f" Re-extracted {stats['images']} images in {stats['seconds']:.1f}s"
+          f" ({stats['processed']} processed, {stats['cache_hits']} from cache,"
+          f" {stats['unreadable']} unreadable)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run MediaPipe Hands over the saved image corpus")
+    parser.add_argument('--images', default=IMAGE_FOLDER)
+    parser.add_argument('--cache', default=CACHE_DIR)
+    parser.add_argument('--csv', help="Write rows in the data_both_hands.csv schema to this file")
+    parser.add_argument('--store', help="Write rows into a new (or empty) dataset store at this folder")
+    parser.add_argument('--replace', action='store_true',
+                        help="Allow a non-empty --store: swap each label's rows for the new ones as they are written")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--min-detection-confidence', type=float, default=0.7)
+    parser.add_argument('--model-complexity', type=int, default=1)
+    parser.add_argument('--max-num-hands', type=int, default=2)
+    args = parser.parse_args()
+    if not args.csv and not args.store:
+        parser.error("Pass --csv and/or --store")
+    store = DatasetStore(args.store) if args.store else None
+    if store is not None and len(store) > 0:
+        if not args.replace:
+            parser.error(f"{args.store} already holds {len(store)} rows; appending would duplicate them"
+                         " (pass --replace to swap its labels for the new rows)")
+    # Old rows of a label stay live until its new segment is committed, so an interrupted
+    # run leaves every label with either its old or its new rows
+    stale_labels = set(store.labels()) if store is not None else set()
+
+    settings = {"max_num_hands": args.max_num_hands,
+                "min_detection_confidence": args.min_detection_confidence,
+                "model_complexity": args.model_complexity}
+
+    csv_file = writer = None
+    if args.csv:
+        csv_file = open(args.csv, mode='w', newline='', encoding='utf-8')
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_HEADER)
+
+    # Buffer per label so each label becomes one store segment
+    current_label, pending = None, []
+    try:
+        for label, path, is_left, is_right, features in reextract(args.images, settings, args.cache, args.workers):
+            row = [label, path, is_left, is_right] + features.tolist()
+            if writer:
+                writer.writerow(row)
+            if store is not None:
+                if label != current_label and pending:
+                    store.append_rows(pending, replace=args.replace)
+                    stale_labels.discard(current_label)
+                    pending = []
+                current_label = label
+                pending.append(row)
+        if store is not None and pending:
+            store.append_rows(pending, replace=args.replace)
+            stale_labels.discard(current_label)
+        # Only a finished run may drop labels that no longer have any images
+        for label in sorted(stale_labels):
+            store.delete_label(label)
+        if stale_labels:
+            print(f" Tombstoned {len(stale_labels)} labels with no images left in {args.images}")
+    finally:
+        if csv_file:
+            csv_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+
+from benchmark import iter_feature_rows
+
+
+async def request(reader, writer, host, port, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, rows, duration, rate, latencies, errors):
+    """One camera: sends single landmark rows over a keep-alive connection.
+
+    rate=None sends back-to-back (closed loop); otherwise paces to `rate` requests/second.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    interval = 1.0 / rate if rate else 0.0
+    end = time.perf_counter() + duration
+    next_send = time.perf_counter()
+    i = 0
+    try:
+        while time.perf_counter() < end:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_send += interval
+            row = rows[i % len(rows)]
+            i += 1
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, port, "POST", "/predict",
+                                      {"features": row.tolist(), "top_k": 3})
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, rows, clients, duration, rate):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, rows[c::clients] if len(rows) >= clients else rows,
+                                  duration, rate, latencies, errors) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await request(reader, writer, host, port, "GET", "/stats")
+    writer.close()
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "clients": clients, "rate_per_client": rate, "seconds": elapsed,
+        "requests": len(latencies), "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "server": stats,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for recognition_service.py")
+    parser.add_argument('source', help="CSV or dataset store folder to replay landmark rows from")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=12, help="Concurrent simulated cameras")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Requests per second per client (default: as fast as possible)")
+    parser.add_argument('--output', help="Write the result JSON here")
+    args = parser.parse_args()
+
+    rows = np.array(list(iter_feature_rows(args.source)), dtype=np.float32)
+    result = asyncio.run(run_load(args.host, args.port, rows, args.clients, args.duration, args.rate))
+    print(f" {result['requests']} requests from {result['clients']} clients in {result['seconds']:.1f}s"
+          f" -> {result['throughput_rps']:.0f} req/s, {result['errors']} errors")
+    print(f" Latency p50 {result['p50_ms']:.2f} ms | p95 {result['p95_ms']:.2f} ms | p99 {result['p99_ms']:.2f} ms")
+    print(f" Server: {result['server']['batches']} batches, mean batch size {result['server']['mean_batch_size']:.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
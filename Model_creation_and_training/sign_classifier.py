@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import numpy as np
+
+from landmark_features import NUM_FEATURES
+
+MODEL_PATH = "model.tflite"
+SCALER_PATH = "scaler_params.json"
+LABEL_MAP_PATH = "label_map.json"
+BUNDLE_PATH = "recognizer_bundle.npz"
+
+
+def interpreter_class():
+    """The lightest available TFLite Interpreter: tflite-runtime, then LiteRT, then full TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def load_interpreter(model_path=MODEL_PATH, num_threads=None, model_content=None):
+    """Create a TFLite interpreter using all cores unless num_threads is given"""
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    Interpreter = interpreter_class()
+    if model_content is not None:
+        return Interpreter(model_content=model_content, num_threads=num_threads)
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+def load_scaler(scaler_path=SCALER_PATH):
+    """(mean, scale), or (None, None) when the scaler is folded into the model graph"""
+    with open(scaler_path, "r") as f:
+        scaler_params = json.load(f)
+    if scaler_params.get("folded"):
+        return None, None
+    return np.array(scaler_params["mean"]), np.array(scaler_params["scale"])
+
+
+def load_label_map(label_map_path=LABEL_MAP_PATH):
+    with open(label_map_path, "r", encoding="utf-8") as f:
+        label_map = json.load(f)
+    return {int(k): v for k, v in label_map.items()}
+
+
+def save_bundle(bundle_path=BUNDLE_PATH, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                label_map_path=LABEL_MAP_PATH):
+    """Pack model bytes, scaler and labels into one uncompressed .npz (a single read at startup)"""
+    with open(model_path, "rb") as f:
+        model = np.frombuffer(f.read(), dtype=np.uint8)
+    mean, scale = load_scaler(scaler_path)
+    index_to_label = load_label_map(label_map_path)
+    np.savez(bundle_path, model=model,
+             scaler_mean=np.array([]) if mean is None else mean,
+             scaler_scale=np.array([]) if scale is None else scale,
+             labels=np.array([index_to_label[i] for i in range(len(index_to_label))]))
+    return bundle_path
+
+
+def load_bundle(bundle_path=BUNDLE_PATH):
+    """(model bytes, scaler mean, scaler scale, index_to_label); mean/scale are None when folded"""
+    with np.load(bundle_path) as data:
+        model = data["model"].tobytes()
+        mean, scale = data["scaler_mean"], data["scaler_scale"]
+        labels = data["labels"]
+    if mean.size == 0:
+        mean, scale = None, None
+    return model, mean, scale, {i: str(label) for i, label in enumerate(labels)}
+
+
+def quantize_input(X, input_detail):
+    """Map float rows onto an integer input tensor (no-op for float models)"""
+    dtype = input_detail['dtype']
+    if dtype == np.float32:
+        return X
+    scale, zero_point = input_detail['quantization']
+    info = np.iinfo(dtype)
+    return np.clip(np.round(X / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def dequantize_output(y, output_detail):
+    """Integer output tensor back to float probabilities (no-op for float models)"""
+    if output_detail['dtype'] == np.float32:
+        return y
+    scale, zero_point = output_detail['quantization']
+    return (y.astype(np.float32) - zero_point) * scale
+
+
+class SignClassifier:
+    """TFLite sign classifier over raw 126-float landmark feature vectors.
+
+    The interpreter input is resized once to `batch_size` rows; larger inputs are
+    run in chunks and the last chunk is zero-padded so tensors are never reallocated.
+    Models exported with `train_models.py --fold-scaler` standardize inside the
+    graph; scale() then only casts to float32. Full-integer (int8) models are
+    quantized on input and dequantized on output, so callers always see floats.
+    With bundle_path, model, scaler and labels all come from one recognizer_bundle.npz.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                 label_map_path=LABEL_MAP_PATH, batch_size=1, num_threads=None, bundle_path=None):
+        if bundle_path:
+            model_content, self.scaler_mean, self.scaler_scale, self.index_to_label = load_bundle(bundle_path)
+            self.interpreter = load_interpreter(num_threads=num_threads, model_content=model_content)
+        else:
+            self.scaler_mean, self.scaler_scale = load_scaler(scaler_path)
+            self.index_to_label = load_label_map(label_map_path)
+            self.interpreter = load_interpreter(model_path, num_threads)
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.batch_size = max(1, int(batch_size))
+        if self.batch_size != self.input_details[0]['shape'][0]:
+            self.interpreter.resize_tensor_input(self.input_details[0]['index'],
+                                                 [self.batch_size, NUM_FEATURES])
+        self.interpreter.allocate_tensors()
+        # Re-read after the resize so the shapes match the batch size actually allocated
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.num_classes = int(self.output_details[0]['shape'][-1])
+        self.folded = self.scaler_mean is None
+        self._input = np.zeros((self.batch_size, NUM_FEATURES), dtype=self.input_details[0]['dtype'])
+
+    def scale(self, X):
+        """Standardize raw features the same way as train_models.py"""
+        if self.folded:
+            return np.asarray(X, dtype=np.float32)
+        return ((np.asarray(X) - self.scaler_mean) / self.scaler_scale).astype(np.float32)
+
+    def _invoke(self, rows):
+        n = len(rows)
+        self._input[:n] = quantize_input(rows, self.input_details[0])
+        if n < self.batch_size:
+            self._input[n:] = 0
+        self.interpreter.set_tensor(self.input_details[0]['index'], self._input)
+        self.interpreter.invoke()
+        return dequantize_output(self.interpreter.get_tensor(self.output_details[0]['index'])[:n],
+                                 self.output_details[0])
+
+    def predict_proba(self, X, prescaled=False):
+        """Class probabilities for an (N, 126) array (or a single 126-vector)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X.astype(np.float32) if prescaled else self.scale(X)
+        out = np.empty((len(X), self.num_classes), dtype=np.float32)
+        for start in range(0, len(X), self.batch_size):
+            out[start:start + self.batch_size] = self._invoke(X[start:start + self.batch_size])
+        return out
+
+    def predict(self, X, prescaled=False):
+        """Return (predicted indices, confidences)"""
+        probs = self.predict_proba(X, prescaled=prescaled)
+        indices = np.argmax(probs, axis=1)
+        return indices, probs[np.arange(len(probs)), indices]
+
+    def top_k(self, probs, k=3):
+        """Top-k (label, confidence) pairs for one probability vector"""
+        order = np.argsort(probs)[::-1][:k]
+        return [(self.index_to_label[int(i)], float(probs[i])) for i in order]
+
+
+def load_classifier(backend="tflite", model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                    label_map_path=LABEL_MAP_PATH, batch_size=1, num_threads=None, forest_path=None,
+                    cascade_path=None, bundle_path=None):
+    """SignClassifier ('tflite') or the TensorFlow-free ForestClassifier ('forest').
+
+    With cascade_path, the classifier only sees rows the calibrated nearest-centroid stage is unsure of.
+    """
+    if backend == "forest":
+        from forest_classifier import ForestClassifier, FOREST_PATH
+        classifier = ForestClassifier(forest_path or FOREST_PATH, label_map_path, batch_size=max(batch_size, 256))
+    else:
+        classifier = SignClassifier(model_path, scaler_path, label_map_path, batch_size, num_threads, bundle_path)
+    if cascade_path:
+        from cascade_classifier import CascadeClassifier
+        classifier = CascadeClassifier(classifier, cascade_path)
+    return classifier
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack model.tflite, scaler_params.json and label_map.json into one bundle")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--scaler', default=SCALER_PATH)
+    parser.add_argument('--labels', default=LABEL_MAP_PATH)
+    parser.add_argument('--output', default=BUNDLE_PATH)
+    args = parser.parse_args()
+    save_bundle(args.output, args.model, args.scaler, args.labels)
+    print(f" Bundle written to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+class StableRecognizer:
+    """Motion-gated, temporally smoothed wrapper around a SignClassifier.
+
+    - Inference is skipped when no landmark moved more than `motion_threshold`
+      (in normalized image units) since the last inference; the cached
+      probabilities are reused instead.
+    - Probabilities are averaged over a ring buffer of the last `window` frames.
+    - A letter is committed once the smoothed top-1 has stayed the same, with at
+      least `min_confidence`, for `stable_frames` consecutive frames. A held letter is
+      committed once; it is re-armed only by a release (the hand leaving, a frame-to-frame
+      motion spike of at least `motion_threshold`, or a different candidate), after which
+      the same letter commits again once held still for `stable_frames` frames, so "കക"
+      can be signed without the hand leaving. `repeat_frames` (off by default) also
+      re-commits a letter held that many frames.
+    """
+
+    def __init__(self, classifier, motion_threshold=0.01, window=5, stable_frames=8, min_confidence=0.6,
+                 repeat_frames=None):
+        self.classifier = classifier
+        self.motion_threshold = motion_threshold
+        self.stable_frames = stable_frames
+        self.repeat_frames = repeat_frames
+        self.min_confidence = min_confidence
+        self._history = np.zeros((window, classifier.num_classes), dtype=np.float32)
+        self.inferences = 0
+        self.skipped = 0
+        self.reset()
+
+    def reset(self):
+        """Forget all temporal state (call when the hand leaves the frame)"""
+        self._last_features = None
+        self._prev_features = None
+        self._last_probs = None
+        self._filled = 0
+        self._pos = 0
+        self._candidate = None
+        self._candidate_count = 0
+        self._committed = None
+        self._released = False
+        self._since_commit = 0
+
+    def update(self, features, has_hand=True):
+        """Feed one frame's raw 126-float features.
+
+        Returns a dict with the smoothed 'label' / 'confidence' / 'probs' (None without
+        a hand), 'committed' (a newly committed letter or None) and 'inferred' (False
+        when the motion gate reused the previous result).
+        """
+        if not has_hand:
+            self.reset()
+            return {'label': None, 'confidence': 0.0, 'committed': None, 'inferred': False, 'probs': None}
+
+        features = np.asarray(features)
+        spike = (self._prev_features is not None
+                 and np.max(np.abs(features - self._prev_features)) >= self.motion_threshold)
+        self._prev_features = features.copy()
+        moved = (self._last_features is None
+                 or np.max(np.abs(features - self._last_features)) >= self.motion_threshold)
+        if moved:
+            self._last_probs = self.classifier.predict_proba(features)[0]
+            self._last_features = features.copy()
+            self.inferences += 1
+        else:
+            self.skipped += 1
+
+        self._history[self._pos] = self._last_probs
+        self._pos = (self._pos + 1) % len(self._history)
+        self._filled = min(self._filled + 1, len(self._history))
+        smoothed = self._history[:self._filled].mean(axis=0)
+        index = int(np.argmax(smoothed))
+        confidence = float(smoothed[index])
+
+        if index == self._candidate and confidence >= self.min_confidence:
+            self._candidate_count += 1
+        else:
+            self._candidate = index if confidence >= self.min_confidence else None
+            self._candidate_count = 1 if self._candidate is not None else 0
+            if self._candidate is not None and self._candidate != self._committed:
+                self._committed = None
+
+        if spike and (self._committed is not None or self._released):
+            # Released: the same letter may commit again once the hand holds still
+            self._committed = None
+            self._released = True
+            self._candidate_count = 0
+
+        committed = None
+        self._since_commit += 1
+        repeat = self.repeat_frames is not None and self._since_commit >= self.repeat_frames
+        if self._candidate_count >= self.stable_frames and (self._candidate != self._committed or repeat):
+            self._committed = self._candidate
+            self._released = False
+            self._since_commit = 0
+            committed = self.classifier.index_to_label[self._candidate]
+
+        return {'label': self.classifier.index_to_label[index], 'confidence': confidence,
+                'committed': committed, 'inferred': moved, 'probs': smoothed}
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_PATH = 'NotoSansMalayalam-VariableFont_wdth,wght.ttf'
+DEFAULT_COLOR = (0, 255, 0)  # BGR, same green the PIL renderer used
+
+
+class MalayalamTextRenderer:
+    """Draws Malayalam text onto BGR frames from cached pre-rasterized glyph strips.
+
+    Fonts are loaded once per size. Strings passed to preload() are packed into a
+    single RGBA atlas; anything else is rasterized on first use and kept in an LRU
+    cache. Drawing alpha-blends only the text's bounding box into the frame in place.
+    """
+
+    def __init__(self, font_path=FONT_PATH, color=DEFAULT_COLOR, cache_size=256, atlas_width=2048):
+        self.font_path = font_path
+        self.color = np.array(color, dtype=np.uint16)
+        self.cache_size = cache_size
+        self.atlas_width = atlas_width
+        self._fonts = {}
+        self._font_missing = False
+        self.atlas = np.zeros((0, atlas_width, 4), dtype=np.uint8)
+        self._atlas_entries = {}
+        self._dynamic = OrderedDict()
+
+    def _font(self, font_size):
+        font = self._fonts.get(font_size)
+        if font is None and not self._font_missing:
+            try:
+                font = ImageFont.truetype(self.font_path, font_size)
+            except IOError:
+                print(f" Malayalam font not found ({self.font_path}). Place font in working directory.")
+                self._font_missing = True
+                return None
+            self._fonts[font_size] = font
+        return font
+
+    def _rasterize(self, text, font_size):
+        """Return (rgba, dx, dy): tight RGBA strip and its offset from the draw position"""
+        font = self._font(font_size)
+        if font is None:
+            return None
+        left, top, right, bottom = font.getbbox(text)
+        width, height = max(1, right - left), max(1, bottom - top)
+        mask = Image.new('L', (width, height), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        rgba = np.empty((height, width, 4), dtype=np.uint8)
+        rgba[..., :3] = self.color.astype(np.uint8)
+        rgba[..., 3] = np.asarray(mask)
+        return rgba, left, top
+
+    def preload(self, texts, font_size):
+        """Pack strings into the atlas (shelf packing); existing entries are kept"""
+        new = []
+        for text in dict.fromkeys(texts):
+            key = (text, font_size)
+            if key in self._atlas_entries:
+                continue
+            raster = self._rasterize(text, font_size)
+            if raster is not None:
+                new.append((key, raster))
+        if not new:
+            return
+
+        # Re-pack the whole atlas, tallest strips first
+        items = [(key, (self.atlas[y:y + h, x:x + w], dx, dy))
+                 for key, (x, y, w, h, dx, dy) in self._atlas_entries.items()] + new
+        items.sort(key=lambda item: -item[1][0].shape[0])
+        placements, x, y, shelf_height = {}, 0, 0, 0
+        for key, (rgba, dx, dy) in items:
+            h, w = rgba.shape[:2]
+            w = min(w, self.atlas_width)
+            if x + w > self.atlas_width:
+                x, y, shelf_height = 0, y + shelf_height, 0
+            placements[key] = (x, y, w, h, dx, dy)
+            x += w
+            shelf_height = max(shelf_height, h)
+
+        atlas = np.zeros((y + shelf_height, self.atlas_width, 4), dtype=np.uint8)
+        for key, (rgba, _, _) in items:
+            px, py, w, h, _, _ = placements[key]
+            atlas[py:py + h, px:px + w] = rgba[:, :w]
+        self.atlas = atlas
+        self._atlas_entries = placements
+
+    def _glyph(self, text, font_size):
+        key = (text, font_size)
+        entry = self._atlas_entries.get(key)
+        if entry is not None:
+            x, y, w, h, dx, dy = entry
+            return self.atlas[y:y + h, x:x + w], dx, dy
+        raster = self._dynamic.get(key)
+        if raster is not None:
+            self._dynamic.move_to_end(key)
+            return raster
+        raster = self._rasterize(text, font_size)
+        if raster is None:
+            return None
+        self._dynamic[key] = raster
+        if len(self._dynamic) > self.cache_size:
+            self._dynamic.popitem(last=False)
+        return raster
+
+    def draw(self, frame, text, position, font_size=32):
+        """Alpha-blend text onto a BGR frame in place at the PIL-style text origin"""
+        glyph = self._glyph(text, font_size)
+        if glyph is None:
+            return frame
+        rgba, dx, dy = glyph
+        x0, y0 = position[0] + dx, position[1] + dy
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1 = min(x0 + rgba.shape[1], frame.shape[1])
+        fy1 = min(y0 + rgba.shape[0], frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return frame
+
+        src = rgba[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+        alpha = src[..., 3:4].astype(np.uint16)
+        roi = frame[fy0:fy1, fx0:fx1]
+        blended = (src[..., :3] * alpha + roi * (255 - alpha) + 127) // 255
+        roi[...] = blended.astype(np.uint8)
+        return frame
@@ -3,286 +3,548 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix
 import tensorflow as tf
+import argparse
 import json
-import seaborn as sns
-import matplotlib.pyplot as plt
 import joblib
-
-# === Define Malayalam alphabets in ISL order ===
-malayalam_alphabets = [
-    # Vowels
-    'അ', 'ആ', 'ഇ', 'ഈ', 'ഉ', 'ഊ', 'ഋ', 'എ', 'ഏ', 'ഐ', 'ഒ', 'ഓ', 'ഔ', 'അം', 'അഃ',
-    
-    # Consonants
-    'ക', 'ഖ', 'ഘ', 'ഗ', 'ങ',
-    'ച', 'ഛ', 'ജ', 'ഝ', 'ഞ', 
-    'ട', 'ഠ', 'ഡ', 'ഢ', 'ണ',
-    'ത', 'ഥ', 'ദ', 'ധ', 'ന',
-    'പ', 'ഫ', 'ബ', 'ഭ', 'മ',
-    'യ', 'ര', 'ല', 'വ',
-    'ശ', 'ഷ', 'സ', 'ഹ',
-    'ള', 'ഴ', 'റ',
-    
-    # Additional characters
-    'ൺ', 'ൻ', 'ർ', 'ൽ', 'ൾ'
-]
-
-print(f"Total expected alphabets: {len(malayalam_alphabets)}")
+import time
+from landmark_features import FEATURE_COLUMNS
+from labels import malayalam_alphabets
+from sign_classifier import SignClassifier, quantize_input, dequantize_output, save_bundle, BUNDLE_PATH
+from dataset_store import DatasetStore, DATASET_DIR
+from forest_classifier import ForestClassifier, export_forest, FOREST_PATH
+from word_suggestions import confusables_from_predictions
+from cascade_classifier import (fit_centroids, centroid_distances, top2_margin, calibrate_threshold,
+                                save_cascade, CASCADE_PATH)
+
+CSV_PATH = "data_both_hands.csv"
 
 # === Custom Label Encoder that preserves ISL order ===
 class ISLLabelEncoder:
     def __init__(self, classes):
         self.classes_ = classes
         self.class_to_index = {cls: idx for idx, cls in enumerate(classes)}
-    
+
     def fit_transform(self, y):
         return np.array([self.class_to_index[label] for label in y])
-    
+
     def transform(self, y):
         return np.array([self.class_to_index[label] for label in y])
-    
+
     def inverse_transform(self, y_encoded):
         return np.array([self.classes_[idx] for idx in y_encoded])
 
-# === Load CSV Data ===
-csv_path = "data_both_hands.csv"
-try:
-    df = pd.read_csv(csv_path)
-    print(f" Loaded {len(df)} rows from {csv_path}")
-except FileNotFoundError:
-    print(f" File {csv_path} not found!")
-    print("Please run the capture script first to collect data.")
-    exit()
-
-print(f"\n Data Summary:")
-print(f"Total rows: {len(df)}")
-print(f"Unique labels in dataset: {len(df['label'].unique())}")
-print(f"Labels in data: {sorted(df['label'].unique())}")
-
-# === Data Quality Check ===
-print(f"\n Data Quality Check:")
-label_counts = df['label'].value_counts()
-print("Samples per label:")
-for label, count in label_counts.items():
-    print(f"  {label}: {count} samples")
-
-# Check for labels with too few samples
-min_samples = 50  # Minimum samples recommended per class
-low_sample_labels = label_counts[label_counts < min_samples]
-if len(low_sample_labels) > 0:
-    print(f"\n Labels with fewer than {min_samples} samples:")
-    for label, count in low_sample_labels.items():
-        print(f"  {label}: {count} samples")
-
-# === Clean Data ===
-# Only keep rows where at least one hand is detected
-df_clean = df[(df['is_left'] == 1) | (df['is_right'] == 1)].reset_index(drop=True)
-print(f"\n After cleaning (hand detected): {len(df_clean)} rows")
-
-# === Filter available labels and maintain ISL order ===
-available_labels = df_clean['label'].unique()
-filtered_malayalam_alphabets = [label for label in malayalam_alphabets if label in available_labels]
-missing_labels = [label for label in malayalam_alphabets if label not in available_labels]
-
-print(f"\n Available for training: {len(filtered_malayalam_alphabets)} labels")
-print(f" Training labels: {filtered_malayalam_alphabets}")
-
-if missing_labels:
-    print(f"\n Missing labels (need to collect data): {len(missing_labels)}")
-    print(f" Missing: {missing_labels}")
-
-# Filter dataframe to only include available labels
-df_final = df_clean[df_clean['label'].isin(filtered_malayalam_alphabets)].reset_index(drop=True)
-print(f"\n Final dataset: {len(df_final)} rows")
-
-# === Extract features ===
-left_features = [f'L_{axis}{i}' for axis in ['x', 'y', 'z'] for i in range(21)]
-right_features = [f'R_{axis}{i}' for axis in ['x', 'y', 'z'] for i in range(21)]
-feature_columns = left_features + right_features
-
-# Ensure all feature columns exist
-for col in feature_columns:
-    if col not in df_final.columns:
-        df_final[col] = 0.0
-
-X = df_final[feature_columns].fillna(0).values
-y = df_final["label"].values
-
-print(f"\n Feature extraction:")
-print(f"Feature shape: {X.shape}")
-print(f"Target shape: {y.shape}")
-
-# === Encode labels with ISL order ===
-label_encoder = ISLLabelEncoder(filtered_malayalam_alphabets)
-y_encoded = label_encoder.fit_transform(y)
-
-print(f"\n Label encoding:")
-print(f"Number of classes: {len(label_encoder.classes_)}")
-print("Label mapping:")
-for i, label in enumerate(label_encoder.classes_):
-    count = np.sum(y_encoded == i)
-    print(f"  {i:2d}: {label} ({count} samples)")
-
-# === Normalize features ===
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-# === Split data for proper evaluation ===
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-)
-# === Save test data for future evaluation ===
-# np.save("X_test_rf.npy", X_test)
-# np.save("y_test_rf.npy", y_test)
-
-
-print(f"\n Data split:")
-print(f"Training: {X_train.shape[0]} samples")
-print(f"Testing: {X_test.shape[0]} samples")
-
-# === Train RandomForest ===
-print(f"\n Training RandomForest...")
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-rf_model.fit(X_train, y_train)
-
-# Save the trained Random Forest model
-joblib.dump(rf_model, "random_forest_model.pkl")
-print("✅ Random Forest model saved as random_forest_model.pkl")
-
-rf_train_accuracy = rf_model.score(X_train, y_train)
-rf_test_accuracy = rf_model.score(X_test, y_test)
-
-print(f"RandomForest Training Accuracy: {rf_train_accuracy:.4f}")
-print(f"RandomForest Test Accuracy: {rf_test_accuracy:.4f}")
-
-
-
-
-
-
-# === Train TensorFlow model ===
-print(f"\n Training Neural Network...")
-input_shape = X_scaled.shape[1]  # Should be 126
-num_classes = len(label_encoder.classes_)
-
-tf_model = tf.keras.Sequential([
-    tf.keras.layers.Input(shape=(input_shape,)),
-    tf.keras.layers.Dense(256, activation='relu'),
-    tf.keras.layers.BatchNormalization(),
-    tf.keras.layers.Dropout(0.3),
-    tf.keras.layers.Dense(128, activation='relu'),
-    tf.keras.layers.BatchNormalization(),
-    tf.keras.layers.Dropout(0.2),
-    tf.keras.layers.Dense(64, activation='relu'),
-    tf.keras.layers.Dropout(0.1),
-    tf.keras.layers.Dense(num_classes, activation='softmax')
-])
-
-tf_model.compile(
-    optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
-    loss='sparse_categorical_crossentropy',
-    metrics=['accuracy']
-)
-
-# Train with validation
-history = tf_model.fit(
-    X_train, y_train,
-    validation_data=(X_test, y_test),
-    epochs=100,
-    batch_size=32,
-    verbose=1,
-    callbacks=[
-        tf.keras.callbacks.EarlyStopping(patience=15, restore_best_weights=True),
-        tf.keras.callbacks.ReduceLROnPlateau(patience=10, factor=0.5)
-    ]
-)
-
-# === Evaluate model ===
-test_loss, test_accuracy = tf_model.evaluate(X_test, y_test, verbose=0)
-print(f"\n Neural Network Test Accuracy: {test_accuracy:.4f}")
-
-# === Convert to TensorFlow Lite ===
-print(f"\n Converting to TensorFlow Lite...")
-converter = tf.lite.TFLiteConverter.from_keras_model(tf_model)
-converter.optimizations = [tf.lite.Optimize.DEFAULT]
-tflite_model = converter.convert()
-
-with open("model.tflite", "wb") as f:
-    f.write(tflite_model)
-
-# === Save all necessary files ===
-print(f"\n Saving model files...")
-
-# Save scaler parameters
-scaler_params = {
-    "mean": scaler.mean_.tolist(),
-    "scale": scaler.scale_.tolist()
-}
-with open("scaler_params.json", "w") as f:
-    json.dump(scaler_params, f)
-
-# Save label map
-label_map = {int(i): label for i, label in enumerate(label_encoder.classes_)}
-with open("label_map.json", "w", encoding="utf-8") as f:
-    json.dump(label_map, f, ensure_ascii=False, indent=2)
-
-# Save comprehensive info
-model_info = {
-    "total_malayalam_alphabets": len(malayalam_alphabets),
-    "trained_alphabets": len(filtered_malayalam_alphabets),
-    "complete_alphabet_list": malayalam_alphabets,
-    "trained_labels": filtered_malayalam_alphabets,
-    "missing_labels": missing_labels,
-    "model_accuracy": float(test_accuracy),
-    "input_features": len(feature_columns),
-    "feature_order": feature_columns,
-    "training_samples": int(len(X_train)),
-    "test_samples": int(len(X_test))
-}
-with open("malayalam_isl_info.json", "w", encoding="utf-8") as f:
-    json.dump(model_info, f, ensure_ascii=False, indent=2)
-
-# === Test TFLite model ===
-print(f"\n Testing TFLite model...")
-interpreter = tf.lite.Interpreter(model_path="model.tflite")
-interpreter.allocate_tensors()
-
-input_details = interpreter.get_input_details()
-output_details = interpreter.get_output_details()
-
-print(f"TFLite input shape: {input_details[0]['shape']}")
-print(f"TFLite output shape: {output_details[0]['shape']}")
-
-# Test with a few samples
-for i in range(min(5, len(X_test))):
-    test_input = X_test[i:i+1].astype(np.float32)
-    interpreter.set_tensor(input_details[0]['index'], test_input)
+# === Load Data ===
+def load_dataframe(csv_path=CSV_PATH):
+    """Prefer the columnar dataset store (no text parsing); fall back to the CSV"""
+    if DatasetStore.exists(DATASET_DIR):
+        df = DatasetStore(DATASET_DIR, read_only=True).to_dataframe()
+        print(f" Loaded {len(df)} rows from {DATASET_DIR}")
+        return df
+    try:
+        df = pd.read_csv(csv_path)
+        print(f" Loaded {len(df)} rows from {csv_path}")
+        return df
+    except FileNotFoundError:
+        print(f" File {csv_path} not found!")
+        print("Please run the capture script first to collect data.")
+        return None
+
+def prepare_features(df, verbose=True):
+    """Clean, filter and encode the dataset.
+
+    Returns (X, y_encoded, label_encoder, filtered_malayalam_alphabets, missing_labels).
+    """
+    if verbose:
+        print(f"\n Data Summary:")
+        print(f"Total rows: {len(df)}")
+        print(f"Unique labels in dataset: {len(df['label'].unique())}")
+        print(f"Labels in data: {sorted(df['label'].unique())}")
+
+        # === Data Quality Check ===
+        print(f"\n Data Quality Check:")
+        label_counts = df['label'].value_counts()
+        print("Samples per label:")
+        for label, count in label_counts.items():
+            print(f"  {label}: {count} samples")
+
+        # Check for labels with too few samples
+        min_samples = 50  # Minimum samples recommended per class
+        low_sample_labels = label_counts[label_counts < min_samples]
+        if len(low_sample_labels) > 0:
+            print(f"\n Labels with fewer than {min_samples} samples:")
+            for label, count in low_sample_labels.items():
+                print(f"  {label}: {count} samples")
+
+    # === Clean Data ===
+    # Only keep rows where at least one hand is detected
+    df_clean = df[(df['is_left'] == 1) | (df['is_right'] == 1)].reset_index(drop=True)
+
+    # === Filter available labels and maintain ISL order ===
+    available_labels = df_clean['label'].unique()
+    filtered_malayalam_alphabets = [label for label in malayalam_alphabets if label in available_labels]
+    missing_labels = [label for label in malayalam_alphabets if label not in available_labels]
+
+    # Filter dataframe to only include available labels
+    df_final = df_clean[df_clean['label'].isin(filtered_malayalam_alphabets)].reset_index(drop=True)
+
+    # === Extract features ===
+    # Ensure all feature columns exist
+    for col in FEATURE_COLUMNS:
+        if col not in df_final.columns:
+            df_final[col] = 0.0
+
+    X = df_final[FEATURE_COLUMNS].fillna(0).values
+    y = df_final["label"].values
+
+    # === Encode labels with ISL order ===
+    label_encoder = ISLLabelEncoder(filtered_malayalam_alphabets)
+    y_encoded = label_encoder.fit_transform(y)
+
+    if verbose:
+        print(f"\n After cleaning (hand detected): {len(df_clean)} rows")
+        print(f"\n Available for training: {len(filtered_malayalam_alphabets)} labels")
+        print(f" Training labels: {filtered_malayalam_alphabets}")
+
+        if missing_labels:
+            print(f"\n Missing labels (need to collect data): {len(missing_labels)}")
+            print(f" Missing: {missing_labels}")
+
+        print(f"\n Final dataset: {len(df_final)} rows")
+        print(f"\n Feature extraction:")
+        print(f"Feature shape: {X.shape}")
+        print(f"Target shape: {y.shape}")
+
+        print(f"\n Label encoding:")
+        print(f"Number of classes: {len(label_encoder.classes_)}")
+        print("Label mapping:")
+        for i, label in enumerate(label_encoder.classes_):
+            count = np.sum(y_encoded == i)
+            print(f"  {i:2d}: {label} ({count} samples)")
+
+    return X, y_encoded, label_encoder, filtered_malayalam_alphabets, missing_labels
+
+def scale_and_split(X, y_encoded, test_size=0.2, random_state=42):
+    """Returns (scaler, X_train, X_test, y_train, y_test)"""
+    # === Normalize features ===
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    # === Split data for proper evaluation ===
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y_encoded, test_size=test_size, random_state=random_state, stratify=y_encoded
+    )
+    return scaler, X_train, X_test, y_train, y_test
+
+# === Model builders ===
+def build_mlp(input_shape, num_classes, hidden_units=(256, 128, 64), dropout=(0.3, 0.2, 0.1),
+              batch_norm=True, output_activation='softmax'):
+    """Dense ReLU stack; BatchNorm follows every hidden layer except the last (as in the original model).
+
+    output_activation=None gives a logits model (used for distillation).
+    """
+    if not isinstance(dropout, (list, tuple)):
+        dropout = [dropout] * len(hidden_units)
+    layers = [tf.keras.layers.Input(shape=(input_shape,))]
+    for i, (units, rate) in enumerate(zip(hidden_units, dropout)):
+        layers.append(tf.keras.layers.Dense(units, activation='relu'))
+        if batch_norm and i < len(hidden_units) - 1:
+            layers.append(tf.keras.layers.BatchNormalization())
+        if rate:
+            layers.append(tf.keras.layers.Dropout(rate))
+    layers.append(tf.keras.layers.Dense(num_classes, activation=output_activation))
+    return tf.keras.Sequential(layers)
+
+def train_mlp(model, X_train, y_train, X_test, y_test, epochs=100, batch_size=32, learning_rate=0.001,
+              verbose=1, augmenter=None, scaler=None):
+    """augmenter (a LandmarkAugmenter) draws fresh augmented batches every epoch; it works on raw
+    landmarks, so the fitted scaler is needed to undo and redo the standardization."""
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+    if augmenter is not None:
+        from landmark_augmentation import augmented_dataset
+        train_data = dict(x=augmented_dataset(scaler.inverse_transform(X_train), y_train, scaler.mean_,
+                                              scaler.scale_, augmenter, batch_size))
+    else:
+        train_data = dict(x=X_train, y=y_train, batch_size=batch_size)
+
+    # Train with validation
+    return model.fit(
+        **train_data,
+        validation_data=(X_test, y_test),
+        epochs=epochs,
+        verbose=verbose,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(patience=15, restore_best_weights=True),
+            tf.keras.callbacks.ReduceLROnPlateau(patience=10, factor=0.5)
+        ]
+    )
+
+QUANTIZATION_MODES = ("float32", "dynamic", "float16", "int8")
+
+def representative_dataset(X, samples=500, seed=42):
+    """Calibration generator for full-integer conversion: single rows drawn from X"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(X), size=min(samples, len(X)), replace=False)
+    def generator():
+        for i in rows:
+            yield [np.asarray(X[i:i + 1], dtype=np.float32)]
+    return generator
+
+def convert_to_tflite(model, quantization="dynamic", representative_data=None):
+    """Convert a Keras model to TFLite.
+
+    quantization: 'float32' (none), 'dynamic' (dynamic-range weights, the default export),
+    'float16' (float16 weights) or 'int8' (full integer with int8 input/output, calibrated
+    on representative_data rows).
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization != "float32":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if representative_data is None:
+            raise ValueError("int8 quantization needs representative data")
+        converter.representative_dataset = representative_dataset(representative_data)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+def fold_scaler(model, scaler):
+    """Copy of `model` that takes raw features: the StandardScaler is absorbed into the first Dense layer.
+
+    Dense(W, b) on (x - mean) / scale equals Dense(W / scale[:, None], b - (mean / scale) @ W) on x.
+    """
+    folded = tf.keras.models.clone_model(model)
+    folded.set_weights(model.get_weights())
+    first = folded.layers[0]
+    if not isinstance(first, tf.keras.layers.Dense):
+        raise ValueError(f"Cannot fold the scaler into a {type(first).__name__} input layer")
+    kernel, bias = (w.astype(np.float64) for w in first.get_weights())
+    inv_scale = 1.0 / scaler.scale_
+    first.set_weights([(kernel * inv_scale[:, None]).astype(np.float32),
+                       (bias - (scaler.mean_ * inv_scale) @ kernel).astype(np.float32)])
+    return folded
+
+def run_tflite(tflite_model, X):
+    """Probabilities for all rows of X in a single invoke"""
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    input_details = interpreter.get_input_details()[0]
+    interpreter.resize_tensor_input(input_details['index'], [len(X), X.shape[1]])
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(input_details['index'], quantize_input(np.asarray(X, dtype=np.float32), input_details))
     interpreter.invoke()
-    output_data = interpreter.get_tensor(output_details[0]['index'])
-    
-    predicted_class = np.argmax(output_data[0])
-    confidence = np.max(output_data[0])
-    actual_label = label_encoder.classes_[y_test[i]]
-    predicted_label = label_encoder.classes_[predicted_class]
-    
-    status = "" if predicted_label == actual_label else "XXX"
-    print(f"{status} Actual: {actual_label} | Predicted: {predicted_label} | Confidence: {confidence:.3f}")
-
-print(f"\n Model training complete!")
-print(f" Generated files:")
-print(f"  - model.tflite (TensorFlow Lite model)")
-print(f"  - scaler_map.json (Feature scaling parameters)")
-print(f"  - label_map.json (Label mappings)")
-print(f"  - malayalam_isl_info.json (Complete model information)")
-print(f"\n Model Statistics:")
-print(f"  - Input features: {input_shape}")
-print(f"  - Output classes: {num_classes}")
-print(f"  - Test accuracy: {test_accuracy:.4f}")
-print(f"  - Trained on {len(filtered_malayalam_alphabets)} Malayalam letters")
-
-# if missing_labels:
-#     print(f"\n To improve coverage, collect data for these missing letters:")
-#     for i, label in enumerate(missing_labels, 1):
-#         print(f"  {i}. {label}")
+    output_details = interpreter.get_output_details()[0]
+    return dequantize_output(interpreter.get_tensor(output_details['index']), output_details)
+
+def check_folded_equivalence(model, folded_model, tflite_model, folded_tflite_model, scaler, X_raw):
+    """Compare the folded graph on raw features against the two-step path (NumPy scaler, then model)"""
+    X_scaled = scaler.transform(X_raw)
+    keras_two_step = model.predict(X_scaled, verbose=0)
+    keras_folded = folded_model.predict(X_raw, verbose=0)
+    tflite_two_step = run_tflite(tflite_model, X_scaled)
+    tflite_folded = run_tflite(folded_tflite_model, X_raw)
+    return {
+        "keras_max_abs_diff": float(np.max(np.abs(keras_two_step - keras_folded))),
+        "tflite_max_abs_diff": float(np.max(np.abs(tflite_two_step - tflite_folded))),
+        "tflite_top1_agreement": float(np.mean(np.argmax(tflite_two_step, axis=1)
+                                               == np.argmax(tflite_folded, axis=1))),
+    }
+
+def measure_tflite_latency(tflite_model, runs=200, warmup=20, num_threads=1):
+    """Median single-row invoke latency in milliseconds on the local CPU"""
+    interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    input_details = interpreter.get_input_details()[0]
+    sample = np.zeros(input_details['shape'], dtype=input_details['dtype'])
+    timings = []
+    for i in range(warmup + runs):
+        interpreter.set_tensor(input_details['index'], sample)
+        start = time.perf_counter()
+        interpreter.invoke()
+        if i >= warmup:
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+def compare_quantized_models(variants, X_test, y_test, classes, reference="float32", max_class_drop=0.02):
+    """Size, single-row latency and overall / per-class test accuracy of each TFLite variant.
+
+    variants maps a name to TFLite model bytes; per-class drops larger than max_class_drop
+    against the reference variant are listed under 'regressions'.
+    """
+    report = {}
+    for name, tflite_model in variants.items():
+        predictions = np.argmax(run_tflite(tflite_model, X_test), axis=1)
+        correct = predictions == y_test
+        report[name] = {
+            "size_bytes": len(tflite_model),
+            "latency_ms": measure_tflite_latency(tflite_model),
+            "accuracy": float(np.mean(correct)),
+            "per_class": {label: float(np.mean(correct[y_test == i]))
+                          for i, label in enumerate(classes) if np.any(y_test == i)},
+        }
+    baseline = report[reference]["per_class"]
+    for name, stats in report.items():
+        stats["regressions"] = {label: round(acc - baseline[label], 4)
+                                for label, acc in stats["per_class"].items()
+                                if baseline[label] - acc > max_class_drop}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Malayalam ISL RandomForest and TFLite models")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--sweep', metavar='SPACE_JSON',
+                        help="Run a hyperparameter sweep over this search space instead of a single training run")
+    parser.add_argument('--workers', type=int, default=None, help="Sweep: parallel trials (default: cores / 2)")
+    parser.add_argument('--target-accuracy', type=float, default=None,
+                        help="Sweep: report the smallest model that reaches this test accuracy")
+    parser.add_argument('--leaderboard', default="sweep_leaderboard.csv", help="Sweep: output CSV")
+    parser.add_argument('--fold-scaler', action='store_true',
+                        help="Export model.tflite with the scaler folded in, so it takes raw landmark features")
+    parser.add_argument('--cascade-target', type=float, default=None,
+                        help="Accuracy the nearest-centroid cascade must keep (default: the full model's)")
+    parser.add_argument('--quantize', nargs='+', choices=("float16", "int8"), default=[],
+                        help="Also export model_<mode>.tflite variants and a quantization_report.json"
+                             " comparing them with the float model")
+    parser.add_argument('--augment', action='store_true',
+                        help="Train the network on randomly rotated/scaled/jittered/mirrored landmark batches")
+    args = parser.parse_args()
+
+    print(f"Total expected alphabets: {len(malayalam_alphabets)}")
+
+    if args.sweep:
+        from hyperparameter_sweep import run_sweep
+        with open(args.sweep, "r", encoding="utf-8") as f:
+            space = json.load(f)
+        run_sweep(space, csv_path=args.csv, workers=args.workers,
+                  target_accuracy=args.target_accuracy, leaderboard_path=args.leaderboard)
+        return
+
+    df = load_dataframe(args.csv)
+    if df is None:
+        exit()
+
+    X, y_encoded, label_encoder, filtered_malayalam_alphabets, missing_labels = prepare_features(df)
+    feature_columns = list(FEATURE_COLUMNS)
+
+    scaler, X_train, X_test, y_train, y_test = scale_and_split(X, y_encoded)
+    # === Save test data for future evaluation ===
+    # np.save("X_test_rf.npy", X_test)
+    # np.save("y_test_rf.npy", y_test)
+
+
+    print(f"\n Data split:")
+    print(f"Training: {X_train.shape[0]} samples")
+    print(f"Testing: {X_test.shape[0]} samples")
+
+    # === Train RandomForest ===
+    print(f"\n Training RandomForest...")
+    rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
+    rf_model.fit(X_train, y_train)
+
+    # Save the trained Random Forest model
+    joblib.dump(rf_model, "random_forest_model.pkl")
+    print("✅ Random Forest model saved as random_forest_model.pkl")
+
+    # Flattened node arrays for the TensorFlow-free forest backend
+    export_forest(rf_model, scaler.mean_, scaler.scale_, len(label_encoder.classes_), FOREST_PATH)
+    print(f"✅ Forest node arrays saved as {FOREST_PATH}")
+
+    rf_train_accuracy = rf_model.score(X_train, y_train)
+    rf_test_accuracy = rf_model.score(X_test, y_test)
+
+    print(f"RandomForest Training Accuracy: {rf_train_accuracy:.4f}")
+    print(f"RandomForest Test Accuracy: {rf_test_accuracy:.4f}")
+
+    # === Train TensorFlow model ===
+    print(f"\n Training Neural Network...")
+    input_shape = X_train.shape[1]  # Should be 126
+    num_classes = len(label_encoder.classes_)
+
+    augmenter = None
+    if args.augment:
+        from landmark_augmentation import LandmarkAugmenter
+        augmenter = LandmarkAugmenter(seed=42)
+        print(f" Augmentation: {augmenter.config()}")
+
+    tf_model = build_mlp(input_shape, num_classes)
+    history = train_mlp(tf_model, X_train, y_train, X_test, y_test, augmenter=augmenter, scaler=scaler)
+
+    # === Evaluate model ===
+    test_loss, test_accuracy = tf_model.evaluate(X_test, y_test, verbose=0)
+    print(f"\n Neural Network Test Accuracy: {test_accuracy:.4f}")
+
+    # === Convert to TensorFlow Lite ===
+    print(f"\n Converting to TensorFlow Lite...")
+    tflite_model = convert_to_tflite(tf_model)
+
+    # === Fold the scaler into the graph ===
+    scaler_folded = False
+    export_model, X_train_input, X_test_input = tf_model, X_train, X_test
+    if args.fold_scaler:
+        print(f"\n Folding the scaler into the first Dense layer...")
+        folded_model = fold_scaler(tf_model, scaler)
+        folded_tflite_model = convert_to_tflite(folded_model)
+        equivalence = check_folded_equivalence(tf_model, folded_model, tflite_model, folded_tflite_model,
+                                               scaler, scaler.inverse_transform(X_test))
+        print(f"Keras max |diff|: {equivalence['keras_max_abs_diff']:.2e}")
+        print(f"TFLite max |diff|: {equivalence['tflite_max_abs_diff']:.2e}"
+              f" | top-1 agreement: {equivalence['tflite_top1_agreement']:.4f}")
+        if equivalence['keras_max_abs_diff'] < 1e-4 and equivalence['tflite_top1_agreement'] >= 0.999:
+            tflite_model = folded_tflite_model
+            scaler_folded = True
+            export_model = folded_model
+            X_train_input, X_test_input = scaler.inverse_transform(X_train), scaler.inverse_transform(X_test)
+        else:
+            print(" Folded model is not equivalent to the two-step path; exporting the unfolded model")
+
+    with open("model.tflite", "wb") as f:
+        f.write(tflite_model)
+
+    # === Quantized variants ===
+    if args.quantize:
+        print(f"\n Exporting quantized variants: {', '.join(args.quantize)}...")
+        variants = {"float32": convert_to_tflite(export_model, "float32"), "dynamic": tflite_model}
+        for mode in args.quantize:
+            # Calibrate on training rows in the form the graph consumes (raw if folded, else scaled)
+            variants[mode] = convert_to_tflite(export_model, mode, representative_data=X_train_input)
+            with open(f"model_{mode}.tflite", "wb") as f:
+                f.write(variants[mode])
+        report = compare_quantized_models(variants, X_test_input, y_test, list(label_encoder.classes_))
+        with open("quantization_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print(f"{'variant':10s} {'size KB':>9s} {'latency ms':>11s} {'accuracy':>9s}")
+        for name, stats in report.items():
+            print(f"{name:10s} {stats['size_bytes'] / 1024:9.1f} {stats['latency_ms']:11.4f} {stats['accuracy']:9.4f}")
+            for label, delta in stats["regressions"].items():
+                print(f"    {label}: {delta:+.4f} vs float32")
+        print(f" Report saved to quantization_report.json")
+
+    # === Save all necessary files ===
+    print(f"\n Saving model files...")
+
+    # Save scaler parameters
+    scaler_params = {
+        "mean": scaler.mean_.tolist(),
+        "scale": scaler.scale_.tolist()
+    }
+    if scaler_folded:
+        # The model standardizes internally: identity params keep older clients correct,
+        # the fitted values stay available for the RandomForest
+        scaler_params = {
+            "folded": True,
+            "mean": [0.0] * len(scaler.mean_),
+            "scale": [1.0] * len(scaler.scale_),
+            "fitted_mean": scaler.mean_.tolist(),
+            "fitted_scale": scaler.scale_.tolist()
+        }
+    with open("scaler_params.json", "w") as f:
+        json.dump(scaler_params, f)
+
+    # Save label map
+    label_map = {int(i): label for i, label in enumerate(label_encoder.classes_)}
+    with open("label_map.json", "w", encoding="utf-8") as f:
+        json.dump(label_map, f, ensure_ascii=False, indent=2)
+
+    # Single-file runtime artifact (model + scaler + labels) for recognize_lite.py
+    save_bundle(BUNDLE_PATH)
+
+    # Save comprehensive info
+    model_info = {
+        "total_malayalam_alphabets": len(malayalam_alphabets),
+        "trained_alphabets": len(filtered_malayalam_alphabets),
+        "complete_alphabet_list": malayalam_alphabets,
+        "trained_labels": filtered_malayalam_alphabets,
+        "missing_labels": missing_labels,
+        "model_accuracy": float(test_accuracy),
+        "scaler_folded": scaler_folded,
+        "augmentation": augmenter.config() if augmenter is not None else None,
+        "input_features": len(feature_columns),
+        "feature_order": feature_columns,
+        "training_samples": int(len(X_train)),
+        "test_samples": int(len(X_test))
+    }
+    with open("malayalam_isl_info.json", "w", encoding="utf-8") as f:
+        json.dump(model_info, f, ensure_ascii=False, indent=2)
+
+    # === Test TFLite model ===
+    print(f"\n Testing TFLite model...")
+    tflite_classifier = SignClassifier(batch_size=min(1024, len(X_test)))
+
+    print(f"TFLite input shape: {tflite_classifier.input_details[0]['shape']}")
+    print(f"TFLite output shape: {tflite_classifier.output_details[0]['shape']}")
+
+    # Score the whole test split in batches (a folded model takes raw features)
+    if tflite_classifier.folded:
+        tflite_pred, tflite_conf = tflite_classifier.predict(scaler.inverse_transform(X_test))
+    else:
+        tflite_pred, tflite_conf = tflite_classifier.predict(X_test, prescaled=True)
+    tflite_accuracy = float(np.mean(tflite_pred == y_test))
+    print(f"TFLite Test Accuracy: {tflite_accuracy:.4f} ({len(X_test)} samples)")
+
+    # Show a few samples
+    for i in range(min(5, len(X_test))):
+        actual_label = label_encoder.classes_[y_test[i]]
+        predicted_label = label_encoder.classes_[tflite_pred[i]]
+
+        status = "" if predicted_label == actual_label else "XXX"
+        print(f"{status} Actual: {actual_label} | Predicted: {predicted_label} | Confidence: {tflite_conf[i]:.3f}")
+
+    # Letters the model mixes up, for confusion-tolerant word suggestions (word_suggestions.py)
+    confusables = confusables_from_predictions(y_test, tflite_pred, list(label_encoder.classes_))
+    with open("confusables.json", "w", encoding="utf-8") as f:
+        json.dump(confusables, f, ensure_ascii=False, indent=2)
+    print(f"Confusable letter pairs saved to confusables.json ({len(confusables)} letters)")
+
+    # === Calibrate cascade ===
+    print(f"\n Calibrating cascade (nearest centroid -> full model)...")
+    centroids = fit_centroids(X_train, y_train, num_classes)
+    first_pred, margins = top2_margin(centroid_distances(X_test, centroids))
+    target = tflite_accuracy if args.cascade_target is None else args.cascade_target
+    threshold, cascade_accuracy, first_stage_rate = calibrate_threshold(margins, first_pred, tflite_pred,
+                                                                        y_test, target)
+    save_cascade(centroids, scaler.mean_, scaler.scale_, threshold,
+                 {"target_accuracy": target, "accuracy": cascade_accuracy, "first_stage_rate": first_stage_rate})
+    print(f"Nearest centroid alone: {np.mean(first_pred == y_test):.4f}")
+    print(f"Cascade: threshold {threshold:.3f}, accuracy {cascade_accuracy:.4f} (target {target:.4f}),"
+          f" {first_stage_rate * 100:.1f}% of rows answered by the first stage")
+
+    # === Test forest backend ===
+    print(f"\n Testing forest backend...")
+    forest_pred, _ = ForestClassifier(FOREST_PATH, batch_size=1024).predict(X_test, prescaled=True)
+    forest_agreement = float(np.mean(forest_pred == rf_model.predict(X_test)))
+    print(f"Forest backend Test Accuracy: {np.mean(forest_pred == y_test):.4f}"
+          f" (agreement with sklearn: {forest_agreement:.4f})")
+
+    print(f"\n Model training complete!")
+    print(f" Generated files:")
+    print(f"  - model.tflite (TensorFlow Lite model)")
+    print(f"  - scaler_params.json (Feature scaling parameters{', folded into the model' if scaler_folded else ''})")
+    print(f"  - label_map.json (Label mappings)")
+    print(f"  - {BUNDLE_PATH} (model, scaler and labels in one file)")
+    print(f"  - {FOREST_PATH} (RandomForest node arrays for the forest backend)")
+    print(f"  - {CASCADE_PATH} (Calibrated nearest-centroid first stage)")
+    print(f"  - confusables.json (Letters the model confuses, for word suggestions)")
+    print(f"  - malayalam_isl_info.json (Complete model information)")
+    for mode in args.quantize:
+        print(f"  - model_{mode}.tflite ({mode} quantized variant)")
+    print(f"\n Model Statistics:")
+    print(f"  - Input features: {input_shape}")
+    print(f"  - Output classes: {num_classes}")
+    print(f"  - Test accuracy: {test_accuracy:.4f}")
+    print(f"  - Trained on {len(filtered_malayalam_alphabets)} Malayalam letters")
+
+    # if missing_labels:
+    #     print(f"\n To improve coverage, collect data for these missing letters:")
+    #     for i, label in enumerate(missing_labels, 1):
+    #         print(f"  {i}. {label}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import bisect
+import json
+import os
+import time
+import unicodedata
+import numpy as np
+
+LEXICON_PATH = os.path.join("..", "Android_application", "MalayalamSignApp", "app", "src", "main", "assets",
+                            "1malayalam_words.txt")
+
+# Old-style chillu spellings (consonant + virama + ZWJ) -> atomic chillu letters used as labels
+CHILLU_FORMS = {
+    "ണ്‍": "ൺ", "ന്‍": "ൻ", "ര്‍": "ർ",
+    "ല്‍": "ൽ", "ള്‍": "ൾ", "ക്‍": "ൿ",
+}
+
+
+def skeleton(text):
+    """Base letters only: vowel signs, virama, anusvara/visarga and joiners are dropped.
+
+    Fingerspelling signs base letters, so "കുടുംബം" is reached by signing ക ട ബ, and a
+    label such as "അം" reduces to "അ".
+    """
+    for old, new in CHILLU_FORMS.items():
+        text = text.replace(old, new)
+    return "".join(ch for ch in unicodedata.normalize("NFC", text)
+                   if unicodedata.category(ch) not in ("Mn", "Mc", "Cf") and not ch.isspace())
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """[(word, frequency)] from one word per line, optionally followed by a tab/space and a count"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split()
+            if not parts:
+                continue
+            frequency = float(parts[1]) if len(parts) > 1 else 1.0
+            entries.append((parts[0], frequency))
+    return entries
+
+
+def load_confusables(path):
+    """{letter: [letters it is mistaken for]} from JSON (see confusables_from_predictions)"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def confusables_from_predictions(y_true, y_pred, classes, min_rate=0.02):
+    """Letters the classifier mixes up in at least min_rate of a class's test rows"""
+    confusables = {}
+    for i, label in enumerate(classes):
+        rows = y_pred[y_true == i]
+        if len(rows) == 0:
+            continue
+        wrong, counts = np.unique(rows[rows != i], return_counts=True)
+        similar = [classes[j] for j, c in zip(wrong, counts) if c / len(rows) >= min_rate]
+        if similar:
+            confusables[label] = similar
+    return confusables
+
+
+# ========== Index ==========
+class WordSuggester:
+    """Sorted-prefix index over a frequency-weighted lexicon.
+
+    Words are sorted by their skeleton, so every prefix is one contiguous [lo, hi) range
+    found with two bisects; narrowing an existing range by one more letter only searches
+    inside it. The best words of a range come from an argpartition over its frequencies.
+    """
+
+    def __init__(self, entries, confusables=None, max_substitutions=1, substitution_penalty=0.1, beam=32):
+        merged = {}
+        for word, frequency in entries:
+            merged[word] = merged.get(word, 0.0) + frequency
+        items = sorted(((skeleton(w), w, f) for w, f in merged.items()), key=lambda item: (item[0], -item[2]))
+        self.keys = [key for key, _, _ in items]
+        self.words = [word for _, word, _ in items]
+        self.frequencies = np.array([f for _, _, f in items], dtype=np.float64)
+        self.confusables = {skeleton(k): [skeleton(v) for v in vs] for k, vs in (confusables or {}).items()}
+        self.max_substitutions = max_substitutions
+        self.substitution_penalty = substitution_penalty
+        self.beam = beam
+
+    @classmethod
+    def from_file(cls, path=LEXICON_PATH, confusables_path=None, **kwargs):
+        confusables = load_confusables(confusables_path) if confusables_path else None
+        return cls(load_lexicon(path), confusables, **kwargs)
+
+    def __len__(self):
+        return len(self.words)
+
+    def prefix_range(self, prefix, lo=0, hi=None):
+        """[lo, hi) of keys starting with prefix, searching only inside the given range"""
+        hi = len(self.keys) if hi is None else hi
+        start = bisect.bisect_left(self.keys, prefix, lo, hi)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start, hi)
+        return start, end
+
+    def top_in_range(self, lo, hi, k):
+        """Indices of the k most frequent words in [lo, hi), best first"""
+        if hi - lo <= k:
+            order = np.argsort(-self.frequencies[lo:hi], kind="stable")
+        else:
+            part = np.argpartition(-self.frequencies[lo:hi], k)[:k]
+            order = part[np.argsort(-self.frequencies[lo:hi][part], kind="stable")]
+        return lo + order
+
+    def session(self):
+        return SuggestionSession(self)
+
+    def suggest(self, letters, k=10):
+        """One-shot suggestions for a whole letter sequence"""
+        session = self.session()
+        for letter in letters:
+            session.push(letter)
+        return session.suggestions(k)
+
+
+class SuggestionSession:
+    """Incremental suggestions while letters are committed one by one.
+
+    Keeps a beam of (prefix, range, substitutions) states: each new letter narrows every
+    state by that letter and, within the substitution budget, by its confusable letters.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.letters = []
+        self._history = []
+        self._states = [("", 0, len(index), 0)]
+
+    def reset(self):
+        self.letters = []
+        self._history = []
+        self._states = [("", 0, len(self.index), 0)]
+
+    def push(self, letter):
+        """Add one recognized letter; returns False (and keeps the previous state) when nothing matches"""
+        index = self.index
+        base = skeleton(letter)
+        if not base:
+            return True
+        states = {}
+        for prefix, lo, hi, cost in self._states:
+            options = [(base, cost)]
+            if cost < index.max_substitutions:
+                options += [(alt, cost + 1) for alt in index.confusables.get(base, ())]
+            for option, option_cost in options:
+                new_prefix = prefix + option
+                new_lo, new_hi = index.prefix_range(new_prefix, lo, hi)
+                if new_lo < new_hi and states.get(new_prefix, (0, 0, 99))[2] > option_cost:
+                    states[new_prefix] = (new_lo, new_hi, option_cost)
+        if not states:
+            return False
+        ranked = sorted(states.items(), key=lambda s: (s[1][2], -(s[1][1] - s[1][0])))[:index.beam]
+        self._history.append(self._states)
+        self._states = [(prefix, lo, hi, cost) for prefix, (lo, hi, cost) in ranked]
+        self.letters.append(letter)
+        return True
+
+    def pop(self):
+        """Undo the last letter"""
+        if self._history:
+            self._states = self._history.pop()
+            self.letters.pop()
+
+    def suggestions(self, k=10):
+        """[(word, score)] best first; substitutions scale a word's frequency by the penalty"""
+        if not self.letters:
+            return []
+        index = self.index
+        best = {}
+        for prefix, lo, hi, cost in self._states:
+            weight = index.substitution_penalty ** cost
+            candidates = list(index.top_in_range(lo, hi, k))
+            # A complete-word match sorts first in its range even when it is rare
+            if index.keys[lo] == prefix and lo not in candidates:
+                candidates.append(lo)
+            for i in candidates:
+                score = index.frequencies[i] * weight
+                # Exact (complete-word) matches first, like the app
+                if index.keys[i] == prefix:
+                    score *= 10
+                word = index.words[i]
+                if score > best.get(word, 0.0):
+                    best[word] = score
+        return sorted(best.items(), key=lambda item: -item[1])[:k]
+
+
+# ========== Benchmark ==========
+def synthetic_lexicon(size, seed=42):
+    """Random Malayalam-like words (letters + vowel signs/virama) with Zipf frequencies"""
+    from labels import malayalam_alphabets
+    rng = np.random.default_rng(seed)
+    letters = [l for l in malayalam_alphabets if len(l) == 1]
+    marks = ["", "", "ാ", "ി", "ു", "െ", "്", "ം"]
+    words = set()
+    while len(words) < size:
+        length = rng.integers(2, 8)
+        words.add("".join(letters[rng.integers(len(letters))] + marks[rng.integers(len(marks))]
+                          for _ in range(length)))
+    words = sorted(words)
+    rng.shuffle(words)
+    return [(w, 1.0 / (rank + 1)) for rank, w in enumerate(words)]
+
+
+def linear_suggest(entries, letters, k=10):
+    """Baseline: rescan the whole lexicon for every keystroke (what the app does)"""
+    prefix = "".join(skeleton(l) for l in letters)
+    matches = [(w, f) for w, f in entries if skeleton(w).startswith(prefix)]
+    return sorted(matches, key=lambda item: -item[1])[:k]
+
+
+def benchmark(size=100000, queries=200, seed=42):
+    entries = synthetic_lexicon(size, seed)
+    start = time.perf_counter()
+    index = WordSuggester(entries)
+    build_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed + 1)
+    sample = [entries[i][0] for i in rng.integers(len(entries), size=queries)]
+    indexed, linear = [], []
+    for word in sample:
+        letters = list(skeleton(word))
+        session = index.session()
+        for n, letter in enumerate(letters, 1):
+            t = time.perf_counter()
+            session.push(letter)
+            session.suggestions()
+            indexed.append(time.perf_counter() - t)
+            if len(linear) < 50:
+                t = time.perf_counter()
+                linear_suggest(entries, letters[:n])
+                linear.append(time.perf_counter() - t)
+    indexed_ms, linear_ms = np.array(indexed) * 1000, np.array(linear) * 1000
+    print(f" Lexicon: {len(index)} words, index built in {build_seconds:.2f}s")
+    print(f" Indexed per letter: p50 {np.percentile(indexed_ms, 50):.3f} ms | p95 {np.percentile(indexed_ms, 95):.3f} ms"
+          f" ({len(indexed)} keystrokes)")
+    print(f" Linear scan per letter: p50 {np.percentile(linear_ms, 50):.1f} ms | p95 {np.percentile(linear_ms, 95):.1f} ms"
+          f" ({len(linear)} keystrokes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Word suggestions for recognized Malayalam letter sequences")
+    parser.add_argument('letters', nargs='*', help="Recognized letters, e.g. ക ട ബ")
+    parser.add_argument('--lexicon', default=LEXICON_PATH, help="One word per line, optional frequency column")
+    parser.add_argument('--confusables', help="JSON {letter: [confusable letters]}")
+    parser.add_argument('--max-substitutions', type=int, default=1)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--benchmark', type=int, metavar='N', help="Benchmark on a synthetic N-word lexicon")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+    else:
+        suggester = WordSuggester.from_file(args.lexicon, args.confusables, max_substitutions=args.max_substitutions)
+        for word, score in suggester.suggest(args.letters, args.top):
+            print(f" {word}\t{score:.4g}")